@@ -0,0 +1,57 @@
+"""
+Benchmark: escalamiento de RFM y agregados temporales con procesos paralelos
+
+Uso:
+    python benchmarks/bench_parallel.py --rows 5000000 --workers 1 2 4 8 16
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from bench_rfm import best_of
+from parallel import parallel_rfm, parallel_temporal
+from rfm import compute_rfm
+from synthetic import generate_clean
+from temporal_index import TemporalIndex, sum_count_by_key
+
+
+def serial_temporal(index: TemporalIndex, amounts: np.ndarray):
+    return {
+        'month': sum_count_by_key(index.month_code, amounts, index.n_months),
+        'weekday': sum_count_by_key(index.weekday, amounts, 7),
+        'hour': sum_count_by_key(index.hour, amounts, 24)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--customers', type=int, default=5_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = generate_clean(args.rows, customers=args.customers)
+    index = TemporalIndex(df['InvoiceDate'])
+    amounts = df['TotalAmount'].to_numpy(dtype=np.float64)
+    print(f"Filas: {len(df):,} | Clientes: {df['CustomerID'].nunique():,} | Meses: {index.n_months}")
+
+    rfm_serial = best_of(compute_rfm, df, args.repeat)
+    temporal_serial = best_of(lambda _: serial_temporal(index, amounts), df, args.repeat)
+    print(f"{'Workers':>8} {'RFM (s)':>10} {'Acel.':>7} {'Temporal (s)':>13} {'Acel.':>7}")
+    print(f"{'serial':>8} {rfm_serial:10.3f} {1.0:7.2f} {temporal_serial:13.3f} {1.0:7.2f}")
+
+    for workers in args.workers:
+        rfm_time = best_of(lambda d: parallel_rfm(d, workers), df, args.repeat)
+        temporal_time = best_of(lambda _: parallel_temporal(index, amounts, workers), df, args.repeat)
+        print(f"{workers:>8} {rfm_time:10.3f} {rfm_serial / rfm_time:7.2f} "
+              f"{temporal_time:13.3f} {temporal_serial / temporal_time:7.2f}")
+
+
+if __name__ == '__main__':
+    main()
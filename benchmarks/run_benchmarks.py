@@ -0,0 +1,227 @@
+"""
+Suite de benchmarks: tiempo y memoria pico de carga, limpieza, análisis y visualización
+
+Genera datos sintéticos (benchmarks/synthetic.py) para cada tamaño pedido,
+mide cada etapa y escribe un reporte JSON. Compara contra el baseline
+versionado (benchmarks/baseline.json) y marca como regresión toda etapa más
+lenta o con más memoria que el umbral.
+
+Tamaños: por defecto 10k, 100k y 1M filas (los del baseline). Se pueden pedir
+hasta 10M con --rows, pero load_data (lectura de Excel) solo se mide hasta
+EXCEL_MAX_BENCH_ROWS filas: por encima escribir el libro domina la corrida y
+ningún Excel real llega a ese tamaño; el resto de etapas cubre todos los tamaños.
+
+Uso:
+    python benchmarks/run_benchmarks.py --fail-on-regression
+    python benchmarks/run_benchmarks.py --rows 10000 100000 1000000 10000000 --output report.json
+
+El baseline depende de la máquina. Para regenerarlo (tras una mejora
+intencional o en una máquina nueva de CI) con los tamaños por defecto:
+    python benchmarks/run_benchmarks.py --save-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from synthetic import generate, write
+from data_loader import RetailDataLoader
+from analysis import RetailAnalyzer
+from visualizations import RetailVisualizer
+
+# load_data lee Excel; por encima de este tamaño escribir el libro domina el benchmark
+EXCEL_MAX_BENCH_ROWS = 200_000
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+DEFAULT_BASELINE = Path(__file__).parent / 'baseline.json'
+# Reporte de cada corrida (no versionado, ver .gitignore)
+DEFAULT_OUTPUT = Path(__file__).parent / 'benchmark_report.json'
+
+ANALYZER_METHODS = [
+    ('get_basic_stats', {}),
+    ('customer_rfm_segmentation', {}),
+    ('customer_rfm_segmentation', {'advanced': True}),
+    ('get_top_customers', {}),
+    ('sales_by_month', {}),
+    ('sales_by_day_of_week', {}),
+    ('sales_by_hour', {}),
+    ('get_peak_sales_time', {}),
+    ('cohort_retention', {}),
+    ('get_repeat_customers', {}),
+]
+
+VISUALIZER_METHODS = [
+    'aggregate_sales_over_time',
+    'aggregate_top_countries',
+    'aggregate_top_products',
+    'aggregate_sales_distribution',
+]
+
+
+def measure(func, repeat: int = 1) -> dict:
+    """
+    Mide una función: mejor tiempo de `repeat` ejecuciones y memoria pico (tracemalloc)
+
+    Returns:
+        Dict con seconds y peak_mb
+    """
+    timings = []
+    # Los mensajes de progreso del loader no forman parte de la medición
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {'seconds': round(min(timings), 6), 'peak_mb': round(peak / 1e6, 3)}
+
+
+def bench_size(rows: int, seed: int, repeat: int, workdir: Path) -> dict:
+    """Ejecuta todas las etapas para un tamaño de datos"""
+    raw = generate(rows, seed)
+    results = {}
+
+    if rows <= EXCEL_MAX_BENCH_ROWS:
+        path = write(raw, workdir / f'retail_{rows}.xlsx')
+        results['load_data'] = measure(lambda: RetailDataLoader(path).load_data(), 1)
+
+    parquet_path = write(raw, workdir / f'retail_{rows}.parquet')
+    results['load_clean_streaming'] = measure(
+        lambda: RetailDataLoader(parquet_path).load_clean_streaming(), repeat
+    )
+
+    def clean():
+        loader = RetailDataLoader(parquet_path)
+        loader.df = raw
+        return loader.clean_data()
+
+    results['clean_data'] = measure(clean, repeat)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = clean()
+
+    for method, kwargs in ANALYZER_METHODS:
+        name = method + ('[advanced]' if kwargs.get('advanced') else '')
+        # Caché desactivada: cada repetición mide el cálculo completo
+        results[f'RetailAnalyzer.{name}'] = measure(
+            lambda: getattr(RetailAnalyzer(df, cache_size=0), method)(**kwargs), repeat
+        )
+
+    for method in VISUALIZER_METHODS:
+        # Visualizador nuevo en cada repetición: sin aciertos de la memoización
+        results[f'RetailVisualizer.{method}'] = measure(
+            lambda: getattr(RetailVisualizer(df), method)(), repeat
+        )
+
+    return results
+
+
+def compare(report: dict, baseline: dict, threshold: float = 0.2,
+            min_seconds: float = 0.005, min_mb: float = 1.0) -> list:
+    """
+    Compara un reporte con el baseline
+
+    Una etapa es regresión si su tiempo (o memoria pico) supera al del baseline
+    en más de `threshold` relativo y en más del mínimo absoluto.
+
+    Returns:
+        Lista de dicts con size, stage, metric, baseline, current y ratio
+    """
+    regressions = []
+    for size, stages in report['results'].items():
+        for stage, current in stages.items():
+            previous = baseline.get('results', {}).get(size, {}).get(stage)
+            if previous is None:
+                continue
+            for metric, floor in (('seconds', min_seconds), ('peak_mb', min_mb)):
+                before, after = previous[metric], current[metric]
+                if after > before * (1 + threshold) and after - before > floor:
+                    regressions.append({
+                        'size': size, 'stage': stage, 'metric': metric,
+                        'baseline': before, 'current': after,
+                        'ratio': round(after / before, 3) if before else None
+                    })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT))
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                        help='Reporte JSON previo con el que comparar')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Aumento relativo tolerado antes de marcar una regresión')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Guarda este reporte como nuevo baseline en --baseline')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'excel_max_rows': EXCEL_MAX_BENCH_ROWS
+        },
+        'results': {}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp, warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for rows in args.rows:
+            print(f"📦 Benchmark con {rows:,} filas...")
+            report['results'][str(rows)] = bench_size(rows, args.seed, args.repeat, Path(tmp))
+
+    if args.baseline and Path(args.baseline).exists() and not args.save_baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        report['regressions'] = compare(report, baseline, args.threshold)
+    else:
+        if not args.save_baseline:
+            print(f"⚠️ No hay baseline en {args.baseline}: no se comparan regresiones")
+        report['regressions'] = []
+
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    if args.save_baseline and args.baseline:
+        Path(args.baseline).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"✅ Baseline guardado en {args.baseline}")
+
+    for size, stages in report['results'].items():
+        print(f"\n{size} filas")
+        for stage, result in stages.items():
+            print(f"  {stage:<52} {result['seconds']:9.4f} s {result['peak_mb']:10.1f} MB")
+
+    for regression in report['regressions']:
+        print(f"⚠️ Regresión {regression['size']} {regression['stage']} {regression['metric']}: "
+              f"{regression['baseline']} → {regression['current']}")
+    print(f"\nReporte escrito en {args.output}")
+
+    if args.fail_on_regression and report['regressions']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Generador sintético de datos con la forma de Online Retail II
+
+Produce transacciones crudas reproducibles (semilla fija) con popularidad
+sesgada de clientes y productos, facturas canceladas con prefijo 'C',
+CustomerID nulos por factura, descripciones faltantes y precios en cero,
+y las escribe como Excel multi-hoja, CSV o Parquet.
+
+Uso:
+    python benchmarks/synthetic.py --rows 1000000 --format parquet --output data/synthetic.parquet
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from data_loader import RetailDataLoader
+
+COLUMNS = ['Invoice', 'StockCode', 'Description', 'Quantity',
+           'InvoiceDate', 'Price', 'CustomerID', 'Country']
+
+COUNTRIES = ['United Kingdom', 'Germany', 'France', 'EIRE', 'Spain',
+             'Netherlands', 'Belgium', 'Switzerland', 'Portugal', 'Australia']
+COUNTRY_WEIGHTS = [0.90, 0.02, 0.02, 0.02, 0.01, 0.01, 0.005, 0.005, 0.005, 0.005]
+
+# Excel admite 1.048.576 filas por hoja, incluida la cabecera
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def generate(rows: int, seed: int = 42, customers: int = None, products: int = None,
+             days: int = 730, cancel_rate: float = 0.02,
+             missing_customer_rate: float = 0.2) -> pd.DataFrame:
+    """
+    Genera transacciones crudas con la estructura de Online Retail II
+
+    Args:
+        rows: Número de líneas de factura
+        seed: Semilla del generador aleatorio
+        customers: Clientes distintos (por defecto escala con rows)
+        products: Productos distintos (por defecto escala con rows, máx. 5.000)
+        days: Días cubiertos desde 2009-12-01
+        cancel_rate: Fracción de facturas canceladas ('C' + cantidades negativas)
+        missing_customer_rate: Fracción de facturas sin CustomerID
+
+    Returns:
+        DataFrame con las columnas de COLUMNS (sin limpiar)
+    """
+    rng = np.random.default_rng(seed)
+    customers = customers or max(50, rows // 170)
+    products = products or max(20, min(5_000, rows // 200))
+
+    # Facturas de tamaño geométrico (media ~20 líneas), líneas contiguas
+    sizes = rng.geometric(1 / 20, rows // 10 + 1)
+    invoice_of_row = np.repeat(np.arange(len(sizes)), sizes)[:rows]
+    n_invoices = int(invoice_of_row[-1]) + 1 if rows else 0
+
+    # Fechas por factura, crecientes, en horario comercial y sin sábados
+    day = np.sort(rng.integers(0, days, n_invoices))
+    start = np.datetime64('2009-12-01')
+    dates = start + day.astype('timedelta64[D]')
+    saturday = ((dates.astype(np.int64) + 3) % 7) == 5
+    dates[saturday] += rng.choice([-1, 1], int(saturday.sum())).astype('timedelta64[D]')
+    minutes = np.clip(rng.normal(12.5 * 60, 150, n_invoices), 7 * 60, 20 * 60).astype(np.int64)
+    dates = dates.astype('datetime64[m]') + minutes.astype('timedelta64[m]')
+
+    # Clientes con popularidad sesgada; las facturas sin cliente quedan en NaN
+    customer_of_invoice = rng.choice(customers, n_invoices, p=_zipf_weights(customers, 0.8))
+    customer_ids = (customer_of_invoice + 12_346).astype(float)
+    customer_ids[rng.random(n_invoices) < missing_customer_rate] = np.nan
+    customer_country = rng.choice(len(COUNTRIES), customers, p=COUNTRY_WEIGHTS)
+    country_of_invoice = np.asarray(COUNTRIES)[customer_country[customer_of_invoice]]
+
+    cancelled = rng.random(n_invoices) < cancel_rate
+    numbers = (489_434 + np.arange(n_invoices)).astype(str)
+    invoice_labels = np.where(cancelled, np.char.add('C', numbers), numbers)
+
+    # Productos con popularidad sesgada y precio propio
+    product = rng.choice(products, rows, p=_zipf_weights(products, 1.1))
+    unit_price = (rng.gamma(1.5, 2.5, products) + 0.1).round(2)
+    stock_codes = (10_000 + product * 7 % 90_000).astype(str)
+    descriptions = pd.Series([f'PRODUCT {i}' for i in range(products)])[product].to_numpy(dtype=object)
+
+    quantity = rng.geometric(0.15, rows).astype(np.int64)
+    quantity[cancelled[invoice_of_row]] *= -1
+    price = unit_price[product]
+
+    # Líneas de ajuste sin descripción y con precio cero, como en el dataset real
+    damaged = rng.random(rows) < 0.003
+    descriptions[damaged] = None
+    price[damaged] = 0.0
+
+    return pd.DataFrame({
+        'Invoice': invoice_labels[invoice_of_row],
+        'StockCode': stock_codes,
+        'Description': descriptions,
+        'Quantity': quantity,
+        'InvoiceDate': dates[invoice_of_row].astype('datetime64[ns]'),
+        'Price': price,
+        'CustomerID': customer_ids[invoice_of_row],
+        'Country': country_of_invoice[invoice_of_row]
+    }, columns=COLUMNS)
+
+
+def generate_clean(rows: int, seed: int = 42, **kwargs) -> pd.DataFrame:
+    """Genera datos sintéticos y les aplica la limpieza de RetailDataLoader"""
+    return RetailDataLoader._clean_frame(generate(rows, seed, **kwargs)).reset_index(drop=True)
+
+
+def write(df: pd.DataFrame, path, fmt: str = None) -> Path:
+    """
+    Escribe los datos en Excel multi-hoja, CSV o Parquet
+
+    El Excel se divide en hojas por periodo ('Year 2009-2010', 'Year 2010-2011', ...)
+    respetando el límite de filas por hoja.
+
+    Args:
+        df: DataFrame generado
+        path: Ruta de salida
+        fmt: 'xlsx', 'csv' o 'parquet' (por defecto, la extensión de path)
+    """
+    path = Path(path)
+    fmt = fmt or path.suffix.lstrip('.').lower()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    elif fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    elif fmt == 'xlsx':
+        # Los periodos van de diciembre a noviembre, como las hojas originales
+        period = (df['InvoiceDate'] + pd.DateOffset(months=1)).dt.year
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            for year, sheet in df.groupby(period, sort=True):
+                for part, start in enumerate(range(0, len(sheet), EXCEL_MAX_ROWS)):
+                    name = f'Year {year - 1}-{year}' + (f' ({part + 1})' if part else '')
+                    sheet.iloc[start:start + EXCEL_MAX_ROWS].to_excel(writer, sheet_name=name, index=False)
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--format', choices=['xlsx', 'csv', 'parquet'], default='parquet')
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    df = generate(args.rows, args.seed)
+    path = write(df, args.output, args.format)
+    print(f"✅ {len(df):,} filas sintéticas escritas en {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+"""
+Punto de entrada de `python -m src` (ver cli.py)
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -8,54 +8,131 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+try:
+    from .rfm import compute_rfm, add_rfm_scores
+    from .cohorts import (compute_purchases, cohort_matrices, purchase_intervals,
+                          interval_distribution, repeat_customers)
+    from .result_cache import ResultCache, FrameWatcher
+    from .temporal_index import TemporalIndex, DAY_NAMES, sum_count_by_key
+    from .parallel import parallel_rfm
+    from .instrumentation import instrumented, frame_rows
+except ImportError:
+    from rfm import compute_rfm, add_rfm_scores
+    from cohorts import (compute_purchases, cohort_matrices, purchase_intervals,
+                         interval_distribution, repeat_customers)
+    from result_cache import ResultCache, FrameWatcher
+    from temporal_index import TemporalIndex, DAY_NAMES, sum_count_by_key
+    from parallel import parallel_rfm
+    from instrumentation import instrumented, frame_rows
+
 class RetailAnalyzer:
     """Clase para análisis de datos retail"""
 
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, cache_size: int = 32, workers: int = 1):
         """Inicializa el analizador
 
         Args:
             df: DataFrame con datos limpios de retail
+            cache_size: Máximo de resultados derivados memoizados (0 desactiva)
+            workers: Procesos para la tabla RFM (1 = serial). Opcional: conviene solo
+                con varios núcleos y DataFrames grandes; medir el punto de cruce
+                con benchmarks/bench_parallel.py
         """
         self.df = df
+        self.workers = workers
         self.version = "3.0.0"
         self.analysis_date = datetime.now()
-
+        self._cache = ResultCache(maxsize=cache_size)
+        self._watcher = FrameWatcher()
+        self._watcher.changed(df)
+        self._time_index = TemporalIndex(df['InvoiceDate']) if 'InvoiceDate' in df.columns else None
+
+    # ========== CACHÉ DE RESULTADOS ==========
+
+    def _cached(self, key, compute):
+        """Memoiza un resultado derivado; se invalida si se reemplaza self.df"""
+        if self._watcher.changed(self.df):
+            self._cache.clear()
+            self._time_index = None
+        return self._cache.get_or_compute(key, compute)
+
+    @property
+    def time_index(self) -> TemporalIndex:
+        """Índice temporal (año-mes, día de semana, hora) de self.df"""
+        if self._time_index is None:
+            self._time_index = TemporalIndex(self.df['InvoiceDate'])
+        return self._time_index
+
+    def _amounts(self) -> np.ndarray:
+        return self.df['TotalAmount'].to_numpy(dtype=np.float64)
+
+    def _use_parallel(self) -> bool:
+        return self.workers > 1
+
+    def _temporal_totals(self, key: str):
+        """Sumas y conteos de TotalAmount por 'month', 'weekday' u 'hour'"""
+        # Siempre serial: un bincount sobre el índice precalculado es más rápido
+        # que copiar las columnas a otros procesos (ver benchmarks/bench_parallel.py)
+        index = self.time_index
+        keys, size = {
+            'month': (index.month_code, index.n_months),
+            'weekday': (index.weekday, 7),
+            'hour': (index.hour, 24)
+        }[key]
+        return sum_count_by_key(keys, self._amounts(), size)
+
+    def cache_info(self) -> dict:
+        """Retorna aciertos, fallos y tamaño de la caché de resultados"""
+        return self._cache.info()
+
+    def clear_cache(self):
+        """Vacía la caché de resultados derivados"""
+        self._cache.clear()
+        self._watcher.invalidate()
+        self._time_index = None
+
+    def invalidate(self):
+        """Avisa que self.df se modificó en el lugar (la caché no lo detecta sola)"""
+        self.clear_cache()
+
+    @instrumented('analysis.get_basic_stats', rows_in=frame_rows)
     def get_basic_stats(self):
         """Retorna estadísticas básicas del dataset"""
         stats = {
             'total_sales': self.df['TotalAmount'].sum(),
-            'avg_sales': self.df['TotalAmount'].mean(),
-            'total_customers': self.df['CustomerID'].unique(),
+            'avg_sale': self.df['TotalAmount'].mean(),
+            'total_customers': self.df['CustomerID'].nunique(),
             'total_transactions': len(self.df)
         }
         return stats
 
     # ========== MÉTODOS DE SEGMENTACIÓN RFM ==========
 
-    def customer_rfm_segmentation(self):
+    @instrumented('analysis.customer_rfm_segmentation', rows_in=frame_rows)
+    def customer_rfm_segmentation(self, advanced: bool = False):
         """
         Segmentación RFM (Recency, Frequency, Monetary) de clientes
 
+        Frequency cuenta facturas distintas (no líneas de producto).
+
+        Args:
+            advanced: Si es True agrega puntuaciones por quintiles y segmentos
+
         Returns:
             DataFrame con métricas RFM por clientes
         """
 
-        # Fecha de referencia para calcular recency
-        snapshot_date = self.df['InvoiceDate'].max() + pd.Timedelta(days=1)
-
-        # Calcular métricas RFM
-        rfm = self.df.groupby('CustomerID').agg({
-            'InvoiceDate': lambda x: (snapshot_date - x.max()).days,    # Recency
-            'Invoice': 'count',    # Frequency
-            'TotalAmount': 'sum'    # Monetary
-        })
+        return self._rfm_table(advanced).copy()
 
-        rfm.columns = ['Recency', 'Frequency', 'Monetary']
-        rfm = rfm.sort_values('Monetary', ascending=False)
-
-        return rfm
+    def _rfm_table(self, advanced: bool = False):
+        """Tabla RFM memoizada (compartida por los métodos de clientes)"""
+        if advanced:
+            return self._cached(('rfm', True), lambda: add_rfm_scores(self._rfm_table()))
+        if self._use_parallel():
+            return self._cached(('rfm', False), lambda: parallel_rfm(self.df, self.workers))
+        return self._cached(('rfm', False), lambda: compute_rfm(self.df))
 
+    @instrumented('analysis.get_top_customers', rows_in=frame_rows)
     def get_top_customers(self, n: int = 10):
         """
         Obtiene los top N clientes por valor monetario
@@ -67,11 +144,82 @@ class RetailAnalyzer:
             DataFrame con top clientes
         """
 
-        rfm = self.customer_rfm_segmentation()
-        return rfm.head(n)
+        return self._rfm_table().head(n).copy()
+
+    # ========== MÉTODOS DE COHORTES Y RECOMPRA ==========
+
+    def _purchases(self):
+        """Compras (cliente x factura) memoizadas, compartidas por los métodos de cohortes"""
+        return self._cached(('purchases',), lambda: compute_purchases(self.df))
+
+    def _cohorts(self):
+        return self._cached(('cohorts',), lambda: cohort_matrices(self._purchases()))
+
+    def _intervals(self):
+        return self._cached(('purchase_intervals',), lambda: purchase_intervals(self._purchases()))
+
+    @instrumented('analysis.cohort_retention', rows_in=frame_rows)
+    def cohort_retention(self, rate: bool = True):
+        """
+        Matriz de retención por cohorte de adquisición mensual
+
+        Args:
+            rate: Si es True retorna la fracción de la cohorte activa; si no, clientes activos
+
+        Returns:
+            DataFrame cohorte (mes de primera compra) x meses desde la adquisición
+        """
+
+        return self._cohorts()['retention' if rate else 'active'].copy()
+
+    @instrumented('analysis.cohort_revenue', rows_in=frame_rows)
+    def cohort_revenue(self):
+        """
+        Ventas por cohorte de adquisición y meses desde la adquisición
+
+        Returns:
+            DataFrame cohorte x meses desde la adquisición
+        """
+
+        return self._cohorts()['revenue'].copy()
+
+    @instrumented('analysis.purchase_intervals', rows_in=frame_rows)
+    def purchase_intervals(self):
+        """
+        Compras y días entre compras consecutivas por cliente
+
+        Returns:
+            DataFrame indexado por CustomerID (ver cohorts.purchase_intervals)
+        """
+
+        return self._intervals().copy()
+
+    @instrumented('analysis.purchase_interval_distribution', rows_in=frame_rows)
+    def purchase_interval_distribution(self):
+        """
+        Distribución de días entre compras consecutivas de un mismo cliente
+
+        Returns:
+            Series con el número de intervalos por día
+        """
+
+        return self._cached(('interval_distribution',),
+                            lambda: interval_distribution(self._purchases())).copy()
+
+    @instrumented('analysis.get_repeat_customers', rows_in=frame_rows)
+    def get_repeat_customers(self):
+        """
+        Clientes con más de una compra (query 6 de sql/queries.sql)
+
+        Returns:
+            DataFrame con NumPurchases, FirstPurchase, LastPurchase y DaysBetween
+        """
+
+        return self._cached(('repeat_customers',), lambda: repeat_customers(self._intervals())).copy()
 
     # ========== MÉTODOS DE ANÁLISIS TEMPORAL ==========
 
+    @instrumented('analysis.sales_by_month', rows_in=frame_rows)
     def sales_by_month(self):
         """
         Analiza ventas agrupadas por mes
@@ -80,12 +228,18 @@ class RetailAnalyzer:
             Series con ventas totales por mes
         """
 
-        monthly_sales = self.df.groupby(
-            self.df['InvoiceDate'].dt.to_period('M')
-        )['TotalAmount'].sum()
+        def compute():
+            sums, counts = self._temporal_totals('month')
+            present = np.flatnonzero(counts)
+            return pd.Series(
+                sums[present],
+                index=self.time_index.month_periods(present).rename('InvoiceDate'),
+                name='TotalAmount'
+            )
 
-        return monthly_sales
+        return self._cached(('sales_by_month',), compute).copy()
 
+    @instrumented('analysis.sales_by_day_of_week', rows_in=frame_rows)
     def sales_by_day_of_week(self):
         """
         Analiza ventas por día de la semana
@@ -94,20 +248,26 @@ class RetailAnalyzer:
             DataFrame con ventas por día
         """
 
-        self.df['DayOfWeek'] = self.df['InvoiceDate'].dt.day_name()
-
-        daily_sales = self.df.groupby('DayOfWeek').agg({
-            'TotalAmount': ['sum', 'mean', 'count']
-        }).round(2)
+        def compute():
+            sums, counts = self._temporal_totals('weekday')
+            present = np.flatnonzero(counts)
 
-        # Ordenar por días de la semana
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday',
-                    'Friday', 'Saturday', 'Sunday']
+            # Los nombres de los días solo se asignan al construir la salida
+            daily_sales = pd.DataFrame(
+                {
+                    ('TotalAmount', 'sum'): sums[present],
+                    ('TotalAmount', 'mean'): sums[present] / counts[present],
+                    ('TotalAmount', 'count'): counts[present]
+                },
+                index=pd.Index([DAY_NAMES[d] for d in present], name='DayOfWeek')
+            ).round(2)
 
-        daily_sales = daily_sales.reindex(day_order)
+            # Ordenar por días de la semana
+            return daily_sales.reindex(DAY_NAMES)
 
-        return daily_sales
+        return self._cached(('sales_by_day_of_week',), compute).copy()
 
+    @instrumented('analysis.sales_by_hour', rows_in=frame_rows)
     def sales_by_hour(self):
         """
         Analiza ventas por hora del día
@@ -115,12 +275,22 @@ class RetailAnalyzer:
         Returns:
             Series con ventas por hora
         """
-        hourly_sales = self.df.groupby(
-            self.df['InvoiceDate'].dt.hour
-        )['TotalAmount'].sum()
-
-        return hourly_sales
-
+        return self._hourly_sales().copy()
+
+    def _hourly_sales(self):
+        """Ventas por hora memoizadas (compartidas con get_peak_sales_time)"""
+        def compute():
+            sums, counts = self._temporal_totals('hour')
+            present = np.flatnonzero(counts)
+            return pd.Series(
+                sums[present],
+                index=pd.Index(present.astype(np.int32), name='InvoiceDate'),
+                name='TotalAmount'
+            )
+
+        return self._cached(('sales_by_hour',), compute)
+
+    @instrumented('analysis.get_peak_sales_time', rows_in=frame_rows)
     def get_peak_sales_time(self):
         """
         Identifica el periodo de mayor actividad
@@ -128,7 +298,7 @@ class RetailAnalyzer:
         Returns:
             Dict con información de pico de ventas
         """
-        hourly = self.sales_by_hour()
+        hourly = self._hourly_sales()
         peak_hour = hourly.idxmax()
         peak_amount = hourly.max()
 
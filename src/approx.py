@@ -0,0 +1,299 @@
+"""
+Modo de análisis aproximado para respuestas interactivas instantáneas.
+
+Los sketches se construyen una sola vez (al cargar, lote a lote) y luego
+responden en microsegundos sin tocar las transacciones:
+
+- HyperLogLog para clientes y facturas distintos
+- t-digest para cuantiles de TotalAmount (y el boxplot de la distribución)
+- Count-Min + heavy hitters para top productos (por cantidad) y países (por ventas)
+- Muestra estratificada por país para totales filtrados con intervalo de confianza
+
+Las sumas y conteos aditivos (ventas, filas) son exactos. Todo el estado se
+combina con merge() y se guarda/carga en un único archivo .npz.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .sketches import HyperLogLog, TDigest, HeavyHitters
+except ImportError:
+    from sketches import HyperLogLog, TDigest, HeavyHitters
+
+# Igual que en visualizations, sin importar matplotlib
+HISTOGRAM_BINS = 50
+MAX_FLIERS = 1000
+Z_95 = 1.959964
+
+SAMPLE_COLUMNS = ['InvoiceDate', 'Country', 'Description', 'CustomerID', 'Quantity', 'Price', 'TotalAmount']
+
+
+# ========== MUESTRA ESTRATIFICADA ==========
+
+class StratifiedSample:
+    """
+    Muestra estratificada mergeable con tasa fija y mínimo de filas por estrato
+
+    Cada fila recibe una prioridad aleatoria uniforme. Se conserva si su
+    prioridad es menor que `rate` o si está entre las `min_rows` menores de su
+    estrato; condicionado al tamaño resultante, la muestra de cada estrato es
+    aleatoria simple, por lo que el estimador estratificado y su error estándar
+    son los clásicos. El tamaño de cada estrato (N_h) se cuenta exactamente.
+    """
+
+    def __init__(self, rate: float = 0.01, min_rows: int = 30, stratum: str = 'Country', seed: int = 0):
+        """
+        Inicializa la muestra
+
+        Args:
+            rate: Fracción de filas que se conserva en cada estrato
+            min_rows: Mínimo de filas por estrato (estratos pequeños se guardan completos)
+            stratum: Columna que define los estratos
+            seed: Semilla del generador aleatorio
+        """
+        self.rate = rate
+        self.min_rows = min_rows
+        self.stratum = stratum
+        self.rng = np.random.default_rng(seed)
+        self.rows = pd.DataFrame()
+        self.population = pd.Series(dtype=np.int64)
+
+    def _trim(self, rows: pd.DataFrame) -> pd.DataFrame:
+        rank = rows.groupby(self.stratum, observed=True)['_priority'].rank(method='first')
+        return rows[(rows['_priority'] < self.rate) | (rank <= self.min_rows)].reset_index(drop=True)
+
+    def update(self, batch: pd.DataFrame):
+        """Agrega un lote limpio"""
+        if not len(batch):
+            return self
+        strata = batch[self.stratum].astype(str)
+        self.population = self.population.add(strata.value_counts(), fill_value=0).astype(np.int64)
+
+        columns = [c for c in SAMPLE_COLUMNS if c in batch.columns]
+        candidates = batch[columns].assign(**{self.stratum: strata}, _priority=self.rng.random(len(batch)))
+        # Solo pueden entrar filas bajo la tasa o entre las primeras min_rows del lote por estrato
+        candidates = self._trim(candidates)
+        self.rows = self._trim(pd.concat([self.rows, candidates], ignore_index=True)
+                               if len(self.rows) else candidates)
+        return self
+
+    def merge(self, other: 'StratifiedSample'):
+        """Combina otra muestra con la misma tasa"""
+        self.population = self.population.add(other.population, fill_value=0).astype(np.int64)
+        self.rows = self._trim(pd.concat([self.rows, other.rows], ignore_index=True))
+        return self
+
+    def estimate_total(self, column: str = None, where=None) -> dict:
+        """
+        Estima el total de una columna (o el número de filas) en las filas que cumplen un filtro
+
+        Args:
+            column: Columna a sumar; None cuenta filas
+            where: Función DataFrame -> máscara booleana sobre la muestra (opcional)
+
+        Returns:
+            Dict con estimate, std_error, ci_low, ci_high (95%) y sample_rows
+        """
+        rows = self.rows
+        values = (np.ones(len(rows)) if column is None
+                  else rows[column].to_numpy(dtype=np.float64))
+        if where is not None:
+            values = np.where(np.asarray(where(rows), dtype=bool), values, 0.0)
+
+        grouped = pd.DataFrame({'stratum': rows[self.stratum].to_numpy(), 'y': values}) \
+            .groupby('stratum')['y'].agg(['size', 'mean', 'var'])
+        population = self.population.reindex(grouped.index).to_numpy(dtype=np.float64)
+        n = grouped['size'].to_numpy(dtype=np.float64)
+
+        estimate = float((population * grouped['mean'].to_numpy()).sum())
+        variance = population ** 2 * (1 - n / population) * grouped['var'].fillna(0).to_numpy() / n
+        std_error = float(np.sqrt(variance.sum()))
+        return {
+            'estimate': estimate,
+            'std_error': std_error,
+            'ci_low': estimate - Z_95 * std_error,
+            'ci_high': estimate + Z_95 * std_error,
+            'sample_rows': int(len(rows))
+        }
+
+
+# ========== ANALIZADOR APROXIMADO ==========
+
+class ApproxAnalyzer:
+    """Respuestas aproximadas a partir de sketches construidos una vez"""
+
+    def __init__(self, precision: int = 12, compression: int = 200, capacity: int = 256,
+                 sample_rate: float = 0.01, seed: int = 0):
+        """
+        Inicializa sketches vacíos
+
+        Args:
+            precision: Precisión de los HyperLogLog (error ~ 1.04 / sqrt(2^precision))
+            compression: Compresión del t-digest (más alta = cuantiles más precisos)
+            capacity: Candidatos que conservan los heavy hitters
+            sample_rate: Tasa de la muestra estratificada por país
+            seed: Semilla de los hashes y del muestreo
+        """
+        self.params = {'precision': precision, 'compression': compression, 'capacity': capacity,
+                       'sample_rate': sample_rate, 'seed': seed}
+        self.rows = 0
+        self.total_sales = 0.0
+        self.customers = HyperLogLog(precision)
+        self.invoices = HyperLogLog(precision)
+        self.amounts = TDigest(compression)
+        self.products = HeavyHitters(capacity, seed=seed)
+        self.countries = HeavyHitters(capacity, seed=seed)
+        self.sample = StratifiedSample(sample_rate, seed=seed)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, batch_size: int = 500_000, **params) -> 'ApproxAnalyzer':
+        """Construye los sketches a partir de un DataFrame limpio"""
+        analyzer = cls(**params)
+        for start in range(0, len(df), batch_size):
+            analyzer.update(df.iloc[start:start + batch_size])
+        return analyzer
+
+    def update(self, batch: pd.DataFrame):
+        """Agrega un lote limpio (con TotalAmount) a todos los sketches"""
+        if not len(batch):
+            return self
+        amounts = batch['TotalAmount'].to_numpy(dtype=np.float64)
+        self.rows += len(batch)
+        self.total_sales += float(amounts.sum())
+        self.customers.add(batch['CustomerID'])
+        self.invoices.add(batch['Invoice'])
+        self.amounts.add(amounts)
+        self.products.add(batch['Description'], batch['Quantity'].to_numpy(dtype=np.float64))
+        self.countries.add(batch['Country'], amounts)
+        self.sample.update(batch)
+        return self
+
+    def merge(self, other: 'ApproxAnalyzer'):
+        """Combina los sketches de otro analizador con los mismos parámetros"""
+        if other.params != self.params:
+            raise ValueError("Solo se pueden combinar analizadores con los mismos parámetros")
+        self.rows += other.rows
+        self.total_sales += other.total_sales
+        self.customers.merge(other.customers)
+        self.invoices.merge(other.invoices)
+        self.amounts.merge(other.amounts)
+        self.products.merge(other.products)
+        self.countries.merge(other.countries)
+        self.sample.merge(other.sample)
+        return self
+
+    # ========== CONSULTAS ==========
+
+    def get_basic_stats(self) -> dict:
+        """Mismas claves que RetailAnalyzer.get_basic_stats (clientes aproximados) más facturas"""
+        return {
+            'total_sales': self.total_sales,
+            'avg_sale': self.total_sales / self.rows if self.rows else np.nan,
+            'total_customers': round(self.customers.estimate()),
+            'total_transactions': self.rows,
+            'total_invoices': round(self.invoices.estimate())
+        }
+
+    def quantile(self, q):
+        """Cuantil(es) aproximado(s) de TotalAmount"""
+        return self.amounts.quantile(q)
+
+    def top_products(self, top_n: int = 15) -> pd.Series:
+        """Top productos por cantidad vendida (estimada)"""
+        return self.products.top(top_n).rename_axis('Description').rename('Quantity')
+
+    def top_countries(self, top_n: int = 10) -> pd.Series:
+        """Top países por ventas (estimadas)"""
+        return self.countries.top(top_n).rename_axis('Country').rename('TotalAmount')
+
+    def estimate_total(self, column: str = 'TotalAmount', where=None) -> dict:
+        """Total filtrado estimado con la muestra estratificada (ver StratifiedSample)"""
+        return self.sample.estimate_total(column, where)
+
+    def sales_distribution(self) -> dict:
+        """
+        Histograma y boxplot de TotalAmount con la misma forma que
+        RetailVisualizer.aggregate_sales_distribution
+
+        Cuantiles, bigotes e histograma salen del t-digest; los atípicos de la muestra.
+        """
+        low, high = self.amounts.min, self.amounts.max
+        if not self.rows:
+            low = high = 0.0
+        edges = np.linspace(low, high, HISTOGRAM_BINS + 1)
+        cumulative = np.asarray(self.amounts.cdf(edges)) * self.rows if self.rows else np.zeros(len(edges))
+        cumulative[0], cumulative[-1] = 0, self.rows
+        counts = np.round(np.diff(cumulative)).astype(np.int64)
+
+        q1, median, q3, p95 = (self.amounts.quantile([0.25, 0.5, 0.75, 0.95]) if self.rows
+                               else np.zeros(4))
+        iqr = q3 - q1
+        whislo, whishi = max(low, q1 - 1.5 * iqr), min(high, q3 + 1.5 * iqr)
+
+        values = self.sample.rows['TotalAmount'].to_numpy(dtype=np.float64) if self.rows else np.empty(0)
+        fliers = np.unique(values[((values < whislo) | (values > whishi)) & (values <= p95)])
+        if len(fliers) > MAX_FLIERS:
+            fliers = fliers[np.linspace(0, len(fliers) - 1, MAX_FLIERS).astype(np.int64)]
+
+        return {
+            'hist_counts': counts,
+            'bin_edges': edges,
+            'p95': float(p95),
+            'box': {
+                'med': float(median), 'q1': float(q1), 'q3': float(q3),
+                'whislo': float(whislo), 'whishi': float(whishi),
+                'mean': self.total_sales / self.rows if self.rows else 0.0, 'fliers': fliers
+            }
+        }
+
+    # ========== SERIALIZACIÓN ==========
+
+    def save(self, path) -> Path:
+        """Guarda todos los sketches y la muestra en un archivo .npz (sin pickle)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        arrays = {'meta': np.array(json.dumps({
+            'params': self.params, 'rows': self.rows, 'total_sales': self.total_sales,
+            'population': {str(k): int(v) for k, v in self.sample.population.items()},
+            'sample_columns': list(self.sample.rows.columns)
+        }))}
+        for name in ('customers', 'invoices', 'amounts', 'products', 'countries'):
+            for key, value in getattr(self, name).state().items():
+                arrays[f'{name}.{key}'] = value
+        for column in self.sample.rows.columns:
+            values = self.sample.rows[column]
+            numeric = pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values)
+            arrays[f'sample.{column}'] = values.to_numpy() if numeric else values.to_numpy(dtype=str)
+
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path) -> 'ApproxAnalyzer':
+        """Carga sketches guardados con save()"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            analyzer = cls(**meta['params'])
+            analyzer.rows = meta['rows']
+            analyzer.total_sales = meta['total_sales']
+
+            def state(name):
+                prefix = f'{name}.'
+                return {k[len(prefix):]: data[k] for k in data.files if k.startswith(prefix)}
+
+            analyzer.customers = HyperLogLog.from_state(state('customers'))
+            analyzer.invoices = HyperLogLog.from_state(state('invoices'))
+            analyzer.amounts = TDigest.from_state(state('amounts'))
+            analyzer.products = HeavyHitters.from_state(state('products'))
+            analyzer.countries = HeavyHitters.from_state(state('countries'))
+
+            sample = state('sample')
+            analyzer.sample.rows = pd.DataFrame({c: sample[c] for c in meta['sample_columns']})
+            analyzer.sample.population = pd.Series(meta['population'], dtype=np.int64)
+        return analyzer
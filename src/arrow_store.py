@@ -0,0 +1,103 @@
+"""
+Dataset limpio compartido entre procesos mediante Arrow IPC mapeado en memoria.
+
+publish() escribe el DataFrame limpio como un archivo Feather v2 (Arrow IPC)
+sin compresión, con una sola porción por columna y las columnas de texto
+codificadas como diccionario. attach() lo abre con memory_map y lo convierte
+a pandas sin copiar los buffers numéricos ni los códigos de las categorías:
+cualquier número de procesos comparte una única copia física a través de la
+caché de páginas del sistema, y abrirlo toma milisegundos sin importar el
+número de filas.
+
+Los arreglos de un DataFrame adjuntado son de solo lectura (apuntan al
+archivo); las operaciones que crean columnas nuevas funcionan con normalidad.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ARROW_SUFFIX = '.arrow'
+
+
+def _to_arrow(df: pd.DataFrame):
+    """
+    Convierte el DataFrame a una tabla Arrow apta para adjuntar sin copias
+
+    - Texto y categorías → diccionario (las columnas mixtas se normalizan a texto)
+    - Numéricos → sin máscara de nulos (NaN se conserva como valor), de modo
+      que to_pandas puede reutilizar el buffer
+    """
+    import pyarrow as pa
+
+    arrays, names = [], []
+    for name in df.columns:
+        values = df[name]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = values.cat.categories
+            if categories.inferred_type != 'string':
+                values = values.cat.rename_categories(categories.astype(str))
+            array = pa.DictionaryArray.from_arrays(
+                pa.array(values.cat.codes.to_numpy(dtype=np.int32), mask=values.isna().to_numpy()),
+                pa.array(values.cat.categories.to_numpy(dtype=object), type=pa.string())
+            )
+        elif pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values):
+            # Invoice/StockCode mezclan números y texto al leer el Excel
+            values = values.where(values.isna(), values.astype(str))
+            array = pa.array(values.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+            array = array.dictionary_encode()
+        elif isinstance(values.dtype, pd.api.extensions.ExtensionDtype):
+            array = pa.array(values, from_pandas=True)
+        else:
+            array = pa.array(values.to_numpy())
+        arrays.append(array)
+        names.append(str(name))
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def publish(df: pd.DataFrame, path) -> Path:
+    """
+    Publica un DataFrame como archivo Arrow IPC sin compresión
+
+    La escritura es atómica (archivo temporal + reemplazo), así que los
+    procesos que adjunten durante una republicación ven la versión anterior
+    completa o la nueva.
+
+    Args:
+        df: DataFrame limpio
+        path: Ruta del archivo (.arrow)
+
+    Returns:
+        Ruta escrita
+    """
+    import pyarrow.feather as feather
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = _to_arrow(df.reset_index(drop=True))
+
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    # Una sola porción por columna: to_pandas puede exponer cada buffer sin concatenar
+    feather.write_feather(table, tmp_path, compression='uncompressed',
+                          chunksize=max(table.num_rows, 1))
+    tmp_path.replace(path)
+    return path
+
+
+def attach(path) -> pd.DataFrame:
+    """
+    Abre un dataset publicado sin copiarlo
+
+    Args:
+        path: Archivo escrito por publish()
+
+    Returns:
+        DataFrame cuyos arreglos numéricos y códigos de categoría apuntan al
+        archivo mapeado en memoria (solo lectura)
+    """
+    import pyarrow as pa
+
+    source = pa.memory_map(str(path), 'r')
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=False, zero_copy_only=False)
@@ -0,0 +1,161 @@
+"""
+Motor de limpieza por máscaras con registro de filas rechazadas.
+
+Cada regla de limpieza se evalúa como una máscara booleana vectorizada sobre
+el DataFrame crudo; las filas válidas se materializan una sola vez. Las filas
+rechazadas se guardan en una tabla compacta con el código de la primera regla
+que las descartó (Reason) y una bandera por cada regla que incumplen (Failed),
+de modo que las cancelaciones alimentan el análisis de la query 8 sin recargar
+los datos y los conteos por regla salen gratis.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .instrumentation import stage
+except ImportError:
+    from instrumentation import stage
+
+# Orden de aplicación: define la razón registrada y las etapas clean.<regla>
+RULES = ['dropna', 'cancelled', 'quantity', 'price']
+REASON_DTYPE = pd.CategoricalDtype(RULES)
+FLAGS = {rule: np.uint8(1 << bit) for bit, rule in enumerate(RULES)}
+
+# Columnas que conserva el registro de rechazos (sin Description, la más pesada)
+LEDGER_COLUMNS = ['Invoice', 'StockCode', 'Quantity', 'InvoiceDate', 'Price', 'CustomerID', 'Country']
+
+
+def _starts_with_c(values: pd.Series) -> np.ndarray:
+    """Marca los valores de texto que empiezan con 'C' (los no textuales quedan en False)"""
+    if pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'mixed', 'mixed-integer'):
+        # Solo números (p. ej. una hoja sin cancelaciones): .str no aplica
+        return np.zeros(len(values), dtype=bool)
+    # Las columnas leídas de Excel mezclan enteros y texto
+    return values.str.startswith('C', na=False).to_numpy(dtype=bool)
+
+
+def is_cancelled(df: pd.DataFrame) -> np.ndarray:
+    """
+    Marca las facturas canceladas (Invoice empieza con 'C') sin convertir la columna a texto
+
+    Usa IsCancelled si el esquema compacto ya separó la bandera.
+    """
+    if 'IsCancelled' in df.columns:
+        return df['IsCancelled'].to_numpy(dtype=bool)
+
+    invoice = df['Invoice']
+    if pd.api.types.is_numeric_dtype(invoice):
+        return np.zeros(len(invoice), dtype=bool)
+    if isinstance(invoice.dtype, pd.CategoricalDtype):
+        # Se evalúa una vez por categoría y se expande con los códigos
+        categories = _starts_with_c(pd.Series(invoice.cat.categories))
+        codes = invoice.cat.codes.to_numpy()
+        return np.where(codes >= 0, categories[codes], False)
+    return _starts_with_c(invoice)
+
+
+def _positive(values: pd.Series) -> np.ndarray:
+    return (values > 0).to_numpy(dtype=bool, na_value=False)
+
+
+def rule_masks(df: pd.DataFrame) -> dict:
+    """
+    Máscaras de validez por regla, evaluadas de forma independiente
+
+    Returns:
+        Dict regla -> arreglo bool (True = la fila cumple la regla)
+    """
+    return {
+        'dropna': (df['CustomerID'].notna() & df['Description'].notna()).to_numpy(dtype=bool),
+        'cancelled': ~is_cancelled(df),
+        'quantity': _positive(df['Quantity']),
+        'price': _positive(df['Price'])
+    }
+
+
+def clean_frame(df: pd.DataFrame, keep_rejected: bool = True):
+    """
+    Limpia un DataFrame (completo o un lote) en una sola materialización
+
+    Registra las etapas clean.<regla> con las filas que siguen vivas antes y
+    después de cada regla, igual que los filtros encadenados.
+
+    Args:
+        df: DataFrame crudo con las columnas requeridas
+        keep_rejected: Si es True construye también el registro de rechazos
+
+    Returns:
+        Tupla (DataFrame limpio con TotalAmount, DataFrame de rechazos o None)
+    """
+    failed = np.zeros(len(df), dtype=np.uint8)
+    alive = np.ones(len(df), dtype=bool)
+    rows_alive = len(df)
+    masks = rule_masks(df)
+    for rule in RULES:
+        with stage(f'clean.{rule}', rows_in=rows_alive) as s:
+            failed[~masks[rule]] |= FLAGS[rule]
+            alive &= masks[rule]
+            rows_alive = int(alive.sum())
+            s.rows_out = rows_alive
+
+    clean = df.take(np.flatnonzero(alive))
+    clean['TotalAmount'] = clean['Quantity'] * clean['Price']
+    if not pd.api.types.is_datetime64_any_dtype(clean['InvoiceDate']):
+        clean['InvoiceDate'] = pd.to_datetime(clean['InvoiceDate'])
+
+    if not keep_rejected:
+        return clean, None
+
+    positions = np.flatnonzero(~alive)
+    rejected = df[[c for c in LEDGER_COLUMNS if c in df.columns]].take(positions)
+    flags = failed[positions]
+    # Primera regla incumplida = bit menos significativo encendido
+    first = np.log2(flags & (~flags + np.uint8(1))).astype(np.int8) if len(flags) else np.empty(0, np.int8)
+    rejected['Reason'] = pd.Categorical.from_codes(first, dtype=REASON_DTYPE)
+    rejected['Failed'] = flags
+    return clean, rejected
+
+
+def rejection_counts(rejected: pd.DataFrame, first_only: bool = True) -> pd.Series:
+    """
+    Filas rechazadas por regla
+
+    Args:
+        rejected: Registro de rechazos de clean_frame
+        first_only: Si es True cuenta solo la primera regla (suma = filas rechazadas);
+            si es False cuenta cada regla incumplida
+
+    Returns:
+        Series indexada por regla (incluye las reglas sin rechazos)
+    """
+    if rejected is None or not len(rejected):
+        return pd.Series(0, index=pd.Index(RULES, name='Reason'), dtype=np.int64, name='Rows')
+    if first_only:
+        counts = rejected['Reason'].value_counts().reindex(RULES)
+    else:
+        flags = rejected['Failed'].to_numpy()
+        counts = pd.Series([int(np.count_nonzero(flags & FLAGS[rule])) for rule in RULES], index=RULES)
+    return counts.rename_axis('Reason').rename('Rows').astype(np.int64)
+
+
+def cancellations_by_month(rejected: pd.DataFrame) -> pd.DataFrame:
+    """
+    Análisis de cancelaciones por mes (equivalente a la query 8)
+
+    Cuenta todas las líneas canceladas, aunque además incumplan otra regla.
+
+    Returns:
+        DataFrame con YearMonth, TotalCancellations y CancelledValue
+    """
+    columns = ['YearMonth', 'TotalCancellations', 'CancelledValue']
+    if rejected is None or not len(rejected):
+        return pd.DataFrame(columns=columns)
+
+    cancelled = rejected[(rejected['Failed'].to_numpy() & FLAGS['cancelled']) > 0]
+    dates = pd.to_datetime(cancelled['InvoiceDate'])
+    value = (cancelled['Quantity'].astype(np.float64) * cancelled['Price'].astype(np.float64)).abs()
+    return (pd.DataFrame({'YearMonth': dates.dt.strftime('%Y-%m'), 'Value': value})
+            .groupby('YearMonth', sort=True)['Value']
+            .agg(TotalCancellations='size', CancelledValue='sum')
+            .reset_index())
@@ -0,0 +1,189 @@
+"""
+Línea de comandos del pipeline de retail: carga → limpieza → análisis → gráficos/exportación.
+
+Solo se ejecutan (y se importan) las etapas pedidas: un análisis sin gráficos
+no carga matplotlib y una exportación de datos limpios no carga el analizador.
+
+Uso:
+    python -m src data/online_retail_II.xlsx --stages load clean analyze
+    python -m src data/retail.parquet --stages load clean render --plots top_countries --format svg
+    python -m src data/retail.csv --stages load clean analyze export --output-dir reports/run
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+STAGES = ['load', 'clean', 'analyze', 'render', 'export']
+
+# Análisis disponibles: nombre → (método de RetailAnalyzer, argumentos)
+ANALYSES = {
+    'basic': ('get_basic_stats', {}),
+    'rfm': ('customer_rfm_segmentation', {'advanced': True}),
+    'top_customers': ('get_top_customers', {}),
+    'monthly': ('sales_by_month', {}),
+    'weekday': ('sales_by_day_of_week', {}),
+    'hourly': ('sales_by_hour', {}),
+    'peak': ('get_peak_sales_time', {}),
+    'cohorts': ('cohort_retention', {}),
+    'repeat': ('get_repeat_customers', {}),
+}
+DEFAULT_ANALYSES = ['basic', 'rfm', 'monthly', 'peak']
+
+# Igual que report_renderer.PLOT_TYPES, sin importar matplotlib para construir el parser
+PLOT_TYPES = ['sales_over_time', 'top_countries', 'top_products', 'sales_distribution']
+EXPORT_FORMATS = ('csv', 'parquet')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m src', description=__doc__.splitlines()[1])
+    parser.add_argument('data_path', help='Archivo de transacciones (.xlsx, .csv o .parquet)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=['load', 'clean', 'analyze'],
+                        help='Etapas a ejecutar (por defecto: load clean analyze)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Carga y limpia por lotes con memoria acotada')
+    parser.add_argument('--batch-size', type=int, default=None)
+    parser.add_argument('--cache-dir', help='Caché Parquet de las hojas Excel')
+    parser.add_argument('--optimize', action='store_true', help='Aplica el esquema compacto de tipos')
+    parser.add_argument('--analyses', nargs='+', choices=list(ANALYSES), default=DEFAULT_ANALYSES)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--plots', nargs='+', choices=PLOT_TYPES, default=PLOT_TYPES)
+    parser.add_argument('--format', default='png', choices=('png', 'svg', 'pdf'))
+    parser.add_argument('--export-format', default='parquet', choices=EXPORT_FORMATS)
+    parser.add_argument('--output-dir', default='reports')
+    return parser
+
+
+def _timed(timings: dict, name: str, func):
+    start = time.perf_counter()
+    result = func()
+    timings[name] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def _write_frame(data, path: Path, fmt: str) -> Path:
+    """Escribe un DataFrame o Series en CSV o Parquet"""
+    import pandas as pd
+
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    if isinstance(frame.index, pd.PeriodIndex):
+        frame = frame.set_axis(frame.index.astype(str))
+    path = path.with_suffix(f'.{fmt}')
+    if fmt == 'csv':
+        frame.to_csv(path)
+    else:
+        frame.columns = frame.columns.astype(str)
+        frame.to_parquet(path)
+    return path
+
+
+def _load_raw(loader, batch_size: int):
+    """Carga los datos crudos: Excel con load_data, CSV/Parquet en una sola concatenación"""
+    if loader.data_path.suffix.lower() in ('.xlsx', '.xlsm'):
+        return loader.load_data()
+    loader.df = loader.collect(loader.iter_batches(batch_size))
+    return loader.df
+
+
+def run(args) -> dict:
+    """
+    Ejecuta las etapas pedidas
+
+    Args:
+        args: Namespace de build_parser()
+
+    Returns:
+        Dict con df (limpio o crudo), results (análisis), outputs (archivos
+        escritos) y timings (segundos por etapa)
+    """
+    stages = set(args.stages)
+    # Cada etapa necesita los datos: load va implícito en las demás
+    stages.add('load')
+    if stages & {'analyze', 'render'}:
+        stages.add('clean')
+
+    try:
+        from .data_loader import RetailDataLoader, DEFAULT_BATCH_SIZE
+    except ImportError:
+        from data_loader import RetailDataLoader, DEFAULT_BATCH_SIZE
+
+    batch_size = args.batch_size or DEFAULT_BATCH_SIZE
+    output_dir = Path(args.output_dir)
+    loader = RetailDataLoader(args.data_path, cache_dir=args.cache_dir)
+    state = {'df': None, 'results': {}, 'outputs': [], 'timings': {}}
+    timings = state['timings']
+
+    if args.streaming and 'clean' in stages:
+        df = _timed(timings, 'load+clean',
+                    lambda: loader.load_clean_streaming(batch_size, keep_rejected=False))
+    else:
+        df = _timed(timings, 'load', lambda: _load_raw(loader, batch_size))
+        if 'clean' in stages:
+            df = _timed(timings, 'clean', lambda: loader.clean_data(optimize=args.optimize))
+    state['df'] = df
+    print(f"📦 Datos listos: {len(df):,} filas")
+
+    if 'analyze' in stages:
+        try:
+            from .analysis import RetailAnalyzer
+        except ImportError:
+            from analysis import RetailAnalyzer
+
+        analyzer = RetailAnalyzer(df, workers=args.workers)
+        for name in args.analyses:
+            method, kwargs = ANALYSES[name]
+            state['results'][name] = _timed(timings, f'analyze.{name}',
+                                            lambda: getattr(analyzer, method)(**kwargs))
+            print(f"✅ Análisis '{name}' completado")
+
+    if 'render' in stages:
+        try:
+            from .report_renderer import BatchRenderer
+        except ImportError:
+            from report_renderer import BatchRenderer
+
+        renderer = BatchRenderer(df, output_dir / 'plots', workers=args.workers)
+        report = _timed(timings, 'render', lambda: renderer.render(
+            [{'plot': plot, 'format': args.format} for plot in args.plots]))
+        state['outputs'].extend(report.loc[report['error'].isna(), 'path'])
+        for _, row in report[report['error'].notna()].iterrows():
+            print(f"⚠️ Error al dibujar {row['name']}: {row['error']}")
+        print(f"✅ {report['error'].isna().sum()} gráficos en {output_dir / 'plots'}")
+
+    if 'export' in stages:
+        def export():
+            output_dir.mkdir(parents=True, exist_ok=True)
+            name = 'clean' if 'clean' in stages else 'raw'
+            state['outputs'].append(str(_write_frame(df, output_dir / name, args.export_format)))
+            scalars = {}
+            for key, result in state['results'].items():
+                if isinstance(result, dict):
+                    scalars[key] = result
+                else:
+                    path = _write_frame(result, output_dir / key, args.export_format)
+                    state['outputs'].append(str(path))
+            if scalars:
+                path = output_dir / 'summary.json'
+                path.write_text(json.dumps(scalars, indent=2, default=str), encoding='utf-8')
+                state['outputs'].append(str(path))
+
+        _timed(timings, 'export', export)
+        print(f"✅ Exportación escrita en {output_dir}")
+
+    print("⚡ Tiempos: " + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items()))
+    return state
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not Path(args.data_path).exists():
+        print(f"⚠️ No existe el archivo {args.data_path}", file=sys.stderr)
+        return 2
+    run(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
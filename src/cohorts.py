@@ -0,0 +1,210 @@
+"""
+Análisis vectorizado de cohortes y recompra.
+
+Reduce las líneas a una fila por compra (cliente x factura) ordenada por
+cliente y fecha; a partir de ella asigna a cada cliente su mes de
+adquisición, construye las matrices cohorte x meses desde la adquisición
+(clientes activos, retención y ventas) y calcula los intervalos entre
+compras con np.diff sobre arreglos ordenados, sin llamadas Python por
+cliente. Incluye el equivalente de la query 6 (clientes recurrentes).
+"""
+
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400 * 10**9
+
+
+def _group_starts(sorted_keys: np.ndarray) -> np.ndarray:
+    """Bandera de inicio de grupo en un arreglo ordenado por clave"""
+    starts = np.ones(len(sorted_keys), dtype=bool)
+    starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    return starts
+
+
+def _months(dates_ns: np.ndarray) -> np.ndarray:
+    """Meses desde 1970-01 (mismo ordinal que Period 'M')"""
+    return dates_ns.view('datetime64[ns]').astype('datetime64[M]').astype(np.int64)
+
+
+def compute_purchases(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Una fila por compra (cliente x factura) a partir de las líneas limpias
+
+    Args:
+        df: DataFrame con CustomerID, Invoice, InvoiceDate y TotalAmount
+
+    Returns:
+        DataFrame con CustomerID, Invoice, InvoiceDate (primera línea de la
+        factura) y TotalAmount, ordenado por cliente y fecha
+    """
+    customer_codes, customers = pd.factorize(df['CustomerID'], sort=True)
+    invoice_codes, invoices = pd.factorize(df['Invoice'])
+    dates_ns = df['InvoiceDate'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    amounts = df['TotalAmount'].to_numpy(dtype=np.float64)
+
+    # Igual que groupby: las filas sin cliente no se consideran
+    valid = customer_codes >= 0
+    if not valid.all():
+        customer_codes, invoice_codes = customer_codes[valid], invoice_codes[valid]
+        dates_ns, amounts = dates_ns[valid], amounts[valid]
+
+    n_invoices = max(len(invoices), 1)
+    keys = customer_codes.astype(np.int64) * n_invoices + invoice_codes
+    order = np.argsort(keys, kind='stable')
+    starts = np.flatnonzero(_group_starts(keys[order]))
+
+    pair_keys = keys[order][starts]
+    purchase_dates = np.minimum.reduceat(dates_ns[order], starts) if len(starts) else dates_ns[:0]
+    purchase_amounts = np.add.reduceat(amounts[order], starts) if len(starts) else amounts[:0]
+    purchase_customers = pair_keys // n_invoices
+
+    by_date = np.lexsort((purchase_dates, purchase_customers))
+    return pd.DataFrame({
+        'CustomerID': customers.take(purchase_customers[by_date]),
+        'Invoice': invoices.take(pair_keys[by_date] % n_invoices),
+        'InvoiceDate': purchase_dates[by_date].view('datetime64[ns]'),
+        'TotalAmount': purchase_amounts[by_date]
+    })
+
+
+def _customer_groups(purchases: pd.DataFrame):
+    """Inicio de grupo y número de cliente (0..n-1) por compra"""
+    starts = _group_starts(pd.factorize(purchases['CustomerID'])[0])
+    return starts, np.cumsum(starts) - 1
+
+
+def cohort_matrices(purchases: pd.DataFrame) -> dict:
+    """
+    Matrices de cohortes mensuales
+
+    Args:
+        purchases: Resultado de compute_purchases
+
+    Returns:
+        Dict con:
+            sizes: Series de clientes adquiridos por cohorte
+            active: DataFrame cohorte x MonthsSinceAcquisition con clientes activos
+            retention: active dividido por el tamaño de la cohorte
+            revenue: DataFrame cohorte x MonthsSinceAcquisition con ventas
+    """
+    months = _months(purchases['InvoiceDate'].to_numpy(dtype='datetime64[ns]').view(np.int64))
+    starts, group = _customer_groups(purchases)
+    if not len(months):
+        empty = pd.DataFrame(index=pd.PeriodIndex([], freq='M', name='Cohort'),
+                             columns=pd.RangeIndex(0, name='MonthsSinceAcquisition'), dtype=np.float64)
+        return {'sizes': pd.Series(dtype=np.int64, index=empty.index, name='Customers'),
+                'active': empty, 'retention': empty, 'revenue': empty}
+
+    # Las compras de cada cliente están ordenadas por fecha: la primera define la cohorte
+    first_month = months[starts]
+    base = int(first_month.min())
+    n_cohorts = int(first_month.max()) - base + 1
+    n_offsets = int(months.max()) - base + 1
+
+    cohort = (first_month - base)[group]
+    offset = months - first_month[group]
+    cell = cohort * n_offsets + offset
+    shape = (n_cohorts, n_offsets)
+
+    # Un cliente cuenta una vez por mes: primera compra del cliente en cada mes
+    new_month = starts.copy()
+    new_month[1:] |= months[1:] != months[:-1]
+    active = np.bincount(cell[new_month], minlength=n_cohorts * n_offsets).reshape(shape)
+    revenue = np.bincount(cell, weights=purchases['TotalAmount'].to_numpy(dtype=np.float64),
+                          minlength=n_cohorts * n_offsets).reshape(shape)
+    sizes = active[:, 0]
+
+    present = np.flatnonzero(sizes)
+    index = pd.PeriodIndex.from_ordinals(base + present, freq='M').rename('Cohort')
+    columns = pd.RangeIndex(n_offsets, name='MonthsSinceAcquisition')
+    active, revenue, sizes = active[present], revenue[present], sizes[present]
+    return {
+        'sizes': pd.Series(sizes, index=index, name='Customers'),
+        'active': pd.DataFrame(active, index=index, columns=columns),
+        'retention': pd.DataFrame(active / sizes[:, None], index=index, columns=columns),
+        'revenue': pd.DataFrame(revenue, index=index, columns=columns)
+    }
+
+
+def purchase_intervals(purchases: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compras y días entre compras consecutivas por cliente
+
+    Args:
+        purchases: Resultado de compute_purchases
+
+    Returns:
+        DataFrame indexado por CustomerID con NumPurchases, FirstPurchase,
+        LastPurchase, MeanDaysBetween, MedianDaysBetween y MaxDaysBetween
+        (NaN para clientes con una sola compra)
+    """
+    dates_ns = purchases['InvoiceDate'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    starts, group = _customer_groups(purchases)
+    n_customers = int(group[-1]) + 1 if len(group) else 0
+    first = np.flatnonzero(starts)
+    last = np.append(first[1:], len(group)) - 1
+
+    # Intervalos entre compras del mismo cliente
+    gaps = np.diff(dates_ns) / NS_PER_DAY
+    same = ~starts[1:]
+    gaps, gap_group = gaps[same], group[1:][same]
+
+    counts = np.bincount(gap_group, minlength=n_customers)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(gap_group, weights=gaps, minlength=n_customers) / counts
+
+    # Mediana por cliente: ordenar (cliente, intervalo) y tomar las posiciones centrales
+    order = np.lexsort((gaps, gap_group))
+    sorted_gaps = gaps[order]
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]) if n_customers else counts
+    has_gaps = counts > 0
+    median = np.full(n_customers, np.nan)
+    lo = offsets[has_gaps] + (counts[has_gaps] - 1) // 2
+    hi = offsets[has_gaps] + counts[has_gaps] // 2
+    median[has_gaps] = (sorted_gaps[lo] + sorted_gaps[hi]) / 2
+    maximum = np.full(n_customers, np.nan)
+    maximum[has_gaps] = sorted_gaps[offsets[has_gaps] + counts[has_gaps] - 1]
+
+    return pd.DataFrame({
+        'NumPurchases': counts + 1,
+        'FirstPurchase': dates_ns[first].view('datetime64[ns]'),
+        'LastPurchase': dates_ns[last].view('datetime64[ns]'),
+        'MeanDaysBetween': mean,
+        'MedianDaysBetween': median,
+        'MaxDaysBetween': maximum
+    }, index=pd.Index(purchases['CustomerID'].to_numpy()[first], name='CustomerID'))
+
+
+def interval_distribution(purchases: pd.DataFrame) -> pd.Series:
+    """
+    Distribución de días (enteros) entre compras consecutivas de un mismo cliente
+
+    Returns:
+        Series con el número de intervalos por día, indexada por DaysBetween
+    """
+    dates_ns = purchases['InvoiceDate'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    starts, _ = _customer_groups(purchases)
+    days = (np.diff(dates_ns) // NS_PER_DAY)[~starts[1:]]
+    counts = np.bincount(days) if len(days) else np.zeros(0, dtype=np.int64)
+    return pd.Series(counts, index=pd.RangeIndex(len(counts), name='DaysBetween'), name='Intervals')
+
+
+def repeat_customers(intervals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Clientes recurrentes (equivalente a la query 6)
+
+    Args:
+        intervals: Resultado de purchase_intervals
+
+    Returns:
+        DataFrame con CustomerID, NumPurchases, FirstPurchase, LastPurchase y
+        DaysBetween (días de calendario) para clientes con más de una compra,
+        ordenado por NumPurchases descendente
+    """
+    repeat = intervals[intervals['NumPurchases'] > 1]
+    days = (repeat['LastPurchase'].dt.normalize() - repeat['FirstPurchase'].dt.normalize()).dt.days
+    return (repeat[['NumPurchases', 'FirstPurchase', 'LastPurchase']]
+            .assign(DaysBetween=days)
+            .sort_values('NumPurchases', ascending=False, kind='stable')
+            .reset_index())
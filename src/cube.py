@@ -0,0 +1,218 @@
+"""
+Cubo OLAP preagregado de ventas retail.
+
+Se construye una vez a partir del DataFrame limpio y guarda medidas aditivas
+(ingresos, cantidad, líneas) y sketches HyperLogLog de clientes y facturas
+distintos al grano mes x país x día de la semana x hora. Los roll-ups y
+filtros se responden sobre las celdas del cubo, sin tocar las transacciones.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .sketches import hash_keys, grouped_registers, merge_registers, hll_estimate
+    from .temporal_index import TemporalIndex, DAY_NAMES
+except ImportError:
+    from sketches import hash_keys, grouped_registers, merge_registers, hll_estimate
+    from temporal_index import TemporalIndex, DAY_NAMES
+
+DIMENSIONS = ['YearMonth', 'Country', 'Weekday', 'Hour']
+MEASURES = ['Revenue', 'Quantity', 'Lines']
+DEFAULT_PRECISION = 8
+
+
+class SalesCube:
+    """Cubo de ventas con medidas aditivas y conteos distintos aproximados"""
+
+    def __init__(self, cells: pd.DataFrame, customer_registers: np.ndarray,
+                 invoice_registers: np.ndarray, precision: int = DEFAULT_PRECISION):
+        """
+        Inicializa el cubo a partir de sus celdas
+
+        Args:
+            cells: DataFrame con DIMENSIONS + MEASURES (una fila por celda)
+            customer_registers: Registros HLL de clientes, uno por celda
+            invoice_registers: Registros HLL de facturas, uno por celda
+            precision: Precisión de los sketches HLL
+        """
+        self.cells = cells.reset_index(drop=True)
+        self.customer_registers = customer_registers
+        self.invoice_registers = invoice_registers
+        self.precision = precision
+
+    # ========== CONSTRUCCIÓN ==========
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, precision: int = DEFAULT_PRECISION) -> 'SalesCube':
+        """
+        Construye el cubo desde un DataFrame limpio
+
+        Args:
+            df: DataFrame con InvoiceDate, Country, CustomerID, Invoice,
+                Quantity y TotalAmount
+            precision: Precisión de los sketches HLL por celda
+
+        Returns:
+            SalesCube al grano más fino
+        """
+        index = TemporalIndex(df['InvoiceDate'])
+        keys = pd.DataFrame({
+            'YearMonth': index.month_base + index.month_code.astype(np.int64),
+            'Country': df['Country'].astype(str).to_numpy(),
+            'Weekday': index.weekday,
+            'Hour': index.hour
+        })
+
+        grouped = keys.groupby(DIMENSIONS, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        n_cells = grouped.ngroups
+
+        cells = grouped.size().reset_index(name='Lines')
+        cells['Revenue'] = np.bincount(codes, weights=df['TotalAmount'].to_numpy(dtype=np.float64),
+                                       minlength=n_cells)
+        cells['Quantity'] = np.bincount(codes, weights=df['Quantity'].to_numpy(dtype=np.float64),
+                                        minlength=n_cells).astype(np.int64)
+        cells = cls._compact(cells)
+
+        def registers_for(column):
+            values = df[column]
+            valid = values.notna().to_numpy()
+            return grouped_registers(codes[valid], n_cells, hash_keys(values), precision)
+
+        return cls(cells, registers_for('CustomerID'), registers_for('Invoice'), precision)
+
+    @staticmethod
+    def _compact(cells: pd.DataFrame) -> pd.DataFrame:
+        """Ordena columnas y usa tipos compactos para las dimensiones"""
+        cells = cells[DIMENSIONS + MEASURES].copy()
+        cells['YearMonth'] = cells['YearMonth'].astype(np.int32)
+        cells['Country'] = cells['Country'].astype('category')
+        cells['Weekday'] = cells['Weekday'].astype(np.int8)
+        cells['Hour'] = cells['Hour'].astype(np.int8)
+        cells['Lines'] = cells['Lines'].astype(np.int64)
+        return cells
+
+    def merge(self, other: 'SalesCube') -> 'SalesCube':
+        """
+        Combina dos cubos (ej. histórico + meses nuevos) en uno nuevo
+
+        Las medidas se suman y los sketches se combinan por celda.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Solo se pueden combinar cubos con la misma precisión")
+
+        keys = pd.concat([self.cells[DIMENSIONS], other.cells[DIMENSIONS]], ignore_index=True)
+        keys['Country'] = keys['Country'].astype(str)
+        grouped = keys.groupby(DIMENSIONS, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        n_cells = grouped.ngroups
+
+        cells = grouped.size().reset_index().drop(columns=0)
+        for measure in MEASURES:
+            values = np.concatenate([self.cells[measure].to_numpy(), other.cells[measure].to_numpy()])
+            cells[measure] = np.bincount(codes, weights=values.astype(np.float64), minlength=n_cells)
+        cells['Quantity'] = cells['Quantity'].astype(np.int64)
+
+        customers = merge_registers(codes, n_cells, np.vstack([self.customer_registers, other.customer_registers]))
+        invoices = merge_registers(codes, n_cells, np.vstack([self.invoice_registers, other.invoice_registers]))
+        return SalesCube(self._compact(cells), customers, invoices, self.precision)
+
+    def extend(self, df: pd.DataFrame) -> 'SalesCube':
+        """Incorpora nuevas transacciones al cubo (modifica el cubo actual)"""
+        merged = self.merge(SalesCube.from_frame(df, self.precision))
+        self.cells = merged.cells
+        self.customer_registers = merged.customer_registers
+        self.invoice_registers = merged.invoice_registers
+        return self
+
+    # ========== CONSULTAS ==========
+
+    def _filter_mask(self, filters: dict) -> np.ndarray:
+        """Máscara de celdas que cumplen los filtros"""
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, value in (filters or {}).items():
+            if dim not in DIMENSIONS:
+                raise KeyError(f"Dimensión desconocida: {dim}")
+            column = self.cells[dim]
+
+            if dim == 'YearMonth' and isinstance(value, tuple):
+                start, end = value
+                if start is not None:
+                    mask &= column.to_numpy() >= pd.Period(start, freq='M').ordinal
+                if end is not None:
+                    mask &= column.to_numpy() <= pd.Period(end, freq='M').ordinal
+                continue
+
+            values = value if isinstance(value, (list, set)) else [value]
+            if dim == 'YearMonth':
+                values = [pd.Period(v, freq='M').ordinal for v in values]
+            elif dim == 'Weekday':
+                values = [DAY_NAMES.index(v) if isinstance(v, str) else v for v in values]
+            mask &= column.isin(values).to_numpy()
+        return mask
+
+    def query(self, by=None, filters: dict = None) -> pd.DataFrame:
+        """
+        Roll-up del cubo por las dimensiones indicadas
+
+        Args:
+            by: Lista de dimensiones a conservar (None = total general)
+            filters: Dict dimensión -> valor, lista de valores o, para
+                YearMonth, una tupla (inicio, fin) inclusiva ('2010-01', '2010-06')
+
+        Returns:
+            DataFrame con Revenue, Quantity, Lines, Customers e Invoices
+            (estos dos últimos aproximados con HyperLogLog)
+        """
+        by = [by] if isinstance(by, str) else list(by or [])
+        mask = self._filter_mask(filters)
+        cells = self.cells[mask]
+        customer_regs = self.customer_registers[mask]
+        invoice_regs = self.invoice_registers[mask]
+
+        if by:
+            grouped = cells.groupby(by, sort=True, observed=True)
+            codes = grouped.ngroup().to_numpy()
+            result = grouped[MEASURES].sum()
+            n_groups = len(result)
+        else:
+            codes = np.zeros(len(cells), dtype=np.int64)
+            result = cells[MEASURES].sum().to_frame().T
+            n_groups = 1
+
+        result['Customers'] = np.rint(hll_estimate(merge_registers(codes, n_groups, customer_regs))).astype(np.int64)
+        result['Invoices'] = np.rint(hll_estimate(merge_registers(codes, n_groups, invoice_regs))).astype(np.int64)
+
+        if 'YearMonth' in by:
+            result = result.reset_index()
+            result['YearMonth'] = pd.PeriodIndex.from_ordinals(result['YearMonth'].to_numpy(dtype=np.int64), freq='M')
+            result = result.set_index(by)
+        return result
+
+    # ========== PERSISTENCIA ==========
+
+    def save(self, path):
+        """Guarda el cubo en un directorio (celdas en Parquet, sketches en .npz)"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self.cells.to_parquet(path / 'cells.parquet', index=False)
+        np.savez_compressed(
+            path / 'sketches.npz',
+            customers=self.customer_registers,
+            invoices=self.invoice_registers,
+            precision=self.precision
+        )
+
+    @classmethod
+    def load(cls, path) -> 'SalesCube':
+        """Carga un cubo guardado con save()"""
+        path = Path(path)
+        cells = pd.read_parquet(path / 'cells.parquet')
+        with np.load(path / 'sketches.npz') as sketches:
+            return cls(cells, sketches['customers'], sketches['invoices'], int(sketches['precision']))
+
+    def __len__(self):
+        return len(self.cells)
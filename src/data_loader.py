@@ -7,31 +7,65 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+try:
+    from .parquet_cache import ParquetSheetCache, normalize_mixed_columns
+    from .schema import optimize_dtypes, memory_usage_report
+    from .instrumentation import instrumented, stage, frame_rows
+    from .cleaning import clean_frame, rejection_counts, cancellations_by_month
+except ImportError:
+    from parquet_cache import ParquetSheetCache, normalize_mixed_columns
+    from schema import optimize_dtypes, memory_usage_report
+    from instrumentation import instrumented, stage, frame_rows
+    from cleaning import clean_frame, rejection_counts, cancellations_by_month
+
+REQUIRED_COLUMNS = {'CustomerID', 'Description', 'Invoice', 'Quantity', 'Price', 'InvoiceDate'}
+DEFAULT_BATCH_SIZE = 50_000
+
 class RetailDataLoader:
     """Clase para cargar, limpiar y resumir datos del dataset Online Retail II."""
 
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, cache_dir: str = None):
         """Inicializa el loader con la ruta del dataset
 
         Args:
             data_path: Ruta del archivo de datos
+            cache_dir: Directorio para la caché Parquet de las hojas (opcional)
         """
         self.data_path = Path(data_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
         self.df = None
+        self.memory_report = None
+        self.sketches = None
+        self.rejected = None
+
+    def _read_sheets(self):
+        """Genera tuplas (hoja, DataFrame), usando la caché Parquet si está configurada"""
+        if self.cache_dir is not None:
+            cache = ParquetSheetCache(self.data_path, self.cache_dir)
+            sheets = cache.load_sheets()
+            print(f"Hojas detectadas: {[name for name, _ in sheets]}")
+            if cache.last_rebuilt:
+                print(f"⚡ Caché Parquet actualizada para: {cache.last_rebuilt}")
+            else:
+                print("⚡ Datos leídos desde la caché Parquet")
+            yield from sheets
+            return
+
+        xls = pd.ExcelFile(self.data_path)
+        print(f"Hojas detectadas: {xls.sheet_names}")
+        for sheet in xls.sheet_names:
+            # Mismos tipos que las hojas leídas desde la caché Parquet
+            yield sheet, normalize_mixed_columns(pd.read_excel(xls, sheet_name=sheet))
 
+    @instrumented('loader.load_data')
     def load_data(self):
         """Carga el dataset desde archivo Excel, manejando múltiples hojas."""
         print(f"Cargando datos desde {self.data_path}...")
 
-        xls = pd.ExcelFile(self.data_path)
-        sheet_names = xls.sheet_names
-        print(f"Hojas detectadas: {sheet_names}")
-
         dfs = []
         reference_columns = None
 
-        for sheet in sheet_names:
-            df_sheet = pd.read_excel(xls, sheet_name=sheet)
+        for sheet, df_sheet in self._read_sheets():
             print(f"Hoja '{sheet}' cargada con {df_sheet.shape[0]} filas")
 
             # Registrar columnas de referencia
@@ -51,8 +85,27 @@ class RetailDataLoader:
 
         return self.df
 
-    def clean_data(self):
-        """Limpia el dataset eliminando valores inválidos"""
+    @staticmethod
+    def _validate_columns(df: pd.DataFrame):
+        """Valida que existan las columnas requeridas para la limpieza"""
+        missing = REQUIRED_COLUMNS - set(df.columns)
+        if missing:
+            raise KeyError(f"Faltan columnas en el dataset: {missing}")
+
+    @staticmethod
+    def _clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+        """Aplica los filtros de limpieza a un DataFrame (completo o un lote)"""
+        return clean_frame(df, keep_rejected=False)[0]
+
+    @instrumented('loader.clean_data', rows_in=frame_rows)
+    def clean_data(self, optimize: bool = False, sketches: bool = False):
+        """Limpia el dataset eliminando valores inválidos
+
+        Args:
+            optimize: Si es True aplica el esquema compacto de tipos
+                (categorías, int32 e Invoice numérico; los montos quedan en float64)
+            sketches: Si es True construye self.sketches (ApproxAnalyzer)
+        """
         if self.df is None:
             raise ValueError("Primero debe cargar los datos con load_data()")
 
@@ -60,33 +113,238 @@ class RetailDataLoader:
         initial_rows = len(self.df)
 
         # Validar columnas requeridas
-        required_cols = {'CustomerID', 'Description', 'Invoice', 'Quantity', 'Price', 'InvoiceDate'}
-        missing = required_cols - set(self.df.columns)
-        if missing:
-            raise KeyError(f"Faltan columnas en el dataset: {missing}")
-
-        # Eliminar filas con valores nulos en columnas críticas
-        self.df = self.df.dropna(subset=['CustomerID', 'Description'])
-
-        # Eliminar transacciones canceladas (Invoice empieza con 'C')
-        self.df = self.df[~self.df['Invoice'].astype(str).str.startswith('C')]
+        self._validate_columns(self.df)
 
-        # Eliminar cantidades y precios negativos
-        self.df = self.df[self.df['Quantity'] > 0]
-        self.df = self.df[self.df['Price'] > 0]
+        self.df, self.rejected = clean_frame(self.df)
 
-        # Crear columnas de monto total
-        self.df['TotalAmount'] = self.df['Quantity'] * self.df['Price']
+        if sketches:
+            try:
+                from .approx import ApproxAnalyzer
+            except ImportError:
+                from approx import ApproxAnalyzer
+            with stage('loader.build_sketches', rows_in=len(self.df)):
+                self.sketches = ApproxAnalyzer.from_frame(self.df)
 
-        # Convertir fecha a datetime
-        self.df['InvoiceDate'] = pd.to_datetime(self.df['InvoiceDate'])
+        if optimize:
+            # Ya no quedan cancelaciones: IsCancelled sería siempre False
+            compact = optimize_dtypes(self.df, cancel_flag=False)
+            self.memory_report = memory_usage_report(self.df, compact)
+            self.df = compact
+            total = self.memory_report.loc['Total']
+            print(f"Esquema compacto: {total['bytes_before'] / 1e6:.1f} MB → "
+                  f"{total['bytes_after'] / 1e6:.1f} MB ({total['reduction_pct']}% menos)")
 
         final_rows = len(self.df)
         print(f"Limpieza completada: {initial_rows - final_rows} filas eliminadas")
+        self._print_rejections()
         print(f"Dataset final: {final_rows} filas")
 
         return self.df
 
+    # ========== REGISTRO DE RECHAZOS ==========
+
+    def _print_rejections(self):
+        counts = rejection_counts(self.rejected)
+        if counts.sum():
+            print("Rechazos por regla: " + ", ".join(f"{rule}={n}" for rule, n in counts.items()))
+
+    def rejection_counts(self, first_only: bool = True) -> pd.Series:
+        """Filas rechazadas por regla en la última limpieza (ver cleaning.rejection_counts)"""
+        if self.rejected is None:
+            raise ValueError("No hay registro de rechazos: limpie con clean_data() "
+                             "o por lotes con keep_rejected=True")
+        return rejection_counts(self.rejected, first_only)
+
+    def cancellations_by_month(self) -> pd.DataFrame:
+        """Cancelaciones por mes (query 8) a partir del registro de rechazos"""
+        if self.rejected is None:
+            raise ValueError("No hay registro de rechazos: limpie con clean_data() "
+                             "o por lotes con keep_rejected=True")
+        return cancellations_by_month(self.rejected)
+
+    # ========== DATASET COMPARTIDO (ARROW IPC) ==========
+
+    @instrumented('loader.publish_arrow', rows_in=frame_rows)
+    def publish_arrow(self, path) -> Path:
+        """
+        Publica el DataFrame actual como archivo Arrow IPC mapeable (ver arrow_store)
+
+        Args:
+            path: Ruta del archivo .arrow
+
+        Returns:
+            Ruta escrita
+        """
+        if self.df is None:
+            raise ValueError("Primero debe cargar los datos")
+        try:
+            from .arrow_store import publish
+        except ImportError:
+            from arrow_store import publish
+
+        path = publish(self.df, path)
+        print(f"📦 Dataset publicado en {path} ({path.stat().st_size / 1e6:.1f} MB)")
+        return path
+
+    @instrumented('loader.attach_arrow')
+    def attach_arrow(self, path) -> pd.DataFrame:
+        """
+        Adjunta un dataset publicado sin copiarlo (memory map, solo lectura)
+
+        Args:
+            path: Archivo escrito por publish_arrow()
+
+        Returns:
+            DataFrame limpio compartido con los demás procesos que lo adjunten
+        """
+        try:
+            from .arrow_store import attach
+        except ImportError:
+            from arrow_store import attach
+
+        self.df = attach(path)
+        return self.df
+
+    # ========== MODO STREAMING (MEMORIA ACOTADA) ==========
+
+    def iter_batches(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Genera lotes crudos de tamaño fijo sin cargar el archivo completo
+
+        Soporta Excel (filas de openpyxl en modo solo lectura), CSV y Parquet.
+
+        Args:
+            batch_size: Número máximo de filas por lote
+
+        Yields:
+            DataFrame con un lote de filas sin limpiar
+        """
+        suffix = self.data_path.suffix.lower()
+        if suffix in ('.xlsx', '.xlsm'):
+            yield from self._iter_excel_batches(batch_size)
+        elif suffix == '.csv':
+            # Tipos fijos: cada chunk adivinaría el suyo y una misma factura
+            # quedaría como 102 en un lote y como '102' en otro
+            yield from pd.read_csv(self.data_path, chunksize=batch_size,
+                                   dtype={'Invoice': str, 'StockCode': str})
+        elif suffix == '.parquet':
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(self.data_path)
+            for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+                yield record_batch.to_pandas()
+        else:
+            raise ValueError(f"Formato no soportado para streaming: {suffix}")
+
+    def _iter_excel_batches(self, batch_size: int):
+        """Lee las hojas del libro fila a fila con openpyxl en modo solo lectura"""
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.data_path, read_only=True, data_only=True)
+        try:
+            reference_columns = None
+            for sheet in workbook.worksheets:
+                rows = sheet.iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None:
+                    continue
+
+                columns = list(header)
+                if reference_columns is None:
+                    reference_columns = columns
+                elif columns != reference_columns:
+                    print(f"⚠️ La hoja '{sheet.title}' tiene una estructura diferente. Se omitirá.")
+                    continue
+
+                buffer = []
+                for row in rows:
+                    if all(value is None for value in row):
+                        continue
+                    buffer.append(row)
+                    if len(buffer) == batch_size:
+                        yield pd.DataFrame.from_records(buffer, columns=columns)
+                        buffer = []
+                if buffer:
+                    yield pd.DataFrame.from_records(buffer, columns=columns)
+        finally:
+            workbook.close()
+
+    def iter_clean_batches(self, batch_size: int = DEFAULT_BATCH_SIZE, keep_rejected: bool = True):
+        """
+        Genera lotes ya limpios aplicando los filtros de clean_data por lote
+
+        Args:
+            batch_size: Número máximo de filas crudas por lote
+            keep_rejected: Si es False no se acumula el registro de rechazos
+                (self.rejected queda en None) y la memoria no crece con el
+                número de filas rechazadas
+
+        Yields:
+            DataFrame limpio con TotalAmount (se omiten los lotes vacíos)
+        """
+        initial_rows = 0
+        final_rows = 0
+        rejected = []
+        for batch in self.iter_batches(batch_size):
+            self._validate_columns(batch)
+            initial_rows += len(batch)
+            cleaned, batch_rejected = clean_frame(batch, keep_rejected=keep_rejected)
+            if keep_rejected:
+                rejected.append(batch_rejected)
+            final_rows += len(cleaned)
+            if len(cleaned):
+                yield cleaned
+
+        self.rejected = self.collect(rejected) if keep_rejected else None
+        print(f"Limpieza por lotes completada: {initial_rows - final_rows} filas eliminadas")
+        if keep_rejected:
+            self._print_rejections()
+
+    @staticmethod
+    def collect(batches) -> pd.DataFrame:
+        """
+        Construye el DataFrame final a partir de lotes con una única concatenación
+
+        Args:
+            batches: Iterable de DataFrames con las mismas columnas
+
+        Returns:
+            DataFrame combinado con índice continuo
+        """
+        batches = list(batches)
+        if not batches:
+            return pd.DataFrame()
+        return pd.concat(batches, ignore_index=True, copy=False)
+
+    @instrumented('loader.load_clean_streaming')
+    def load_clean_streaming(self, batch_size: int = DEFAULT_BATCH_SIZE, sketches: bool = False,
+                             keep_rejected: bool = True):
+        """Carga y limpia el dataset por lotes, con memoria pico acotada
+
+        Args:
+            batch_size: Número máximo de filas crudas por lote
+            sketches: Si es True construye self.sketches (ApproxAnalyzer) lote a lote
+            keep_rejected: Si es False no se guarda el registro de rechazos
+        """
+        print(f"Cargando datos por lotes de {batch_size} filas desde {self.data_path}...")
+        batches = self.iter_clean_batches(batch_size, keep_rejected=keep_rejected)
+        if sketches:
+            try:
+                from .approx import ApproxAnalyzer
+            except ImportError:
+                from approx import ApproxAnalyzer
+            self.sketches = ApproxAnalyzer()
+            batches = self._update_sketches(batches)
+        self.df = self.collect(batches)
+        print(f"Dataset final: {len(self.df)} filas")
+        return self.df
+
+    def _update_sketches(self, batches):
+        """Actualiza self.sketches con cada lote y lo deja pasar sin cambios"""
+        for batch in batches:
+            self.sketches.update(batch)
+            yield batch
+
     def get_summary(self):
         """Retorna resumen estadístico del dataset"""
         if self.df is None:
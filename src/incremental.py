@@ -0,0 +1,275 @@
+"""
+Pipeline incremental (solo anexar) para datos nuevos de retail.
+
+Cada lote mensual se limpia por separado y se combina con un estado
+persistido por cliente (última compra, facturas distintas, monto total) y con
+los agregados mensuales y por hora, sin volver a procesar filas históricas:
+los pares (cliente, factura) del lote se comparan contra un conjunto en
+memoria, y en disco solo se anexan los pares nuevos y se reescriben las
+particiones de clientes que cambiaron. Un lote idéntico a uno ya aplicado se
+omite, así que los resultados coinciden con recalcular todo sobre el
+dataset completo aunque se reintente un lote.
+"""
+
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .data_loader import RetailDataLoader
+    from .analysis import RetailAnalyzer
+    from .rfm import NS_PER_DAY
+except ImportError:
+    from data_loader import RetailDataLoader
+    from analysis import RetailAnalyzer
+    from rfm import NS_PER_DAY
+
+# Particiones del estado por cliente en disco (CustomerID % CUSTOMER_BUCKETS)
+CUSTOMER_BUCKETS = 16
+
+
+class IncrementalPipeline:
+    """Mantiene RFM y agregados temporales actualizados lote a lote"""
+
+    def __init__(self, state_dir: str = None):
+        """
+        Inicializa el pipeline, cargando el estado previo si existe
+
+        Args:
+            state_dir: Directorio donde se persiste el estado (opcional)
+        """
+        self.state_dir = Path(state_dir) if state_dir else None
+
+        self.customers = pd.DataFrame(
+            {'LastPurchase': pd.Series(dtype='datetime64[ns]'),
+             'Frequency': pd.Series(dtype='int64'),
+             'Monetary': pd.Series(dtype='float64')},
+            index=pd.Index([], dtype='float64', name='CustomerID')
+        )
+        self.monthly = pd.Series(dtype='float64', name='TotalAmount',
+                                 index=pd.PeriodIndex([], freq='M', name='InvoiceDate'))
+        self.hourly = pd.Series(dtype='float64', name='TotalAmount',
+                                index=pd.Index([], dtype=np.int32, name='InvoiceDate'))
+        self.max_date = None
+        self.batches_applied = 0
+        # Pares (CustomerID, Invoice) ya contados en Frequency
+        self._seen_pairs = set()
+        # Huellas de los lotes crudos ya aplicados
+        self._applied_batches = set()
+        self._changed_buckets = set()
+
+        if self.state_dir is not None and (self.state_dir / 'meta.parquet').exists():
+            self._load_state()
+
+    # ========== ACTUALIZACIÓN ==========
+
+    def apply_batch(self, raw_batch: pd.DataFrame) -> pd.DataFrame:
+        """
+        Limpia un lote nuevo y lo incorpora al estado
+
+        El costo depende solo del tamaño del lote y del número de clientes
+        que toca, no de la historia acumulada. Un lote con el mismo contenido
+        que uno ya aplicado se omite para no sumar dos veces sus montos.
+
+        Args:
+            raw_batch: Transacciones nuevas sin limpiar
+
+        Returns:
+            El lote limpio (vacío si el lote ya se había aplicado)
+        """
+        RetailDataLoader._validate_columns(raw_batch)
+        digest = _batch_digest(raw_batch)
+        if digest in self._applied_batches:
+            print(f"⚠️ Lote ya aplicado ({len(raw_batch)} filas): se omite")
+            return raw_batch.iloc[:0]
+
+        batch = RetailDataLoader._clean_frame(raw_batch)
+        print(f"Lote {self.batches_applied + 1}: {len(raw_batch)} filas → {len(batch)} filas limpias")
+
+        new_pairs = self._new_pairs(batch)
+        if len(batch):
+            self._merge_customers(batch, new_pairs)
+            self._merge_temporal(batch)
+            batch_max = batch['InvoiceDate'].max()
+            self.max_date = batch_max if self.max_date is None else max(self.max_date, batch_max)
+
+        self.batches_applied += 1
+        self._applied_batches.add(digest)
+        if self.state_dir is not None:
+            self._save_delta(new_pairs)
+        return batch
+
+    def _new_pairs(self, batch: pd.DataFrame) -> pd.DataFrame:
+        """Pares (CustomerID, Invoice) del lote que no se habían visto antes"""
+        pairs = pd.DataFrame({
+            'CustomerID': batch['CustomerID'].astype('float64').to_numpy(),
+            'Invoice': batch['Invoice'].astype(str).to_numpy(dtype=object)
+        }).drop_duplicates(ignore_index=True)
+
+        keys = list(zip(pairs['CustomerID'], pairs['Invoice']))
+        is_new = np.fromiter((key not in self._seen_pairs for key in keys), dtype=bool, count=len(keys))
+        self._seen_pairs.update(keys)
+        return pairs[is_new].reset_index(drop=True)
+
+    def _merge_customers(self, batch: pd.DataFrame, new_pairs: pd.DataFrame):
+        """Actualiza solo los clientes presentes en el lote"""
+        partial = batch.groupby('CustomerID').agg(
+            LastPurchase=('InvoiceDate', 'max'),
+            Monetary=('TotalAmount', 'sum')
+        )
+        partial.index = partial.index.astype('float64')
+        partial['Frequency'] = (new_pairs.groupby('CustomerID').size()
+                                .reindex(partial.index, fill_value=0).astype('int64'))
+
+        known = partial.index.isin(self.customers.index)
+        existing = partial[known]
+        if len(existing):
+            current = self.customers.loc[existing.index]
+            self.customers.loc[existing.index, 'LastPurchase'] = np.maximum(
+                current['LastPurchase'], existing['LastPurchase'])
+            self.customers.loc[existing.index, 'Frequency'] = current['Frequency'] + existing['Frequency']
+            self.customers.loc[existing.index, 'Monetary'] = current['Monetary'] + existing['Monetary']
+
+        added = partial.loc[~known, self.customers.columns]
+        if len(added):
+            self.customers = pd.concat([self.customers, added]) if len(self.customers) else added
+        self.customers.index.name = 'CustomerID'
+        self._changed_buckets.update(_bucket(partial.index).tolist())
+
+    def _merge_temporal(self, batch: pd.DataFrame):
+        """Suma los agregados mensuales y por hora del lote"""
+        batch_analyzer = RetailAnalyzer(batch, cache_size=0)
+        self.monthly = self.monthly.add(batch_analyzer.sales_by_month(), fill_value=0)
+        self.hourly = self.hourly.add(batch_analyzer.sales_by_hour(), fill_value=0)
+        self.monthly.name = self.hourly.name = 'TotalAmount'
+        self.monthly.index.name = self.hourly.index.name = 'InvoiceDate'
+
+    # ========== RESULTADOS ==========
+
+    def customer_rfm_segmentation(self, snapshot_date=None) -> pd.DataFrame:
+        """
+        Tabla RFM equivalente a RetailAnalyzer.customer_rfm_segmentation()
+
+        Args:
+            snapshot_date: Fecha de referencia (por defecto, último día + 1)
+        """
+        if self.max_date is None:
+            raise ValueError("Primero debe aplicar al menos un lote con apply_batch()")
+        if snapshot_date is None:
+            snapshot_date = self.max_date + pd.Timedelta(days=1)
+        snapshot_ns = pd.Timestamp(snapshot_date).value
+
+        customers = self.customers.sort_index()
+        last_ns = customers['LastPurchase'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+        rfm = pd.DataFrame({
+            'Recency': (snapshot_ns - last_ns) // NS_PER_DAY,
+            'Frequency': customers['Frequency'].to_numpy(dtype=np.int64),
+            'Monetary': customers['Monetary'].to_numpy()
+        }, index=customers.index)
+
+        return rfm.sort_values('Monetary', ascending=False, kind='stable')
+
+    def sales_by_month(self) -> pd.Series:
+        """Ventas acumuladas por mes"""
+        return self.monthly.sort_index().copy()
+
+    def sales_by_hour(self) -> pd.Series:
+        """Ventas acumuladas por hora del día"""
+        return self.hourly.sort_index().copy()
+
+    # ========== PERSISTENCIA ==========
+
+    def save(self):
+        """
+        Guarda el estado completo en state_dir como archivos Parquet
+
+        Compacta los pares de facturas anexados lote a lote en un solo archivo.
+        """
+        if self.state_dir is None:
+            raise ValueError("No se configuró state_dir para persistir el estado")
+        pairs_dir = self.state_dir / 'invoices'
+        pairs_dir.mkdir(parents=True, exist_ok=True)
+
+        pairs = pd.DataFrame(list(self._seen_pairs), columns=['CustomerID', 'Invoice'])
+        pairs.astype({'CustomerID': 'float64', 'Invoice': object}).to_parquet(
+            pairs_dir / 'compacted.tmp', index=False)
+        for part in pairs_dir.glob('part-*.parquet'):
+            part.unlink()
+        (pairs_dir / 'compacted.tmp').replace(pairs_dir / 'part-00000.parquet')
+
+        self._write_customers(range(CUSTOMER_BUCKETS))
+        self._changed_buckets = set()
+        self._write_summary()
+
+    def _save_delta(self, new_pairs: pd.DataFrame):
+        """Anexa los pares nuevos y reescribe solo las particiones de clientes que cambiaron"""
+        pairs_dir = self.state_dir / 'invoices'
+        pairs_dir.mkdir(parents=True, exist_ok=True)
+        if len(new_pairs):
+            new_pairs.to_parquet(pairs_dir / f'part-{self.batches_applied:05d}.parquet', index=False)
+
+        self._write_customers(sorted(self._changed_buckets))
+        self._changed_buckets = set()
+        # Agregados temporales y metadatos: a lo sumo unas decenas de filas
+        self._write_summary()
+
+    def _write_customers(self, buckets):
+        customers_dir = self.state_dir / 'customers'
+        customers_dir.mkdir(parents=True, exist_ok=True)
+        bucket_of = _bucket(self.customers.index)
+        for bucket in buckets:
+            self.customers[bucket_of == bucket].to_parquet(customers_dir / f'bucket-{bucket:02d}.parquet')
+
+    def _write_summary(self):
+        pd.DataFrame({
+            'YearMonth': self.monthly.index.astype(str),
+            'TotalAmount': self.monthly.to_numpy()
+        }).to_parquet(self.state_dir / 'monthly.parquet', index=False)
+        self.hourly.to_frame().to_parquet(self.state_dir / 'hourly.parquet')
+        pd.DataFrame({
+            'max_date': [self.max_date],
+            'batches_applied': [self.batches_applied]
+        }).to_parquet(self.state_dir / 'meta.parquet', index=False)
+        pd.DataFrame({'digest': sorted(self._applied_batches)}).to_parquet(
+            self.state_dir / 'batches.parquet', index=False)
+
+    def _load_state(self):
+        """Carga el estado persistido por save() y por cada lote"""
+        buckets = sorted((self.state_dir / 'customers').glob('bucket-*.parquet'))
+        if buckets:
+            self.customers = pd.concat([pd.read_parquet(path) for path in buckets])
+
+        for part in sorted((self.state_dir / 'invoices').glob('part-*.parquet')):
+            pairs = pd.read_parquet(part)
+            self._seen_pairs.update(zip(pairs['CustomerID'], pairs['Invoice']))
+
+        monthly = pd.read_parquet(self.state_dir / 'monthly.parquet')
+        self.monthly = pd.Series(
+            monthly['TotalAmount'].to_numpy(),
+            index=pd.PeriodIndex(monthly['YearMonth'], freq='M', name='InvoiceDate'),
+            name='TotalAmount'
+        )
+        self.hourly = pd.read_parquet(self.state_dir / 'hourly.parquet')['TotalAmount']
+
+        meta = pd.read_parquet(self.state_dir / 'meta.parquet')
+        max_date = meta['max_date'].iloc[0]
+        self.max_date = None if pd.isna(max_date) else max_date
+        self.batches_applied = int(meta['batches_applied'].iloc[0])
+
+        if (self.state_dir / 'batches.parquet').exists():
+            self._applied_batches = set(pd.read_parquet(self.state_dir / 'batches.parquet')['digest'])
+
+
+def _batch_digest(raw_batch: pd.DataFrame) -> str:
+    """Huella del contenido de un lote crudo (columnas y valores, sin el índice)"""
+    hasher = hashlib.sha256('\x1f'.join(map(str, raw_batch.columns)).encode('utf-8'))
+    hasher.update(pd.util.hash_pandas_object(raw_batch, index=False).to_numpy().tobytes())
+    return hasher.hexdigest()
+
+
+def _bucket(customer_ids: pd.Index) -> np.ndarray:
+    """Partición en disco de cada CustomerID"""
+    return np.mod(customer_ids.to_numpy(dtype=np.float64), CUSTOMER_BUCKETS).astype(np.int64)
@@ -0,0 +1,290 @@
+"""
+Instrumentación por etapas del pipeline de retail.
+
+Cada etapa (carga, cada filtro de limpieza, cada método del analizador,
+conexiones SQL) se mide con el context manager `stage()` o el decorador
+`instrumented()`. Se registran tiempo de pared, tiempo de CPU, incremento
+del pico de RSS y filas de entrada/salida. Los eventos se envían a sinks
+intercambiables: logging en JSON, archivo de texto Prometheus (textfile
+collector), colector en memoria para tests y un sink nulo.
+
+Sin sinks activos, `stage()` devuelve un objeto compartido sin efecto y los
+métodos decorados se llaman directamente, por lo que el costo es casi nulo.
+"""
+
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_sinks = []
+_enabled = False
+_local = threading.local()
+
+
+def _peak_rss() -> int:
+    """Pico de RSS del proceso en bytes (None si no se puede medir)"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta KiB; macOS reporta bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset
+    except (ImportError, AttributeError):
+        return None
+
+
+# ========== REGISTRO DE SINKS ==========
+
+def add_sink(sink):
+    """Registra un sink que recibirá todos los eventos"""
+    global _enabled
+    _sinks.append(sink)
+    _enabled = any(s.enabled for s in _sinks)
+    return sink
+
+
+def remove_sink(sink):
+    """Quita un sink registrado"""
+    global _enabled
+    if sink in _sinks:
+        _sinks.remove(sink)
+    _enabled = any(s.enabled for s in _sinks)
+
+
+def clear_sinks():
+    """Quita todos los sinks (la instrumentación queda desactivada)"""
+    global _enabled
+    _sinks.clear()
+    _enabled = False
+
+
+def _emit(event: dict):
+    for sink in list(_sinks):
+        if sink.enabled:
+            sink.emit(event)
+
+
+# ========== ETAPAS ==========
+
+class Stage:
+    """Etapa medida; asignar `rows_out` dentro del bloque para registrar filas de salida"""
+
+    def __init__(self, name: str, rows_in: int = None, **labels):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.labels = labels
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+
+        self._peak_rss = _peak_rss()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak_rss = _peak_rss()
+        _local.stack.pop()
+
+        _emit({
+            'stage': self.name,
+            'parent': self.parent,
+            'timestamp': time.time(),
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'peak_rss_delta_bytes': None if peak_rss is None else peak_rss - self._peak_rss,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'labels': self.labels,
+            'error': exc_type.__name__ if exc_type else None
+        })
+        return False
+
+
+class _NullStage:
+    """Etapa sin efecto usada cuando no hay sinks activos"""
+
+    rows_in = None
+    rows_out = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str, rows_in: int = None, **labels):
+    """
+    Context manager que mide una etapa
+
+    Ejemplo:
+        with stage('clean.drop_cancelled', rows_in=len(df)) as s:
+            df = df[...]
+            s.rows_out = len(df)
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return Stage(name, rows_in, **labels)
+
+
+def _row_count(value):
+    try:
+        return len(value) if not isinstance(value, dict) else None
+    except TypeError:
+        return None
+
+
+def instrumented(name: str = None, rows_in=None):
+    """
+    Decorador que mide cada llamada como una etapa
+
+    Args:
+        name: Nombre de la etapa (por defecto, Clase.método)
+        rows_in: Función (args, kwargs) -> filas de entrada (opcional)
+
+    Las filas de salida se toman de len() del resultado cuando aplica.
+    """
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Stage(stage_name, rows_in(args, kwargs) if rows_in else None) as current:
+                result = func(*args, **kwargs)
+                current.rows_out = _row_count(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def frame_rows(args, kwargs):
+    """rows_in para métodos de clases con self.df (None si aún no hay datos)"""
+    df = getattr(args[0], 'df', None)
+    return None if df is None else len(df)
+
+
+# ========== SINKS ==========
+
+class NullSink:
+    """Descarta los eventos; no activa la instrumentación"""
+
+    enabled = False
+
+    def emit(self, event: dict):
+        pass
+
+
+class MemorySink:
+    """Guarda los eventos en memoria (útil en tests)"""
+
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event: dict):
+        self.events.append(event)
+
+    def by_stage(self, name: str) -> list:
+        """Eventos de una etapa"""
+        return [e for e in self.events if e['stage'] == name]
+
+    def stages(self) -> list:
+        """Nombres de etapas en orden de finalización"""
+        return [e['stage'] for e in self.events]
+
+    def clear(self):
+        self.events = []
+
+
+class LoggingSink:
+    """Escribe cada evento como una línea JSON en un logger"""
+
+    enabled = True
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger('retail.instrumentation')
+        self.level = level
+
+    def emit(self, event: dict):
+        self.logger.log(self.level, json.dumps(event, default=str))
+
+
+class PrometheusTextfileSink:
+    """
+    Acumula métricas por etapa y reescribe un archivo .prom en cada evento
+
+    El formato es el del textfile collector de node_exporter.
+    """
+
+    enabled = True
+
+    def __init__(self, path, prefix: str = 'retail'):
+        self.path = Path(path)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: defaultdict(float))
+
+    def emit(self, event: dict):
+        with self._lock:
+            totals = self._totals[event['stage']]
+            totals['calls'] += 1
+            totals['errors'] += event['error'] is not None
+            totals['wall_seconds'] += event['wall_seconds']
+            totals['cpu_seconds'] += event['cpu_seconds']
+            totals['rows_in'] += event['rows_in'] or 0
+            totals['rows_out'] += event['rows_out'] or 0
+            totals['last_peak_rss_delta_bytes'] = event['peak_rss_delta_bytes'] or 0
+            self._write()
+
+    def _write(self):
+        metrics = [
+            ('calls', 'counter', 'Llamadas a la etapa'),
+            ('errors', 'counter', 'Llamadas que terminaron con excepción'),
+            ('wall_seconds', 'counter', 'Tiempo de pared acumulado'),
+            ('cpu_seconds', 'counter', 'Tiempo de CPU acumulado'),
+            ('rows_in', 'counter', 'Filas de entrada acumuladas'),
+            ('rows_out', 'counter', 'Filas de salida acumuladas'),
+            ('last_peak_rss_delta_bytes', 'gauge', 'Incremento del pico de RSS en la última llamada'),
+        ]
+        lines = []
+        for metric, kind, help_text in metrics:
+            full_name = f'{self.prefix}_stage_{metric}' + ('_total' if kind == 'counter' else '')
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} {kind}')
+            for stage_name, totals in sorted(self._totals.items()):
+                lines.append(f'{full_name}{{stage="{stage_name}"}} {totals[metric]:g}')
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        tmp_path.replace(self.path)
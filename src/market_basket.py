@@ -0,0 +1,241 @@
+"""
+Motor de análisis de canasta (market basket) para datos de retail.
+
+Reemplaza el self-join "productos comprados juntos" (query 7) por una
+matriz dispersa facturas x productos en formato CSR. Los pares se cuentan
+con un núcleo vectorizado equivalente al producto X^T X, opcionalmente
+repartido por fragmentos de facturas en varios procesos. Incluye minería de
+itemsets frecuentes tipo FP-growth y reglas de asociación con soporte,
+confianza y lift.
+"""
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+MAX_PAIRS_PER_SHARD = 5_000_000
+
+
+def _row_pairs(indptr: np.ndarray, indices: np.ndarray, n_items: int):
+    """
+    Cuenta los pares (a, b), a < b, de las filas de un fragmento CSR
+
+    Las filas se agrupan por longitud para generar todos los pares con
+    índices triangulares de NumPy, sin bucles Python por factura.
+
+    Returns:
+        Tupla (claves a * n_items + b, conteos) con claves únicas
+    """
+    lengths = np.diff(indptr)
+    keys = []
+    for length in np.unique(lengths[lengths >= 2]):
+        rows = np.flatnonzero(lengths == length)
+        items = indices[indptr[rows][:, None] + np.arange(length)]
+        first, second = np.triu_indices(length, k=1)
+        keys.append((items[:, first].astype(np.int64) * n_items + items[:, second]).ravel())
+
+    if not keys:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.unique(np.concatenate(keys), return_counts=True)
+
+
+def _merge_counts(parts):
+    """Combina listas de (claves, conteos) sumando los conteos por clave"""
+    keys = np.concatenate([k for k, _ in parts]) if parts else np.empty(0, dtype=np.int64)
+    counts = np.concatenate([c for _, c in parts]) if parts else np.empty(0, dtype=np.int64)
+    if not len(keys):
+        return keys, counts
+    order = np.argsort(keys, kind='stable')
+    keys, counts = keys[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], np.add.reduceat(counts, starts)
+
+
+def _mine_patterns(paths: dict, min_count: int, suffix: tuple, out: dict, max_len):
+    """
+    Crecimiento de patrones sobre caminos de prefijo comprimidos (FP-growth)
+
+    Args:
+        paths: Dict camino (tupla de ítems ordenados por frecuencia) -> conteo
+        min_count: Conteo mínimo de un itemset frecuente
+        suffix: Itemset condicionante actual
+        out: Dict de salida itemset -> conteo
+        max_len: Longitud máxima de los itemsets (None = sin límite)
+    """
+    support = defaultdict(int)
+    for path, count in paths.items():
+        for item in path:
+            support[item] += count
+
+    for item, count in support.items():
+        if count < min_count:
+            continue
+        itemset = (item,) + suffix
+        out[itemset] = count
+        if max_len is not None and len(itemset) >= max_len:
+            continue
+
+        # Base condicional: prefijos (ítems más frecuentes) de los caminos con `item`
+        conditional = defaultdict(int)
+        for path, path_count in paths.items():
+            if item in path:
+                prefix = path[:path.index(item)]
+                if prefix:
+                    conditional[prefix] += path_count
+        if conditional:
+            _mine_patterns(conditional, min_count, itemset, out, max_len)
+
+
+class MarketBasket:
+    """Matriz dispersa facturas x productos con conteo de pares e itemsets"""
+
+    def __init__(self, df: pd.DataFrame, item_col: str = 'Description', invoice_col: str = 'Invoice'):
+        """
+        Codifica las facturas del DataFrame limpio como matriz CSR binaria
+
+        Args:
+            df: DataFrame limpio (ej. de RetailDataLoader.clean_data())
+            item_col: Columna de producto
+            invoice_col: Columna de factura
+        """
+        invoice_codes, self.invoices = pd.factorize(df[invoice_col])
+        item_codes, self.products = pd.factorize(df[item_col], sort=True)
+        valid = (invoice_codes >= 0) & (item_codes >= 0)
+
+        # Ordenar por factura y producto y eliminar líneas repetidas: matriz binaria
+        keys = np.unique(invoice_codes[valid].astype(np.int64) * len(self.products)
+                         + item_codes[valid])
+        rows = keys // len(self.products)
+        self.indices = (keys % len(self.products)).astype(np.int32)
+
+        self.n_invoices = len(self.invoices)
+        self.indptr = np.zeros(self.n_invoices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.n_invoices), out=self.indptr[1:])
+
+    @property
+    def n_products(self) -> int:
+        return len(self.products)
+
+    def item_counts(self) -> np.ndarray:
+        """Número de facturas que contienen cada producto"""
+        return np.bincount(self.indices, minlength=self.n_products)
+
+    def _shards(self):
+        """Límites de filas para que cada fragmento genere a lo sumo MAX_PAIRS_PER_SHARD pares"""
+        lengths = np.diff(self.indptr)
+        cumulative = np.cumsum(lengths * (lengths - 1) // 2)
+        bounds = [0]
+        while bounds[-1] < self.n_invoices:
+            done = cumulative[bounds[-1] - 1] if bounds[-1] else 0
+            end = int(np.searchsorted(cumulative, done + MAX_PAIRS_PER_SHARD, side='right'))
+            bounds.append(max(end, bounds[-1] + 1))
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def pair_counts(self, min_count: int = 1, top: int = None, workers: int = 1) -> pd.DataFrame:
+        """
+        Cuenta en cuántas facturas aparece cada par de productos (X^T X)
+
+        A diferencia del self-join de la query 7, cada factura cuenta una vez
+        por par aunque el producto aparezca en varias líneas.
+
+        Args:
+            min_count: Conteo mínimo para reportar el par
+            top: Número máximo de pares a retornar (los más frecuentes)
+            workers: Procesos para repartir los fragmentos de facturas
+
+        Returns:
+            DataFrame con Product1, Product2 (Product1 < Product2) y TimesBoughtTogether
+        """
+        shards = [(self.indptr[start:end + 1] - self.indptr[start],
+                   self.indices[self.indptr[start]:self.indptr[end]],
+                   self.n_products)
+                  for start, end in self._shards()]
+
+        if workers > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parts = list(executor.map(_row_pairs, *zip(*shards)))
+        else:
+            parts = [_row_pairs(*shard) for shard in shards]
+
+        keys, counts = _merge_counts(parts)
+        keep = counts >= min_count
+        keys, counts = keys[keep], counts[keep]
+
+        order = np.lexsort((keys, -counts))
+        if top is not None:
+            order = order[:top]
+
+        return pd.DataFrame({
+            'Product1': self.products[keys[order] // self.n_products],
+            'Product2': self.products[keys[order] % self.n_products],
+            'TimesBoughtTogether': counts[order]
+        })
+
+    def frequent_itemsets(self, min_support: float = 0.01, max_len: int = None) -> pd.DataFrame:
+        """
+        Itemsets frecuentes con crecimiento de patrones tipo FP-growth
+
+        Args:
+            min_support: Fracción mínima de facturas que contienen el itemset
+            max_len: Tamaño máximo de itemset (None = sin límite)
+
+        Returns:
+            DataFrame con itemsets (tupla de productos), count y support
+        """
+        min_count = max(1, int(np.ceil(min_support * self.n_invoices)))
+        item_support = self.item_counts()
+
+        # Orden global: de más a menos frecuente (como la tabla de cabecera del FP-tree)
+        frequent = np.flatnonzero(item_support >= min_count)
+        rank = np.full(self.n_products, -1, dtype=np.int64)
+        rank[frequent[np.argsort(-item_support[frequent], kind='stable')]] = np.arange(len(frequent))
+
+        # Caminos comprimidos: facturas idénticas (tras filtrar) se combinan
+        paths = defaultdict(int)
+        item_rank = rank[self.indices]
+        for row in range(self.n_invoices):
+            ranks = item_rank[self.indptr[row]:self.indptr[row + 1]]
+            ranks = np.sort(ranks[ranks >= 0])
+            if len(ranks):
+                paths[tuple(ranks.tolist())] += 1
+
+        found = {}
+        _mine_patterns(paths, min_count, (), found, max_len)
+
+        by_rank = np.empty(len(frequent), dtype=np.int64)
+        by_rank[rank[frequent]] = frequent
+        itemsets = [tuple(sorted(self.products[by_rank[list(k)]])) for k in found]
+        result = pd.DataFrame({'itemsets': itemsets, 'count': list(found.values())})
+        result['support'] = result['count'] / self.n_invoices
+        result['length'] = result['itemsets'].str.len()
+        return result.sort_values(['length', 'count'], ascending=[True, False], ignore_index=True)
+
+    def association_rules(self, min_support: float = 0.01, min_confidence: float = 0.0,
+                          min_lift: float = 0.0, max_len: int = None) -> pd.DataFrame:
+        """
+        Reglas de asociación antecedente → consecuente
+
+        Returns:
+            DataFrame con antecedents, consequents, support, confidence y lift
+        """
+        itemsets = self.frequent_itemsets(min_support, max_len)
+        support = dict(zip(itemsets['itemsets'], itemsets['support']))
+
+        rules = []
+        for itemset, itemset_support in support.items():
+            if len(itemset) < 2:
+                continue
+            for size in range(1, len(itemset)):
+                for antecedent in combinations(itemset, size):
+                    consequent = tuple(i for i in itemset if i not in antecedent)
+                    confidence = itemset_support / support[antecedent]
+                    lift = confidence / support[consequent]
+                    if confidence >= min_confidence and lift >= min_lift:
+                        rules.append((antecedent, consequent, itemset_support, confidence, lift))
+
+        return pd.DataFrame(
+            rules, columns=['antecedents', 'consequents', 'support', 'confidence', 'lift']
+        ).sort_values('lift', ascending=False, ignore_index=True)
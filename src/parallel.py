@@ -0,0 +1,238 @@
+"""
+Ejecución paralela de las agregaciones de RetailAnalyzer.
+
+Las columnas necesarias se copian tal cual (sin reordenar) a memoria
+compartida, y cada proceso del pool elige y codifica sus propias filas, de
+modo que el proceso principal no hace ninguna pasada serial de factorize ni
+de ordenamiento sobre el DataFrame completo:
+
+- RFM: partición por hash del CustomerID crudo (valor % particiones); cada
+  proceso factoriza solo sus clientes y reutiliza rfm_kernel.
+- Temporal: partición por rangos de meses; cada proceso suma solo las filas
+  de sus meses con bincount por mes, día de la semana y hora.
+
+Las filas de cada partición conservan su orden original, por lo que los
+resultados por cliente y por mes son idénticos a los del modo serial.
+
+El modo paralelo es opcional (workers > 1): con pocos núcleos o DataFrames
+medianos el costo de copiar a memoria compartida y levantar el pool supera la
+ganancia. Medir el punto de cruce en la máquina destino con
+benchmarks/bench_parallel.py antes de activarlo.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .rfm import rfm_kernel, rfm_frame
+    from .temporal_index import TemporalIndex
+except ImportError:
+    from rfm import rfm_kernel, rfm_frame
+    from temporal_index import TemporalIndex
+
+
+class SharedArrays:
+    """Arreglos NumPy en bloques de memoria compartida, adjuntables por nombre"""
+
+    def __init__(self):
+        self._blocks = []
+        self.spec = {}
+
+    def put(self, name: str, values: np.ndarray):
+        """
+        Copia un arreglo a un bloque compartido
+
+        Args:
+            name: Nombre con el que los procesos lo adjuntan
+            values: Arreglo de origen
+        """
+        values = np.asarray(values)
+        shape = values.shape
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * values.itemsize))
+        self._blocks.append(shm)
+        self.spec[name] = (shm.name, shape, values.dtype.str)
+
+        target = np.ndarray(shape, dtype=values.dtype, buffer=shm.buf)
+        target[...] = values
+        del target
+
+    def close(self):
+        """Libera y elimina todos los bloques"""
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _run_attached(spec: dict, kernel, *args):
+    """Adjunta los bloques compartidos en el proceso hijo y ejecuta `kernel`"""
+    blocks = {name: shared_memory.SharedMemory(name=shm_name) for name, (shm_name, _, _) in spec.items()}
+    try:
+        arrays = {
+            name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[name].buf)
+            for name, (_, shape, dtype) in spec.items()
+        }
+        return kernel(arrays, *args)
+    finally:
+        arrays = None
+        for shm in blocks.values():
+            try:
+                shm.close()
+            except BufferError:
+                pass
+
+
+def _run_partitions(spec: dict, kernel, tasks: list, workers: int) -> list:
+    """Ejecuta `kernel` por partición en un pool de procesos"""
+    if workers <= 1 or len(tasks) <= 1:
+        return [_run_attached(spec, kernel, *task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        futures = [executor.submit(_run_attached, spec, kernel, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+# ========== RFM POR HASH DE CLIENTE ==========
+
+def _customer_values(customers: pd.Series):
+    """
+    CustomerID como float64 (NaN = sin cliente) apto para memoria compartida
+
+    Returns:
+        Tupla (valores por fila, función que convierte los valores únicos en el índice final)
+    """
+    if pd.api.types.is_numeric_dtype(customers) and not isinstance(customers.dtype, pd.CategoricalDtype):
+        values = customers.to_numpy(dtype=np.float64, na_value=np.nan)
+        return values, lambda unique: pd.Index(unique).astype(customers.dtype)
+
+    # Texto o categorías: se codifican aquí (caso poco común en datos limpios)
+    codes, uniques = pd.factorize(customers, sort=True)
+    values = np.where(codes >= 0, codes, np.nan)
+    return values, lambda unique: pd.Index(uniques.take(unique.astype(np.int64)))
+
+
+def _invoice_codes(invoices: pd.Series):
+    """
+    Códigos enteros no negativos de Invoice
+
+    Las categorías y los números (esquema compacto) se usan sin costo; el
+    texto requiere un factorize.
+
+    Returns:
+        Tupla (códigos por fila, número de códigos)
+    """
+    if isinstance(invoices.dtype, pd.CategoricalDtype):
+        return invoices.cat.codes.to_numpy(), len(invoices.cat.categories)
+    if pd.api.types.is_integer_dtype(invoices) and not invoices.hasnans:
+        values = invoices.to_numpy()
+        if len(values) and values.min() >= 0:
+            return values, int(values.max()) + 1
+    codes, uniques = pd.factorize(invoices)
+    return codes, len(uniques)
+
+
+def _rfm_partition(arrays, part, n_parts, n_invoices):
+    customers = arrays['customer']
+    # NaN % n_parts es NaN y nunca coincide: las filas sin cliente se descartan solas
+    rows = np.flatnonzero(np.mod(customers, n_parts) == part)
+    codes, unique = pd.factorize(customers[rows], sort=True)
+    last_date, frequency, monetary = rfm_kernel(
+        codes, arrays['invoice'][rows], arrays['date'][rows], arrays['amount'][rows],
+        len(unique), n_invoices
+    )
+    return unique, last_date, frequency, monetary
+
+
+def parallel_rfm(df: pd.DataFrame, workers: int, snapshot_date=None) -> pd.DataFrame:
+    """
+    Tabla RFM calculada en paralelo; mismo resultado que compute_rfm
+
+    Args:
+        df: DataFrame con CustomerID, Invoice, InvoiceDate y TotalAmount
+        workers: Número de procesos (y de particiones por cliente)
+        snapshot_date: Fecha de referencia (por defecto, último día + 1)
+    """
+    customers, make_index = _customer_values(df['CustomerID'])
+    invoice_codes, n_invoices = _invoice_codes(df['Invoice'])
+    n_parts = max(1, workers)
+
+    with SharedArrays() as shared:
+        shared.put('customer', customers)
+        shared.put('invoice', invoice_codes)
+        shared.put('date', df['InvoiceDate'].to_numpy(dtype='datetime64[ns]').view(np.int64))
+        shared.put('amount', df['TotalAmount'].to_numpy(dtype=np.float64))
+
+        tasks = [(p, n_parts, n_invoices) for p in range(n_parts)]
+        partials = _run_partitions(shared.spec, _rfm_partition, tasks, workers)
+
+    # Unir las particiones (una fila por cliente) en el orden de factorize(sort=True)
+    unique, last_date, frequency, monetary = (np.concatenate(arrays) for arrays in zip(*partials))
+    order = np.argsort(unique, kind='stable')
+
+    if snapshot_date is None:
+        snapshot_date = df['InvoiceDate'].max() + pd.Timedelta(days=1)
+
+    return rfm_frame(make_index(unique[order]), last_date[order], frequency[order],
+                     monetary[order], snapshot_date)
+
+
+# ========== AGREGADOS TEMPORALES POR RANGO DE MESES ==========
+
+def _temporal_partition(arrays, month_part, part, n_months):
+    rows = np.flatnonzero(month_part[arrays['month']] == part)
+    amounts = arrays['amount'][rows]
+    totals = {}
+    for key, size in (('month', n_months), ('weekday', 7), ('hour', 24)):
+        keys = arrays[key][rows]
+        totals[key] = (np.bincount(keys, weights=amounts, minlength=size),
+                       np.bincount(keys, minlength=size))
+    return totals
+
+
+def month_ranges(month_code: np.ndarray, n_months: int, n_parts: int) -> np.ndarray:
+    """
+    Partición de cada mes para repartir las filas en rangos de meses contiguos
+
+    Returns:
+        Arreglo con el número de partición (0..n_parts-1) de cada mes
+    """
+    cumulative = np.cumsum(np.bincount(month_code, minlength=n_months))
+    targets = cumulative[-1] * np.arange(1, n_parts) / n_parts if len(cumulative) else []
+    return np.searchsorted(np.asarray(targets), cumulative, side='left').astype(np.int16)
+
+
+def parallel_temporal(index: TemporalIndex, amounts: np.ndarray, workers: int) -> dict:
+    """
+    Sumas y conteos por mes, día de la semana y hora calculados en paralelo
+
+    Cada mes queda completo en una sola partición; los totales por día y hora
+    se obtienen sumando los parciales.
+
+    Returns:
+        Dict {'month' | 'weekday' | 'hour': (sumas, conteos)}
+    """
+    n_parts = max(1, min(workers, index.n_months))
+    # Solo n_months valores: el reparto por filas lo hace cada proceso
+    month_part = month_ranges(index.month_code, index.n_months, n_parts)
+
+    with SharedArrays() as shared:
+        shared.put('amount', np.asarray(amounts, dtype=np.float64))
+        shared.put('month', index.month_code)
+        shared.put('weekday', index.weekday)
+        shared.put('hour', index.hour)
+
+        tasks = [(month_part, p, index.n_months) for p in range(n_parts)]
+        partials = _run_partitions(shared.spec, _temporal_partition, tasks, workers)
+
+    return {
+        key: (sum(p[key][0] for p in partials), sum(p[key][1] for p in partials))
+        for key in ('month', 'weekday', 'hour')
+    }
@@ -0,0 +1,269 @@
+"""
+Análisis out-of-core sobre un dataset Parquet particionado.
+
+ParquetAnalyzer expone la misma API que RetailAnalyzer pero recorre el
+dataset por lotes con pyarrow.dataset: solo se leen las columnas que cada
+método necesita, los filtros se empujan al escaneo (se descartan row groups
+y particiones completas) y cada lote se reduce a agregados parciales que se
+combinan al final. La memoria depende del tamaño del lote y del número de
+clientes/facturas/meses, no del número de filas.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .rfm import rfm_frame, add_rfm_scores
+    from .temporal_index import DAY_NAMES, NS_PER_HOUR
+except ImportError:
+    from rfm import rfm_frame, add_rfm_scores
+    from temporal_index import DAY_NAMES, NS_PER_HOUR
+
+DEFAULT_BATCH_SIZE = 131_072
+
+# Cada cuántos lotes se compactan las tablas parciales de clientes
+MERGE_EVERY = 16
+
+
+def _add_totals(total: np.ndarray, partial: np.ndarray) -> np.ndarray:
+    """Suma dos arreglos de totales por clave, rellenando el más corto con ceros"""
+    if len(partial) > len(total):
+        total, partial = partial, total
+    total = total.copy()
+    total[:len(partial)] += partial
+    return total
+
+
+def _invoice_keys(invoices: pd.Series) -> np.ndarray:
+    """Clave int64 por factura, consistente entre lotes del mismo dataset"""
+    if isinstance(invoices.dtype, pd.CategoricalDtype):
+        invoices = invoices.astype(invoices.cat.categories.dtype)
+    if pd.api.types.is_numeric_dtype(invoices.dtype):
+        return invoices.to_numpy(dtype=np.int64)
+    return pd.util.hash_array(invoices.astype(str).to_numpy(dtype=object)).view(np.int64)
+
+
+class ParquetAnalyzer:
+    """Analizador retail sobre un dataset Parquet que no cabe en memoria"""
+
+    def __init__(self, path, filter=None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Inicializa el analizador
+
+        Args:
+            path: Archivo o directorio Parquet (particiones estilo hive)
+            filter: Expresión pyarrow.dataset aplicada a todos los escaneos
+            batch_size: Filas máximas por lote leído
+        """
+        import pyarrow.dataset as ds
+
+        self.path = path
+        self.dataset = ds.dataset(path, format='parquet', partitioning='hive')
+        self.filter = filter
+        self.batch_size = batch_size
+        self.version = "3.0.0"
+        self.analysis_date = datetime.now()
+        self._max_date = None
+
+    @staticmethod
+    def write_dataset(df: pd.DataFrame, path, partition_cols=('Year',),
+                      max_rows_per_group: int = DEFAULT_BATCH_SIZE):
+        """
+        Escribe un DataFrame limpio como dataset Parquet particionado
+
+        Si se pide la partición 'Year' y no existe, se deriva de InvoiceDate.
+        Puede llamarse varias veces sobre el mismo directorio (un archivo por llamada).
+        """
+        import uuid
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if 'Year' in partition_cols and 'Year' not in df.columns:
+            df = df.assign(Year=df['InvoiceDate'].dt.year.astype(np.int32))
+
+        ds.write_dataset(
+            pa.Table.from_pandas(df, preserve_index=False), path,
+            format='parquet', partitioning=list(partition_cols), partitioning_flavor='hive',
+            basename_template=f'part-{uuid.uuid4().hex}-{{i}}.parquet',
+            max_rows_per_group=max_rows_per_group, min_rows_per_group=min(max_rows_per_group, 1024),
+            existing_data_behavior='overwrite_or_ignore'
+        )
+
+    def where(self, filter) -> 'ParquetAnalyzer':
+        """Retorna un analizador restringido además por `filter` (ej. un país o rango de fechas)"""
+        combined = filter if self.filter is None else self.filter & filter
+        return ParquetAnalyzer(self.path, filter=combined, batch_size=self.batch_size)
+
+    def _scan(self, columns: list, filter=None):
+        """Itera lotes pandas con solo `columns`, empujando los filtros al escaneo"""
+        if self.filter is not None:
+            filter = self.filter if filter is None else self.filter & filter
+        scanner = self.dataset.scanner(columns=columns, filter=filter, batch_size=self.batch_size)
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    # ========== ESTADÍSTICAS BÁSICAS ==========
+
+    def get_basic_stats(self):
+        """Retorna estadísticas básicas del dataset"""
+        total_sales, rows = 0.0, 0
+        customers = np.empty(0)
+        for batch in self._scan(['TotalAmount', 'CustomerID']):
+            total_sales += batch['TotalAmount'].sum()
+            rows += len(batch)
+            customers = np.union1d(customers, batch['CustomerID'].dropna().to_numpy())
+
+        return {
+            'total_sales': total_sales,
+            'avg_sale': total_sales / rows if rows else np.nan,
+            'total_customers': len(customers),
+            'total_transactions': rows
+        }
+
+    def max_date(self) -> pd.Timestamp:
+        """Fecha máxima de InvoiceDate (escanea solo esa columna)"""
+        if self._max_date is None:
+            dates = [batch['InvoiceDate'].max() for batch in self._scan(['InvoiceDate'])]
+            self._max_date = max(dates) if dates else pd.NaT
+        return self._max_date
+
+    # ========== MÉTODOS DE SEGMENTACIÓN RFM ==========
+
+    def customer_rfm_segmentation(self, advanced: bool = False):
+        """
+        Segmentación RFM por clientes, combinando parciales por lote
+
+        Frequency cuenta facturas distintas aunque una factura quede
+        repartida entre varios lotes.
+
+        Args:
+            advanced: Si es True agrega puntuaciones por quintiles y segmentos
+
+        Returns:
+            DataFrame con métricas RFM por cliente (mismo formato que RetailAnalyzer)
+        """
+        import pyarrow.dataset as ds
+
+        partials, pairs = [], []
+
+        def compact():
+            merged = pd.concat(partials).groupby(level=0).agg({'LastPurchase': 'max', 'Monetary': 'sum'})
+            partials[:] = [merged]
+            pairs[:] = [pd.concat(pairs).drop_duplicates()]
+
+        columns = ['CustomerID', 'Invoice', 'InvoiceDate', 'TotalAmount']
+        for i, batch in enumerate(self._scan(columns, ds.field('CustomerID').is_valid()), 1):
+            customer = batch['CustomerID'].to_numpy()
+            dates_ns = batch['InvoiceDate'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+            partials.append(
+                pd.DataFrame({'LastPurchase': dates_ns, 'Monetary': batch['TotalAmount'].to_numpy(dtype=np.float64)},
+                             index=customer)
+                .groupby(level=0).agg({'LastPurchase': 'max', 'Monetary': 'sum'})
+            )
+            pairs.append(pd.DataFrame({'CustomerID': customer, 'Invoice': _invoice_keys(batch['Invoice'])})
+                         .drop_duplicates())
+            if i % MERGE_EVERY == 0:
+                compact()
+
+        if not partials:
+            rfm = rfm_frame(pd.Index([]), np.empty(0, dtype=np.int64),
+                            np.empty(0, dtype=np.int64), np.empty(0), self.max_date())
+            return add_rfm_scores(rfm) if advanced else rfm
+
+        compact()
+        state = partials[0].sort_index()
+        frequency = pairs[0].groupby('CustomerID').size().reindex(state.index)
+
+        rfm = rfm_frame(state.index, state['LastPurchase'].to_numpy(), frequency.to_numpy(),
+                        state['Monetary'].to_numpy(), self.max_date() + pd.Timedelta(days=1))
+        return add_rfm_scores(rfm) if advanced else rfm
+
+    def get_top_customers(self, n: int = 10):
+        """Obtiene los top N clientes por valor monetario"""
+        return self.customer_rfm_segmentation().head(n)
+
+    # ========== MÉTODOS DE ANÁLISIS TEMPORAL ==========
+
+    def _temporal_totals(self):
+        """Sumas y conteos por mes (ordinal desde 1970-01), día de la semana y hora"""
+        totals = {key: (np.zeros(0), np.zeros(0, dtype=np.int64)) for key in ('month', 'weekday', 'hour')}
+        for batch in self._scan(['InvoiceDate', 'TotalAmount']):
+            values = batch['InvoiceDate'].to_numpy(dtype='datetime64[ns]')
+            dates_ns = values.view(np.int64)
+            amounts = batch['TotalAmount'].to_numpy(dtype=np.float64)
+            keys = {
+                'month': values.astype('datetime64[M]').astype(np.int64),
+                'weekday': (values.astype('datetime64[D]').astype(np.int64) + 3) % 7,
+                'hour': (dates_ns // NS_PER_HOUR) % 24
+            }
+            for key, codes in keys.items():
+                sums, counts = totals[key]
+                totals[key] = (_add_totals(sums, np.bincount(codes, weights=amounts)),
+                               _add_totals(counts, np.bincount(codes)))
+        return totals
+
+    def sales_by_month(self):
+        """
+        Analiza ventas agrupadas por mes
+
+        Returns:
+            Series con ventas totales por mes
+        """
+        sums, counts = self._temporal_totals()['month']
+        present = np.flatnonzero(counts)
+        return pd.Series(
+            sums[present],
+            index=pd.PeriodIndex.from_ordinals(present, freq='M').rename('InvoiceDate'),
+            name='TotalAmount'
+        )
+
+    def sales_by_day_of_week(self):
+        """
+        Analiza ventas por día de la semana
+
+        Returns:
+            DataFrame con ventas por día
+        """
+        sums, counts = self._temporal_totals()['weekday']
+        present = np.flatnonzero(counts)
+        daily_sales = pd.DataFrame(
+            {
+                ('TotalAmount', 'sum'): sums[present],
+                ('TotalAmount', 'mean'): sums[present] / counts[present],
+                ('TotalAmount', 'count'): counts[present]
+            },
+            index=pd.Index([DAY_NAMES[d] for d in present], name='DayOfWeek')
+        ).round(2)
+        return daily_sales.reindex(DAY_NAMES)
+
+    def sales_by_hour(self):
+        """
+        Analiza ventas por hora del día
+
+        Returns:
+            Series con ventas por hora
+        """
+        sums, counts = self._temporal_totals()['hour']
+        present = np.flatnonzero(counts)
+        return pd.Series(
+            sums[present],
+            index=pd.Index(present.astype(np.int32), name='InvoiceDate'),
+            name='TotalAmount'
+        )
+
+    def get_peak_sales_time(self):
+        """
+        Identifica el periodo de mayor actividad
+
+        Returns:
+            Dict con información de pico de ventas
+        """
+        hourly = self.sales_by_hour()
+        return {
+            'peak_hour': hourly.idxmax(),
+            'peak_amount': hourly.max(),
+            'analysis_date': self.analysis_date
+        }
@@ -0,0 +1,251 @@
+"""
+Caché columnar (Parquet) para libros Excel del dataset Online Retail II.
+
+Cada hoja del libro se guarda como un archivo Parquet independiente junto a
+un manifiesto con la huella del archivo fuente (ruta, tamaño, mtime y hash
+de contenido) y la huella de cada hoja dentro del contenedor .xlsx. Así,
+las lecturas posteriores evitan openpyxl por completo y, si el libro cambia,
+solo se reconstruyen las hojas modificadas.
+"""
+
+import hashlib
+import json
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_VERSION = 1
+
+_NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_NS_DOC_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+
+def _file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Calcula el hash SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _workbook_sheets(zf: zipfile.ZipFile):
+    """Retorna [(nombre_hoja, ruta_xml)] en el orden del libro"""
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    targets = {}
+    for rel in rels.iter(f'{_NS_PKG_REL}Relationship'):
+        target = rel.get('Target').lstrip('/')
+        if not target.startswith('xl/'):
+            target = f'xl/{target}'
+        targets[rel.get('Id')] = target
+
+    workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    return [
+        (sheet.get('name'), targets[sheet.get(f'{_NS_DOC_REL}id')])
+        for sheet in workbook.iter(f'{_NS_MAIN}sheet')
+    ]
+
+
+def _shared_strings_digests(zf: zipfile.ZipFile, prefix_len: int):
+    """
+    Recorre la tabla de cadenas compartidas una sola vez.
+
+    Returns:
+        Tupla (cantidad, hash de las primeras `prefix_len` cadenas, hash total)
+    """
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        empty = hashlib.sha256().hexdigest()
+        return 0, empty, empty
+
+    digest = hashlib.sha256()
+    prefix_digest = digest.hexdigest() if prefix_len == 0 else None
+    count = 0
+    with zf.open('xl/sharedStrings.xml') as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag != f'{_NS_MAIN}si':
+                continue
+            text = ''.join(t.text or '' for t in elem.iter(f'{_NS_MAIN}t'))
+            digest.update(text.encode('utf-8') + b'\x00')
+            count += 1
+            if count == prefix_len:
+                prefix_digest = digest.hexdigest()
+            elem.clear()
+
+    return count, prefix_digest, digest.hexdigest()
+
+
+def normalize_mixed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte columnas object con tipos mezclados (ej. Invoice con números y
+    códigos 'C...') a texto, conservando los nulos, para poder escribir Parquet.
+
+    load_data la aplica también sin caché, de modo que los tipos no dependen
+    de si la caché estaba caliente.
+    """
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        kind = pd.api.types.infer_dtype(df[col], skipna=True)
+        if kind not in ('string', 'empty'):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _restore_nulls(df: pd.DataFrame) -> pd.DataFrame:
+    """Parquet devuelve None en columnas de texto; read_excel usa NaN"""
+    for col in df.columns[df.dtypes == object]:
+        values = df[col]
+        if values.isna().any():
+            df[col] = values.where(values.notna(), np.nan)
+    return df
+
+
+class ParquetSheetCache:
+    """Caché Parquet de las hojas de un libro Excel, invalidada por hoja"""
+
+    def __init__(self, source_path, cache_dir):
+        """
+        Inicializa la caché para un archivo fuente
+
+        Args:
+            source_path: Ruta del libro Excel
+            cache_dir: Directorio raíz donde se guardan las cachés
+        """
+        self.source_path = Path(source_path).resolve()
+        key = hashlib.sha1(str(self.source_path).encode('utf-8')).hexdigest()[:12]
+        self.cache_dir = Path(cache_dir) / f"{self.source_path.stem}-{key}"
+        self.manifest_path = self.cache_dir / 'manifest.json'
+        self.last_rebuilt = []
+
+    def _read_manifest(self):
+        if not self.manifest_path.exists():
+            return None
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != MANIFEST_VERSION:
+            return None
+        if manifest.get('source', {}).get('path') != str(self.source_path):
+            return None
+        return manifest
+
+    def _write_manifest(self, manifest: dict):
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        tmp_path.replace(self.manifest_path)
+
+    def _files_present(self, manifest: dict) -> bool:
+        return all((self.cache_dir / s['file']).exists() for s in manifest['sheets'])
+
+    def _read_cached(self, manifest: dict):
+        return [
+            (s['name'], _restore_nulls(pd.read_parquet(self.cache_dir / s['file'])))
+            for s in manifest['sheets']
+        ]
+
+    def load_sheets(self):
+        """
+        Retorna las hojas del libro, leyendo desde Parquet cuando es posible
+
+        Returns:
+            Lista de tuplas (nombre_hoja, DataFrame) en el orden del libro
+        """
+        self.last_rebuilt = []
+        stat = self.source_path.stat()
+        manifest = self._read_manifest()
+
+        # Camino rápido: mismo tamaño y mtime que la última vez
+        if (manifest is not None
+                and manifest['source']['size'] == stat.st_size
+                and manifest['source']['mtime_ns'] == stat.st_mtime_ns
+                and self._files_present(manifest)):
+            return self._read_cached(manifest)
+
+        # El archivo se tocó: comprobar si el contenido realmente cambió
+        content_hash = _file_sha256(self.source_path)
+        source = {
+            'path': str(self.source_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': content_hash,
+        }
+        if (manifest is not None
+                and manifest['source']['sha256'] == content_hash
+                and self._files_present(manifest)):
+            manifest['source'] = source
+            self._write_manifest(manifest)
+            return self._read_cached(manifest)
+
+        return self._rebuild(manifest, source)
+
+    def _rebuild(self, manifest, source: dict):
+        """Reconstruye solo las hojas cuya huella cambió"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        previous = {s['name']: s for s in manifest['sheets']} if manifest else {}
+        old_strings = manifest['shared_strings'] if manifest else None
+
+        with zipfile.ZipFile(self.source_path) as zf:
+            sheets = _workbook_sheets(zf)
+            prefix_len = old_strings['count'] if old_strings else 0
+            count, prefix_digest, full_digest = _shared_strings_digests(zf, prefix_len)
+            styles_crc = zf.getinfo('xl/styles.xml').CRC if 'xl/styles.xml' in zf.namelist() else 0
+            members = {name: zf.getinfo(member) for name, member in sheets}
+
+        # Las hojas sin cambios siguen siendo válidas solo si las cadenas
+        # compartidas previas se conservan (a lo sumo se agregaron nuevas)
+        # y los estilos (formatos de fecha) no cambiaron
+        reusable = (
+            manifest is not None
+            and prefix_digest is not None
+            and prefix_digest == old_strings['digest']
+            and manifest.get('styles_crc') == styles_crc
+        )
+
+        entries = []
+        to_build = []
+        for name, member in sheets:
+            info = members[name]
+            entry = {
+                'name': name,
+                'member': member,
+                'crc': info.CRC,
+                'size': info.file_size,
+                'file': f"sheet-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:12]}.parquet",
+            }
+            old = previous.get(name)
+            if (reusable and old is not None
+                    and old['crc'] == entry['crc']
+                    and old['size'] == entry['size']
+                    and (self.cache_dir / old['file']).exists()):
+                entry['rows'] = old['rows']
+            else:
+                to_build.append(entry)
+            entries.append(entry)
+
+        if to_build:
+            xls = pd.ExcelFile(self.source_path)
+            for entry in to_build:
+                df_sheet = normalize_mixed_columns(pd.read_excel(xls, sheet_name=entry['name']))
+                df_sheet.to_parquet(self.cache_dir / entry['file'], index=False)
+                entry['rows'] = len(df_sheet)
+                self.last_rebuilt.append(entry['name'])
+            xls.close()
+
+        # Eliminar archivos de hojas que ya no existen
+        current_files = {e['file'] for e in entries}
+        for old in previous.values():
+            if old['file'] not in current_files:
+                (self.cache_dir / old['file']).unlink(missing_ok=True)
+
+        self._write_manifest({
+            'version': MANIFEST_VERSION,
+            'source': source,
+            'shared_strings': {'count': count, 'digest': full_digest},
+            'styles_crc': styles_crc,
+            'sheets': entries,
+        })
+        return self._read_cached({'sheets': entries})
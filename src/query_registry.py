@@ -0,0 +1,244 @@
+"""
+Registro de queries parseadas y caché de resultados para sql/queries.sql.
+
+El registro parsea el archivo .sql una sola vez (y de nuevo solo si cambia
+su mtime) usando los encabezados '-- N. Título' como nombres estables. La
+caché de resultados guarda DataFrames en Parquet, indexados por el texto de
+la query y la marca de versión de las tablas que consulta, con TTL y
+desalojo LRU acotado.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+_TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN)\s+([\w\.\[\]"]+)', re.IGNORECASE)
+
+
+def parse_queries(content: str) -> list:
+    """
+    Separa el contenido de un archivo .sql en queries numeradas
+
+    Las queries se separan por comentarios de la forma '-- N. Título'.
+
+    Returns:
+        Lista de dicts con 'number', 'title' y 'sql' en orden de aparición
+    """
+    queries = []
+    header = None
+    current_query = []
+
+    def flush():
+        if current_query:
+            number = len(queries) + 1
+            title = ''
+            if header:
+                match = re.match(r'--\s*(\d+)\.\s*(.*)', header)
+                if match:
+                    number, title = int(match.group(1)), match.group(2).strip()
+            queries.append({'number': number, 'title': title, 'sql': '\n'.join(current_query)})
+
+    for line in content.split('\n'):
+        if line.strip().startswith('-- ') and '. ' in line and not line.startswith('-- ='):
+            flush()
+            header = line.strip()
+            current_query = []
+        elif line.strip() and not line.strip().startswith('--'):
+            current_query.append(line)
+
+    flush()
+    return queries
+
+
+def referenced_tables(sql: str) -> list:
+    """Tablas mencionadas en cláusulas FROM/JOIN (sin esquema ni corchetes)"""
+    tables = []
+    for match in _TABLE_PATTERN.findall(sql):
+        name = match.split('.')[-1].strip('[]"')
+        if name not in tables:
+            tables.append(name)
+    return tables
+
+
+class QueryRegistry:
+    """Queries de un archivo .sql, parseadas una vez y recargadas si cambia el archivo"""
+
+    def __init__(self, query_file):
+        """
+        Inicializa el registro
+
+        Args:
+            query_file: Ruta del archivo .sql
+        """
+        self.query_file = Path(query_file)
+        self._mtime_ns = None
+        self._queries = []
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        mtime_ns = self.query_file.stat().st_mtime_ns
+        with self._lock:
+            if mtime_ns != self._mtime_ns:
+                self._queries = parse_queries(self.query_file.read_text(encoding='utf-8'))
+                self._mtime_ns = mtime_ns
+
+    @property
+    def queries(self) -> list:
+        """Lista de dicts {'number', 'title', 'sql'} vigente"""
+        self._refresh()
+        return self._queries
+
+    def get(self, key) -> dict:
+        """
+        Busca una query por número (int) o por título (sin distinguir mayúsculas)
+
+        Raises:
+            ValueError: Si la query no existe
+        """
+        queries = self.queries
+        for query in queries:
+            if isinstance(key, int) and query['number'] == key:
+                return query
+            if isinstance(key, str) and query['title'].lower() == key.lower():
+                return query
+        raise ValueError(f"Query {key} no existe. Hay {len(queries)} queries disponibles.")
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __iter__(self):
+        return iter(self.queries)
+
+
+class QueryResultCache:
+    """Caché de resultados de queries con TTL, LRU y persistencia en Parquet"""
+
+    def __init__(self, cache_dir=None, ttl: float = 300, maxsize: int = 64):
+        """
+        Inicializa la caché
+
+        Args:
+            cache_dir: Directorio para persistir resultados (None = solo memoria)
+            ttl: Segundos de validez de cada resultado
+            maxsize: Número máximo de resultados guardados
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._frames = {}
+        self._lock = threading.Lock()
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_index()
+
+    @staticmethod
+    def make_key(sql: str, watermark: str) -> str:
+        return hashlib.sha256(f"{sql.strip()}\x00{watermark}".encode('utf-8')).hexdigest()
+
+    # ========== ÍNDICE EN DISCO ==========
+
+    def _index_path(self) -> Path:
+        return self.cache_dir / 'index.json'
+
+    def _load_index(self):
+        path = self._index_path()
+        if not path.exists():
+            return
+        try:
+            entries = json.loads(path.read_text(encoding='utf-8'))
+        except ValueError:
+            return
+        for key, meta in sorted(entries.items(), key=lambda item: item[1]['accessed']):
+            if (self.cache_dir / f"{key}.parquet").exists():
+                self._entries[key] = meta
+
+    def _save_index(self):
+        if self.cache_dir is None:
+            return
+        tmp_path = self._index_path().with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self._entries), encoding='utf-8')
+        tmp_path.replace(self._index_path())
+
+    def _drop(self, key: str):
+        self._entries.pop(key, None)
+        self._frames.pop(key, None)
+        if self.cache_dir is not None:
+            (self.cache_dir / f"{key}.parquet").unlink(missing_ok=True)
+
+    # ========== API ==========
+
+    def get(self, sql: str, watermark: str):
+        """Retorna el resultado guardado o None si no existe o expiró"""
+        key = self.make_key(sql, watermark)
+        with self._lock:
+            meta = self._entries.get(key)
+            if meta is None or time.time() - meta['created'] > self.ttl:
+                if meta is not None:
+                    self._drop(key)
+                    self._save_index()
+                self.misses += 1
+                return None
+
+            frame = self._frames.get(key)
+            if frame is None:
+                frame = pd.read_parquet(self.cache_dir / f"{key}.parquet")
+                self._frames[key] = frame
+            meta['accessed'] = time.time()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return frame.copy()
+
+    def put(self, sql: str, watermark: str, result: pd.DataFrame, tables: list = None):
+        """Guarda un resultado asociado a las tablas que consulta"""
+        key = self.make_key(sql, watermark)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {'created': now, 'accessed': now, 'tables': tables or []}
+            self._entries.move_to_end(key)
+            self._frames[key] = result.copy()
+            if self.cache_dir is not None:
+                result.to_parquet(self.cache_dir / f"{key}.parquet", index=False)
+
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+            self._save_index()
+
+    def invalidate_table(self, table_name: str) -> int:
+        """
+        Elimina los resultados que dependen de una tabla
+
+        Returns:
+            Número de resultados eliminados
+        """
+        with self._lock:
+            stale = [key for key, meta in self._entries.items() if table_name in meta['tables']]
+            for key in stale:
+                self._drop(key)
+            self._save_index()
+        return len(stale)
+
+    def clear(self):
+        """Elimina todos los resultados"""
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+            self._save_index()
+
+    def info(self) -> dict:
+        """Retorna estadísticas de uso de la caché"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'maxsize': self.maxsize,
+            'currsize': len(self._entries)
+        }
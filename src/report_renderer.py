@@ -0,0 +1,191 @@
+"""
+Renderizado batch de reportes gráficos sin pantalla.
+
+Recibe una lista de especificaciones de gráfico (tipo, filtros como país o
+rango de fechas, opciones y formato de salida), calcula cada subconjunto y
+cada agregación una sola vez aunque varias especificaciones la compartan, y
+dibuja los gráficos con figuras Agg reutilizadas, opcionalmente repartidos
+en un pool de procesos. Nunca llama a show().
+"""
+
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    from .visualizations import RetailVisualizer, FIGSIZES, setup_plot_style
+except ImportError:
+    from visualizations import RetailVisualizer, FIGSIZES, setup_plot_style
+
+PLOT_TYPES = list(FIGSIZES)
+FORMATS = ('png', 'svg', 'pdf')
+DEFAULT_DPI = 100
+
+# Figuras reutilizadas por proceso, una por tamaño
+_FIGURES = {}
+
+
+def _figure(figsize):
+    """Figura Agg (sin pyplot) reutilizada y limpiada entre gráficos"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = _FIGURES.get(figsize)
+    if fig is None:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        _FIGURES[figsize] = fig
+    else:
+        fig.clear()
+    return fig
+
+
+def render_plot(plot: str, data, path: str, fmt: str, dpi: int) -> float:
+    """
+    Dibuja y guarda un gráfico a partir de datos ya agregados
+
+    Returns:
+        Segundos de dibujo y escritura
+    """
+    start = time.perf_counter()
+    setup_plot_style()
+    fig = _figure(FIGSIZES[plot])
+    RetailVisualizer.draw(plot, fig, data)
+    fig.savefig(path, format=fmt, dpi=dpi, bbox_inches='tight')
+    return time.perf_counter() - start
+
+
+def normalize_spec(spec: dict) -> dict:
+    """
+    Completa una especificación de gráfico con sus valores por defecto
+
+    Claves: plot (obligatoria), filters, options, format, dpi y name.
+
+    Raises:
+        ValueError: Si el tipo de gráfico o el formato no existen
+    """
+    spec = {'filters': {}, 'options': {}, 'format': 'png', 'dpi': None, 'name': None, **spec}
+    if spec.get('plot') not in FIGSIZES:
+        raise ValueError(f"Tipo de gráfico no soportado: {spec.get('plot')}. Opciones: {PLOT_TYPES}")
+    if spec['format'] not in FORMATS:
+        raise ValueError(f"Formato no soportado: {spec['format']}. Opciones: {list(FORMATS)}")
+    return spec
+
+
+def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """
+    Filtra el DataFrame por columnas y rango de fechas
+
+    Args:
+        filters: 'start'/'end' delimitan InvoiceDate en [start, end); el resto
+            son columnas con un valor o una lista de valores permitidos
+    """
+    mask = pd.Series(True, index=df.index)
+    for key, value in filters.items():
+        if key == 'start':
+            mask &= df['InvoiceDate'] >= pd.Timestamp(value)
+        elif key == 'end':
+            mask &= df['InvoiceDate'] < pd.Timestamp(value)
+        elif isinstance(value, (list, tuple, set)):
+            mask &= df[key].isin(list(value))
+        else:
+            mask &= df[key] == value
+    return df if mask.all() else df[mask]
+
+
+def _freeze(mapping: dict) -> tuple:
+    return tuple(sorted((k, tuple(v) if isinstance(v, (list, set)) else v) for k, v in mapping.items()))
+
+
+def _default_name(spec: dict) -> str:
+    parts = [spec['plot']] + [f'{k}-{v}' for k, v in _freeze(spec['filters'])]
+    parts += [f'{k}-{v}' for k, v in _freeze(spec['options'])]
+    return re.sub(r'[^\w.-]+', '_', '__'.join(str(p) for p in parts))
+
+
+def country_report_specs(countries, plots=None, fmt: str = 'png') -> list:
+    """Especificaciones para el paquete de reportes por país"""
+    plots = plots or [p for p in PLOT_TYPES if p != 'top_countries']
+    return [{'plot': plot, 'filters': {'Country': country}, 'format': fmt}
+            for country in countries for plot in plots]
+
+
+class BatchRenderer:
+    """Renderiza listas de gráficos sin pantalla, con agregaciones compartidas"""
+
+    def __init__(self, df: pd.DataFrame, output_dir, workers: int = 1, dpi: int = DEFAULT_DPI):
+        """
+        Inicializa el renderizador
+
+        Args:
+            df: DataFrame limpio de retail
+            output_dir: Directorio donde se escriben los gráficos
+            workers: Procesos para dibujar (1 = en el proceso actual)
+            dpi: Resolución por defecto de los archivos raster
+        """
+        self.df = df
+        self.output_dir = Path(output_dir)
+        self.workers = workers
+        self.dpi = dpi
+
+    def render(self, specs: list) -> pd.DataFrame:
+        """
+        Renderiza todas las especificaciones
+
+        Returns:
+            DataFrame con name, plot, format, path, aggregate_seconds,
+            aggregate_reused, render_seconds y error por gráfico
+
+        Raises:
+            ValueError: Si dos especificaciones escriben en el mismo archivo
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        specs = [normalize_spec(spec) for spec in specs]
+
+        visualizers, aggregates, tasks, report, paths = {}, {}, [], [], set()
+        for spec in specs:
+            filter_key = _freeze(spec['filters'])
+            if filter_key not in visualizers:
+                visualizers[filter_key] = RetailVisualizer(apply_filters(self.df, spec['filters']))
+
+            aggregate_key = (filter_key, spec['plot'], _freeze(spec['options']))
+            reused = aggregate_key in aggregates
+            if not reused:
+                start = time.perf_counter()
+                data = visualizers[filter_key].aggregate(spec['plot'], **spec['options'])
+                aggregates[aggregate_key] = (data, time.perf_counter() - start)
+            data, aggregate_seconds = aggregates[aggregate_key]
+
+            path = self.output_dir / f"{spec['name'] or _default_name(spec)}.{spec['format']}"
+            if path in paths:
+                raise ValueError(f"Dos especificaciones escriben el mismo archivo: {path.name}")
+            paths.add(path)
+            tasks.append((spec['plot'], data, str(path), spec['format'], spec['dpi'] or self.dpi))
+            report.append({
+                'name': path.stem, 'plot': spec['plot'], 'format': spec['format'], 'path': str(path),
+                'aggregate_seconds': 0.0 if reused else aggregate_seconds, 'aggregate_reused': reused
+            })
+
+        for row, (seconds, error) in zip(report, self._run(tasks)):
+            row['render_seconds'] = seconds
+            row['error'] = error
+
+        return pd.DataFrame(report)
+
+    def _run(self, tasks: list) -> list:
+        """Ejecuta los dibujos; retorna (segundos, error) por tarea"""
+        def outcome(call):
+            try:
+                return call(), None
+            except Exception as e:
+                return None, f'{type(e).__name__}: {e}'
+
+        if self.workers <= 1 or len(tasks) <= 1:
+            return [outcome(lambda task=task: render_plot(*task)) for task in tasks]
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(render_plot, *task) for task in tasks]
+            return [outcome(future.result) for future in futures]
@@ -0,0 +1,110 @@
+"""
+Caché de resultados derivados (memoización LRU) para el análisis retail.
+
+Los resultados se asocian al DataFrame de origen con una comprobación O(1)
+por consulta: si se reemplaza el DataFrame o cambia su forma, columnas o
+tipos, la caché se invalida automáticamente. Las ediciones en el lugar que
+conservan la estructura (por ejemplo, intercambiar dos valores) no se
+detectan: quien las hace debe llamar a invalidate().
+"""
+
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def frame_fingerprint(df: pd.DataFrame) -> tuple:
+    """
+    Calcula la huella estructural del DataFrame sin leer sus valores
+
+    Args:
+        df: DataFrame a identificar
+
+    Returns:
+        Tupla comparable con forma, columnas y tipos
+    """
+    return (df.shape, tuple(df.columns), tuple(str(dtype) for dtype in df.dtypes))
+
+
+class FrameWatcher:
+    """Detecta si cambió el DataFrame del que dependen los resultados guardados"""
+
+    def __init__(self):
+        self._ref = None
+        self._fingerprint = None
+
+    def changed(self, df: pd.DataFrame) -> bool:
+        """
+        Indica si `df` no es el DataFrame observado o cambió su estructura
+
+        Usa una referencia débil (no un id reutilizable tras liberar el
+        DataFrame anterior) y, si hubo cambio, pasa a observar `df`.
+        """
+        fingerprint = frame_fingerprint(df)
+        if self._ref is not None and self._ref() is df and fingerprint == self._fingerprint:
+            return False
+        self._ref = weakref.ref(df)
+        self._fingerprint = fingerprint
+        return True
+
+    def invalidate(self):
+        """Fuerza que la próxima comprobación reporte un cambio"""
+        self._ref = None
+        self._fingerprint = None
+
+
+class ResultCache:
+    """Caché LRU acotada con contadores de aciertos y fallos"""
+
+    def __init__(self, maxsize: int = 32):
+        """
+        Inicializa la caché
+
+        Args:
+            maxsize: Número máximo de resultados guardados (0 desactiva la caché)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get_or_compute(self, key, compute):
+        """
+        Retorna el resultado guardado para `key` o lo calcula con `compute()`
+
+        Args:
+            key: Clave hashable del resultado
+            compute: Función sin argumentos que calcula el resultado
+        """
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+        self.misses += 1
+        value = compute()
+        if self.maxsize > 0:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Elimina todos los resultados (los contadores se conservan)"""
+        self._data.clear()
+
+    def info(self) -> dict:
+        """Retorna estadísticas de uso de la caché"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'maxsize': self.maxsize,
+            'currsize': len(self._data)
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
@@ -0,0 +1,144 @@
+"""
+Motor RFM vectorizado (Recency, Frequency, Monetary).
+
+Calcula fecha máxima, número de facturas distintas y monto total por cliente
+en una sola pasada con NumPy sobre códigos enteros de cliente, sin llamadas
+Python por grupo. Incluye puntuaciones por quintiles y segmentos con nombre.
+"""
+
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400 * 10**9
+
+# Mapa clásico de segmentos sobre la grilla R (filas) x F (columnas), 1..5
+SEGMENT_MAP = np.array([
+    # F=1           F=2            F=3              F=4               F=5
+    ['Hibernating', 'Hibernating', 'At Risk', 'At Risk', "Can't Lose"],                     # R=1
+    ['Hibernating', 'Hibernating', 'At Risk', 'At Risk', "Can't Lose"],                     # R=2
+    ['About to Sleep', 'About to Sleep', 'Need Attention', 'Loyal Customers', 'Loyal Customers'],  # R=3
+    ['Promising', 'Potential Loyalists', 'Potential Loyalists', 'Loyal Customers', 'Loyal Customers'],  # R=4
+    ['New Customers', 'Potential Loyalists', 'Potential Loyalists', 'Champions', 'Champions'],  # R=5
+])
+SEGMENTS = list(dict.fromkeys(SEGMENT_MAP.ravel()))
+
+
+def rfm_kernel(customer_codes: np.ndarray, invoice_codes: np.ndarray,
+               dates_ns: np.ndarray, amounts: np.ndarray,
+               n_customers: int, n_invoices: int):
+    """
+    Núcleo RFM sobre arreglos de códigos enteros
+
+    Args:
+        customer_codes: Código de cliente por fila (0..n_customers-1)
+        invoice_codes: Código de factura por fila (0..n_invoices-1)
+        dates_ns: Fecha de la factura en nanosegundos (int64)
+        amounts: Monto de la línea
+        n_customers: Número de clientes distintos
+        n_invoices: Número de facturas distintas
+
+    Returns:
+        Tupla (última fecha en ns, facturas distintas, monto total) por cliente
+    """
+    monetary = np.bincount(customer_codes, weights=amounts, minlength=n_customers)
+
+    last_date = np.full(n_customers, np.iinfo(np.int64).min, dtype=np.int64)
+    np.maximum.at(last_date, customer_codes, dates_ns)
+
+    pairs = np.unique(customer_codes.astype(np.int64) * n_invoices + invoice_codes)
+    frequency = np.bincount(pairs // n_invoices, minlength=n_customers)
+
+    return last_date, frequency, monetary
+
+
+def compute_rfm(df: pd.DataFrame, snapshot_date=None) -> pd.DataFrame:
+    """
+    Calcula la tabla RFM de un DataFrame limpio
+
+    Args:
+        df: DataFrame con CustomerID, Invoice, InvoiceDate y TotalAmount
+        snapshot_date: Fecha de referencia (por defecto, último día + 1)
+
+    Returns:
+        DataFrame con Recency, Frequency y Monetary por cliente,
+        ordenado por Monetary descendente
+    """
+    customer_codes, customers = pd.factorize(df['CustomerID'], sort=True)
+    invoice_codes, invoices = pd.factorize(df['Invoice'])
+
+    # Igual que groupby: las filas sin cliente no se consideran
+    valid = customer_codes >= 0
+    dates = df['InvoiceDate']
+    dates_ns = dates.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    amounts = df['TotalAmount'].to_numpy(dtype=np.float64)
+    if not valid.all():
+        customer_codes, invoice_codes = customer_codes[valid], invoice_codes[valid]
+        dates_ns, amounts = dates_ns[valid], amounts[valid]
+
+    last_date, frequency, monetary = rfm_kernel(
+        customer_codes, invoice_codes, dates_ns, amounts,
+        len(customers), len(invoices)
+    )
+
+    if snapshot_date is None:
+        snapshot_date = dates.max() + pd.Timedelta(days=1)
+
+    return rfm_frame(customers, last_date, frequency, monetary, snapshot_date)
+
+
+def rfm_frame(customers, last_date: np.ndarray, frequency: np.ndarray,
+              monetary: np.ndarray, snapshot_date) -> pd.DataFrame:
+    """
+    Arma la tabla RFM a partir de los arreglos por cliente de rfm_kernel
+
+    Returns:
+        DataFrame indexado por CustomerID, ordenado por Monetary descendente
+    """
+    snapshot_ns = pd.Timestamp(snapshot_date).value
+
+    rfm = pd.DataFrame({
+        'Recency': (snapshot_ns - last_date) // NS_PER_DAY,
+        'Frequency': frequency,
+        'Monetary': monetary
+    }, index=pd.Index(customers, name='CustomerID'))
+
+    return rfm.sort_values('Monetary', ascending=False, kind='stable')
+
+
+def _quintile_score(values: pd.Series, ascending: bool, bins: int) -> np.ndarray:
+    """Asigna puntuaciones 1..bins por rango percentil (empates por orden de aparición)"""
+    ranks = values.rank(method='first', ascending=ascending).to_numpy()
+    scores = np.ceil(ranks * bins / len(values))
+    return np.clip(scores, 1, bins).astype(np.int8)
+
+
+def add_rfm_scores(rfm: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega puntuaciones R/F/M por quintiles y el segmento del cliente
+
+    Args:
+        rfm: Tabla con columnas Recency, Frequency y Monetary
+
+    Returns:
+        Copia de la tabla con R_Score, F_Score, M_Score, RFM_Score y Segment
+    """
+    rfm = rfm.copy()
+    if rfm.empty:
+        for col in ('R_Score', 'F_Score', 'M_Score'):
+            rfm[col] = pd.Series(dtype=np.int8)
+        rfm['RFM_Score'] = pd.Series(dtype=str)
+        rfm['Segment'] = pd.Categorical([], categories=SEGMENTS)
+        return rfm
+
+    # Menor recency es mejor: los más recientes reciben la puntuación más alta
+    rfm['R_Score'] = _quintile_score(rfm['Recency'], ascending=False, bins=5)
+    rfm['F_Score'] = _quintile_score(rfm['Frequency'], ascending=True, bins=5)
+    rfm['M_Score'] = _quintile_score(rfm['Monetary'], ascending=True, bins=5)
+
+    rfm['RFM_Score'] = (
+        rfm['R_Score'].astype(str) + rfm['F_Score'].astype(str) + rfm['M_Score'].astype(str)
+    )
+    segments = SEGMENT_MAP[rfm['R_Score'].to_numpy() - 1, rfm['F_Score'].to_numpy() - 1]
+    rfm['Segment'] = pd.Categorical(segments, categories=SEGMENTS)
+
+    return rfm
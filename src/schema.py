@@ -0,0 +1,94 @@
+"""
+Esquema compacto de tipos para el dataset Online Retail II.
+
+Reemplaza las columnas de texto por categorías, usa enteros de 32 bits y
+separa Invoice en un identificador numérico más una bandera de cancelación,
+reduciendo la memoria y acelerando los groupby. Los montos (Price y
+TotalAmount) se mantienen en float64: con float32 las sumas sobre millones de
+filas pierden centavos y dejan de coincidir con el camino sin compactar.
+"""
+
+import pandas as pd
+
+CATEGORICAL_COLUMNS = ['StockCode', 'Description', 'Country']
+
+
+def _split_invoice(invoice: pd.Series):
+    """
+    Separa Invoice en identificador numérico (int32) y bandera de cancelación
+
+    Solo se quita la 'C' inicial de las cancelaciones. Si quedan facturas no
+    numéricas (p. ej. los ajustes 'A563185'), la columna se conserva como
+    categoría para no mezclarlas con la factura del mismo número.
+
+    Returns:
+        Tupla (Series int32 con el número o category con el texto, Series bool IsCancelled)
+    """
+    if pd.api.types.is_integer_dtype(invoice):
+        return invoice.astype('int32'), pd.Series(False, index=invoice.index)
+
+    text = invoice.astype(str)
+    is_cancelled = text.str.startswith('C')
+    number = pd.to_numeric(text.str.removeprefix('C'), errors='coerce')
+    if (number.isna() & invoice.notna()).any():
+        return invoice.where(invoice.isna(), text).astype('category'), is_cancelled
+    return number.astype('Int32' if number.isna().any() else 'int32'), is_cancelled
+
+
+def optimize_dtypes(df: pd.DataFrame, cancel_flag: bool = True) -> pd.DataFrame:
+    """
+    Aplica el esquema compacto a un DataFrame de retail
+
+    Args:
+        df: DataFrame crudo o limpio
+        cancel_flag: Si es True agrega IsCancelled (la 'C' de Invoice). Usar
+            False con datos ya limpios, donde no quedan cancelaciones
+
+    Returns:
+        Nuevo DataFrame con tipos compactos (no modifica el original)
+    """
+    df = df.copy()
+
+    if 'Invoice' in df.columns:
+        invoice, is_cancelled = _split_invoice(df['Invoice'])
+        df['Invoice'] = invoice
+        if cancel_flag:
+            df['IsCancelled'] = is_cancelled
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            values = df[col]
+            # StockCode mezcla números y texto: normalizar a texto
+            values = values.where(values.isna(), values.astype(str))
+            df[col] = values.astype('category')
+
+    if 'CustomerID' in df.columns:
+        df['CustomerID'] = df['CustomerID'].astype('Int32')
+
+    if 'Quantity' in df.columns:
+        quantity = df['Quantity']
+        df['Quantity'] = quantity.astype('Int32' if quantity.isna().any() else 'int32')
+
+    return df
+
+
+def memory_usage_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compara la memoria por columna antes y después de optimizar
+
+    Returns:
+        DataFrame con bytes antes/después y porcentaje de reducción por columna
+    """
+    mem_before = before.memory_usage(index=False, deep=True)
+    mem_after = after.memory_usage(index=False, deep=True)
+
+    report = pd.DataFrame({
+        'bytes_before': mem_before,
+        'bytes_after': mem_after
+    }).fillna(0).astype('int64')
+    report.loc['Total'] = report.sum()
+    report['reduction_pct'] = (
+        100 * (1 - report['bytes_after'] / report['bytes_before'].where(report['bytes_before'] > 0))
+    ).round(1)
+
+    return report
@@ -0,0 +1,390 @@
+"""
+Servicio local de análisis retail sobre asyncio (HTTP/JSON, solo biblioteca estándar).
+
+Carga y limpia los datos una sola vez y mantiene en memoria el RetailAnalyzer
+y las respuestas ya serializadas, de modo que notebooks, reportes y el
+dashboard consultan resultados calientes en lugar de repetir el pipeline.
+
+- El trabajo de CPU (carga, análisis, serialización) corre en un pool de
+  hilos, fuera del event loop; RetailAnalyzer no es seguro entre hilos, así
+  que sus llamadas se serializan con un lock.
+- Las peticiones idénticas concurrentes comparten un único cálculo.
+- POST /reload (o el sondeo del archivo de datos) recarga en segundo plano y
+  cambia de analizador de forma atómica; las peticiones en curso terminan con
+  la generación anterior.
+
+Uso:
+    python src/service.py data/online_retail_II.xlsx --port 8050
+    curl http://127.0.0.1:8050/top-customers?n=5
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .analysis import RetailAnalyzer
+except ImportError:
+    from analysis import RetailAnalyzer
+
+MAX_HEADER_BYTES = 16_384
+# Respuestas serializadas guardadas (LRU); n/limit admiten cualquier valor
+MAX_RESPONSES = 256
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+def _bool(value: str) -> bool:
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"Valor booleano inválido: {value}")
+
+
+# Ruta → (método de RetailAnalyzer, parámetros aceptados con su conversor)
+ENDPOINTS = {
+    '/stats': ('get_basic_stats', {}),
+    '/rfm': ('customer_rfm_segmentation', {'advanced': _bool}),
+    '/top-customers': ('get_top_customers', {'n': int}),
+    '/sales/month': ('sales_by_month', {}),
+    '/sales/weekday': ('sales_by_day_of_week', {}),
+    '/sales/hour': ('sales_by_hour', {}),
+    '/peak': ('get_peak_sales_time', {}),
+}
+
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, (pd.Timestamp, pd.Period)) or hasattr(value, 'isoformat'):
+        return str(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def serialize(result, limit: int = None) -> bytes:
+    """
+    Serializa un resultado del analizador a JSON
+
+    DataFrames y Series usan el formato 'split' de pandas (columns/index/data);
+    `limit` recorta las primeras filas.
+    """
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        if limit is not None:
+            result = result.head(limit)
+        if isinstance(result.index, pd.PeriodIndex):
+            result = result.set_axis(result.index.astype(str))
+        payload = result.to_json(orient='split', date_format='iso')
+    else:
+        payload = json.dumps(result, default=_json_default)
+    return f'{{"result": {payload}}}'.encode('utf-8')
+
+
+class AnalyticsService:
+    """Servicio HTTP local con los resultados de RetailAnalyzer en memoria"""
+
+    def __init__(self, load, host: str = '127.0.0.1', port: int = 0, threads: int = 4,
+                 watch_path=None, watch_interval: float = 5.0, warm: bool = True,
+                 max_responses: int = MAX_RESPONSES):
+        """
+        Inicializa el servicio (no carga datos hasta start())
+
+        Args:
+            load: Función sin argumentos que retorna el DataFrame limpio
+            host: Interfaz de escucha (por defecto solo localhost)
+            port: Puerto (0 = uno libre, ver self.port)
+            threads: Hilos del pool para el trabajo de CPU
+            watch_path: Archivo cuyo cambio de mtime dispara una recarga (opcional)
+            watch_interval: Segundos entre sondeos de watch_path
+            warm: Si es True precalcula todos los endpoints tras cada carga
+            max_responses: Máximo de respuestas serializadas en memoria (LRU)
+        """
+        self.load = load
+        self.host = host
+        self.port = port
+        self.watch_path = Path(watch_path) if watch_path else None
+        self.watch_interval = watch_interval
+        self.warm = warm
+        self.max_responses = max_responses
+
+        self.analyzer = None
+        self.generation = 0
+        self.loaded_at = None
+        self.stats = {'requests': 0, 'computed': 0, 'coalesced': 0, 'reloads': 0}
+
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='retail-service')
+        self._analyzer_lock = threading.Lock()
+        self._responses = OrderedDict()
+        self._inflight = {}
+        self._reload_task = None
+        self._loaded_mtime = None
+        self._watch_task = None
+        self._server = None
+
+    @classmethod
+    def from_path(cls, data_path, streaming: bool = True, **kwargs) -> 'AnalyticsService':
+        """Servicio que carga y limpia un archivo con RetailDataLoader (y lo vigila para recargar)"""
+        try:
+            from .data_loader import RetailDataLoader
+        except ImportError:
+            from data_loader import RetailDataLoader
+
+        def load():
+            loader = RetailDataLoader(data_path)
+            if streaming and Path(data_path).suffix.lower() in ('.csv', '.parquet'):
+                return loader.load_clean_streaming()
+            loader.load_data()
+            return loader.clean_data()
+
+        kwargs.setdefault('watch_path', data_path)
+        return cls(load, **kwargs)
+
+    # ========== CICLO DE VIDA ==========
+
+    async def start(self):
+        """Carga los datos y empieza a escuchar"""
+        await self.reload()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.watch_path is not None:
+            self._watch_task = asyncio.create_task(self._watch())
+        print(f"✅ Servicio escuchando en http://{self.host}:{self.port}")
+        return self
+
+    async def stop(self):
+        """Deja de escuchar y libera el pool de hilos"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    # ========== RECARGA EN CALIENTE ==========
+
+    async def reload(self) -> int:
+        """
+        Recarga los datos en segundo plano y cambia de analizador
+
+        Las recargas concurrentes comparten la misma ejecución.
+
+        Returns:
+            Número de la nueva generación
+        """
+        if self._reload_task is None:
+            self._reload_task = asyncio.create_task(self._do_reload())
+        task = self._reload_task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done() and self._reload_task is task:
+                self._reload_task = None
+
+    async def _do_reload(self) -> int:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        # mtime previo a la carga: un cambio durante la carga dispara otra recarga
+        mtime = self._source_mtime()
+        df = await loop.run_in_executor(self._executor, self.load)
+        analyzer = await loop.run_in_executor(self._executor, RetailAnalyzer, df)
+
+        # Cambio atómico: las respuestas de la generación anterior dejan de servirse
+        self.analyzer = analyzer
+        self.generation += 1
+        self.loaded_at = pd.Timestamp.now()
+        self._loaded_mtime = mtime
+        self._responses = OrderedDict()
+        self.stats['reloads'] += 1
+        print(f"⚡ Datos cargados (generación {self.generation}, {len(df):,} filas) "
+              f"en {time.perf_counter() - start:.2f} s")
+
+        if self.warm:
+            await asyncio.gather(*(self.query(path, {}) for path in ENDPOINTS))
+        return self.generation
+
+    def _source_mtime(self):
+        if self.watch_path is None or not self.watch_path.exists():
+            return None
+        return self.watch_path.stat().st_mtime_ns
+
+    async def _watch(self):
+        """Recarga cuando cambia la fecha de modificación de watch_path"""
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            mtime = self._source_mtime()
+            if mtime is not None and mtime != self._loaded_mtime:
+                try:
+                    await self.reload()
+                except Exception as e:
+                    print(f"⚠️ Error al recargar {self.watch_path}: {e}")
+
+    # ========== CONSULTAS ==========
+
+    def _parse_params(self, path: str, params: dict) -> tuple:
+        method, accepted = ENDPOINTS[path]
+        kwargs, limit = {}, None
+        for name, value in params.items():
+            if name == 'limit':
+                limit = int(value)
+            elif name in accepted:
+                kwargs[name] = accepted[name](value)
+            else:
+                raise ValueError(f"Parámetro no soportado para {path}: {name}")
+        return method, kwargs, limit
+
+    def _compute(self, analyzer, method: str, kwargs: dict, limit) -> bytes:
+        with self._analyzer_lock:
+            result = getattr(analyzer, method)(**kwargs)
+        return serialize(result, limit)
+
+    async def query(self, path: str, params: dict) -> bytes:
+        """
+        Respuesta JSON de un endpoint de análisis
+
+        Las respuestas se guardan por generación en una LRU acotada por
+        max_responses; las peticiones idénticas concurrentes esperan al mismo
+        cálculo.
+
+        Raises:
+            KeyError: Si el endpoint no existe
+            ValueError: Si los parámetros son inválidos
+        """
+        method, kwargs, limit = self._parse_params(path, params)
+        analyzer, generation = self.analyzer, self.generation
+        key = (generation, method, tuple(sorted(kwargs.items())), limit)
+
+        cached = self._responses.get(key)
+        if cached is not None:
+            self._responses.move_to_end(key)
+            return cached
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._compute, analyzer, method, kwargs, limit)
+        self._inflight[key] = future
+        self.stats['computed'] += 1
+        try:
+            body = await asyncio.shield(future)
+        finally:
+            self._inflight.pop(key, None)
+        if generation == self.generation and self.max_responses > 0:
+            self._responses[key] = body
+            if len(self._responses) > self.max_responses:
+                self._responses.popitem(last=False)
+        return body
+
+    def health(self) -> bytes:
+        return json.dumps({
+            'status': 'ok' if self.analyzer is not None else 'loading',
+            'generation': self.generation,
+            'rows': len(self.analyzer.df) if self.analyzer is not None else 0,
+            'loaded_at': str(self.loaded_at),
+            'endpoints': sorted(ENDPOINTS),
+            **self.stats
+        }).encode('utf-8')
+
+    # ========== HTTP ==========
+
+    async def _route(self, verb: str, target: str) -> tuple:
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        if url.path == '/health':
+            return 200, self.health()
+        if url.path == '/reload':
+            if verb != 'POST':
+                return 405, json.dumps({'error': 'Use POST /reload'}).encode('utf-8')
+            generation = await self.reload()
+            return 200, json.dumps({'generation': generation}).encode('utf-8')
+        if url.path not in ENDPOINTS:
+            return 404, json.dumps({'error': f'Endpoint desconocido: {url.path}'}).encode('utf-8')
+        if verb != 'GET':
+            return 405, json.dumps({'error': f'Use GET {url.path}'}).encode('utf-8')
+        if self.analyzer is None:
+            return 503, json.dumps({'error': 'Datos aún no cargados'}).encode('utf-8')
+        try:
+            return 200, await self.query(url.path, params)
+        except ValueError as e:
+            return 400, json.dumps({'error': str(e)}).encode('utf-8')
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atiende una conexión HTTP/1.1 (una petición, luego se cierra)"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+            if len(head) > MAX_HEADER_BYTES:
+                raise ValueError('Cabecera demasiado grande')
+            request_line, *header_lines = head.decode('latin-1').split('\r\n')
+            verb, target, _ = request_line.split(' ', 2)
+            headers = dict(line.split(':', 1) for line in header_lines if ':' in line)
+            length = int(headers.get('Content-Length', headers.get('content-length', 0)))
+            if length:
+                await reader.readexactly(length)
+            self.stats['requests'] += 1
+            try:
+                status, body = await self._route(verb.upper(), target)
+            except Exception as e:
+                status, body = 500, json.dumps({'error': f'{type(e).__name__}: {e}'}).encode('utf-8')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            status, body = 400, json.dumps({'error': 'Petición HTTP inválida'}).encode('utf-8')
+
+        writer.write((f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+                      'Content-Type: application/json; charset=utf-8\r\n'
+                      f'Content-Length: {len(body)}\r\n'
+                      'Connection: close\r\n\r\n').encode('latin-1') + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servicio local de análisis retail')
+    parser.add_argument('data_path')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--watch-interval', type=float, default=5.0)
+    args = parser.parse_args()
+
+    async def serve():
+        service = AnalyticsService.from_path(args.data_path, host=args.host, port=args.port,
+                                             threads=args.threads, watch_interval=args.watch_interval)
+        await service.start()
+        try:
+            await service.serve_forever()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("Servicio detenido")
+
+
+if __name__ == '__main__':
+    main()
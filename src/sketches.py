@@ -0,0 +1,384 @@
+"""
+Sketches probabilísticos mergeables para el análisis retail.
+
+Incluye HyperLogLog vectorizado con NumPy para contar valores distintos
+(clientes, facturas), tanto en un único sketch como agrupado por celdas;
+t-digest para cuantiles; y Count-Min con seguimiento de heavy hitters para
+los productos y países más frecuentes. Todos se combinan con merge() y se
+serializan con state()/from_state() como dicts de arreglos NumPy.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PRECISION = 12
+DEFAULT_COMPRESSION = 200
+
+
+def hash_keys(values) -> np.ndarray:
+    """
+    Hash de 64 bits estable para claves de cliente/factura
+
+    La normalización es por valor, no por lote: todo valor entero (13085,
+    13085.0 o '13085') se hashea como int64 y el resto como texto, de modo que
+    una misma clave produce el mismo hash aunque llegue en lotes con tipos
+    distintos (un lote solo numérico y otro mezclado con 'C489449').
+
+    Args:
+        values: Series o arreglo de claves (se ignoran los nulos)
+
+    Returns:
+        Arreglo uint64 con un hash por valor no nulo
+    """
+    series = pd.Series(values)
+    series = series[series.notna()]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(series.cat.categories.dtype)
+
+    numeric = series if pd.api.types.is_numeric_dtype(series.dtype) else pd.to_numeric(series, errors='coerce')
+    numbers = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+    is_integer = np.isfinite(numbers) & (numbers == np.floor(numbers))
+    if is_integer.all():
+        return pd.util.hash_array(numbers.astype(np.int64))
+
+    hashes = np.empty(len(series), dtype=np.uint64)
+    hashes[is_integer] = pd.util.hash_array(numbers[is_integer].astype(np.int64))
+    hashes[~is_integer] = pd.util.hash_array(series[~is_integer].astype(str).to_numpy(dtype=object))
+    return hashes
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Número de bits significativos de cada entero uint64 (vectorizado)"""
+    x = x.copy()
+    length = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = x >= (np.uint64(1) << np.uint64(shift))
+        length[mask] += shift
+        x[mask] >>= np.uint64(shift)
+    return length + x.astype(np.int64)
+
+
+def register_updates(hashes: np.ndarray, precision: int):
+    """
+    Calcula (registro, rango) de HyperLogLog para cada hash
+
+    Returns:
+        Tupla (índice de registro int64, valor rho uint8)
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    tail_bits = 64 - precision
+    index = (hashes >> np.uint64(tail_bits)).astype(np.int64)
+    tail = hashes & np.uint64((1 << tail_bits) - 1)
+    rho = (tail_bits - _bit_length(tail) + 1).astype(np.uint8)
+    return index, rho
+
+
+def hll_estimate(registers: np.ndarray) -> np.ndarray:
+    """
+    Estima la cardinalidad de uno o varios sketches
+
+    Args:
+        registers: Arreglo (m,) o (n, m) de registros uint8
+
+    Returns:
+        Estimación float (o arreglo de estimaciones por fila)
+    """
+    regs = np.atleast_2d(registers)
+    m = regs.shape[1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -regs.astype(np.int64)), axis=1)
+
+    # Corrección de rango pequeño (conteo lineal)
+    zeros = np.count_nonzero(regs == 0, axis=1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    estimate = np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+    return estimate if np.ndim(registers) == 2 else float(estimate[0])
+
+
+def grouped_registers(group_codes: np.ndarray, n_groups: int, hashes: np.ndarray,
+                      precision: int) -> np.ndarray:
+    """
+    Construye un sketch HyperLogLog por grupo en una sola pasada
+
+    Args:
+        group_codes: Código de grupo por valor (0..n_groups-1)
+        n_groups: Número de grupos
+        hashes: Hash uint64 por valor (misma longitud que group_codes)
+        precision: Bits de precisión (m = 2**precision registros)
+
+    Returns:
+        Arreglo (n_groups, m) uint8
+    """
+    registers = np.zeros((n_groups, 1 << precision), dtype=np.uint8)
+    index, rho = register_updates(hashes, precision)
+    np.maximum.at(registers, (group_codes, index), rho)
+    return registers
+
+
+def merge_registers(group_codes: np.ndarray, n_groups: int, registers: np.ndarray) -> np.ndarray:
+    """Combina filas de registros por grupo (máximo elemento a elemento)"""
+    merged = np.zeros((n_groups, registers.shape[1]), dtype=np.uint8)
+    np.maximum.at(merged, group_codes, registers)
+    return merged
+
+
+class HyperLogLog:
+    """Sketch HyperLogLog para contar valores distintos de forma aproximada"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: np.ndarray = None):
+        """
+        Inicializa un sketch vacío
+
+        Args:
+            precision: Bits de precisión (error relativo ~1.04 / sqrt(2**precision))
+            registers: Registros existentes (opcional)
+        """
+        self.precision = precision
+        self.registers = (np.zeros(1 << precision, dtype=np.uint8)
+                          if registers is None else np.asarray(registers, dtype=np.uint8))
+
+    def add(self, values):
+        """Agrega valores (se hashean con hash_keys)"""
+        index, rho = register_updates(hash_keys(values), self.precision)
+        np.maximum.at(self.registers, index, rho)
+        return self
+
+    def merge(self, other: 'HyperLogLog'):
+        """Combina otro sketch con la misma precisión"""
+        if other.precision != self.precision:
+            raise ValueError("Solo se pueden combinar sketches con la misma precisión")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        """Retorna la cardinalidad estimada"""
+        return hll_estimate(self.registers)
+
+    def __len__(self):
+        return int(round(self.estimate()))
+
+    def state(self) -> dict:
+        return {'precision': np.int64(self.precision), 'registers': self.registers}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'HyperLogLog':
+        return cls(int(state['precision']), np.array(state['registers']))
+
+
+class TDigest:
+    """
+    t-digest para cuantiles aproximados, mergeable
+
+    La compresión agrupa los puntos ordenados por la función de escala
+    k1 (arcoseno), de forma vectorizada: los centroides son pequeños en las
+    colas y grandes en el centro, por lo que los percentiles extremos son
+    precisos.
+    """
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        if not total:
+            return
+
+        # k1(q) = δ/(2π)·asin(2q−1); un centroide abarca como máximo una unidad de k
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        cluster = np.floor(k - k.min()).astype(np.int64)
+        _, cluster = np.unique(cluster, return_inverse=True)
+
+        cluster_weights = np.bincount(cluster, weights=weights)
+        self.means = np.bincount(cluster, weights=means * weights) / cluster_weights
+        self.weights = cluster_weights
+
+    def add(self, values):
+        """Agrega valores (se ignoran los NaN)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def merge(self, other: 'TDigest'):
+        """Combina otro t-digest"""
+        if other.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q):
+        """Cuantil(es) aproximado(s) para q en [0, 1]"""
+        if not self.count:
+            return np.nan if np.ndim(q) == 0 else np.full(np.shape(q), np.nan)
+        positions = np.concatenate([[0], np.cumsum(self.weights) - self.weights / 2, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        result = np.interp(np.asarray(q, dtype=np.float64) * self.count, positions, values)
+        return float(result) if np.ndim(q) == 0 else result
+
+    def cdf(self, x):
+        """Fracción aproximada de valores <= x"""
+        if not self.count:
+            return np.nan if np.ndim(x) == 0 else np.full(np.shape(x), np.nan)
+        positions = np.concatenate([[0], np.cumsum(self.weights) - self.weights / 2, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        result = np.interp(np.asarray(x, dtype=np.float64), values, positions) / self.count
+        return float(result) if np.ndim(x) == 0 else result
+
+    def state(self) -> dict:
+        return {'compression': np.int64(self.compression), 'means': self.means, 'weights': self.weights,
+                'bounds': np.array([self.min, self.max])}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'TDigest':
+        digest = cls(int(state['compression']))
+        digest.means = np.array(state['means'], dtype=np.float64)
+        digest.weights = np.array(state['weights'], dtype=np.float64)
+        digest.min, digest.max = (float(v) for v in state['bounds'])
+        return digest
+
+
+class CountMinSketch:
+    """Sketch Count-Min para sumas aproximadas por clave (sobreestima, nunca subestima)"""
+
+    def __init__(self, width: int = 2048, depth: int = 5, seed: int = 0):
+        """
+        Inicializa el sketch
+
+        Args:
+            width: Columnas por fila (se redondea a potencia de 2); error ~ e/width · total
+            depth: Filas independientes; probabilidad de fallo ~ e^-depth
+            seed: Semilla de las funciones hash
+        """
+        self.bits = max(1, int(np.ceil(np.log2(width))))
+        self.depth = depth
+        self.seed = seed
+        self.table = np.zeros((depth, 1 << self.bits), dtype=np.float64)
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(1, 2**63, depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        """Columna de cada hash en cada fila (hash multiplicativo), forma (depth, n)"""
+        with np.errstate(over='ignore'):
+            mixed = hashes[None, :] * self._multipliers[:, None]
+        return (mixed >> np.uint64(64 - self.bits)).astype(np.int64)
+
+    def add_hashes(self, hashes: np.ndarray, weights=None):
+        """Suma pesos (1 por defecto) para claves ya hasheadas"""
+        weights = np.ones(len(hashes)) if weights is None else np.asarray(weights, dtype=np.float64)
+        columns = self._columns(np.asarray(hashes, dtype=np.uint64))
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], weights=weights, minlength=self.table.shape[1])
+        return self
+
+    def estimate_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        columns = self._columns(np.asarray(hashes, dtype=np.uint64))
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def add(self, keys, weights=None):
+        """Suma pesos para claves (hasheadas con hash_keys; los nulos se ignoran)"""
+        keys = pd.Series(keys)
+        valid = keys.notna().to_numpy()
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)[valid]
+        return self.add_hashes(hash_keys(keys), weights)
+
+    def estimate(self, keys) -> np.ndarray:
+        """Suma estimada por clave"""
+        return self.estimate_hashes(hash_keys(keys))
+
+    def merge(self, other: 'CountMinSketch'):
+        if other.table.shape != self.table.shape or other.seed != self.seed:
+            raise ValueError("Solo se pueden combinar sketches con la misma forma y semilla")
+        self.table += other.table
+        return self
+
+    def state(self) -> dict:
+        return {'table': self.table, 'seed': np.int64(self.seed)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'CountMinSketch':
+        table = np.array(state['table'], dtype=np.float64)
+        sketch = cls(table.shape[1], table.shape[0], int(state['seed']))
+        sketch.table = table
+        return sketch
+
+
+class HeavyHitters:
+    """Claves con mayor peso (top-k) usando Count-Min más un conjunto acotado de candidatos"""
+
+    def __init__(self, capacity: int = 256, width: int = 4096, depth: int = 5, seed: int = 0):
+        """
+        Inicializa el sketch
+
+        Args:
+            capacity: Candidatos que se conservan (debe superar el top-k que se consulte)
+            width, depth, seed: Parámetros del Count-Min subyacente
+        """
+        self.capacity = capacity
+        self.sketch = CountMinSketch(width, depth, seed)
+        self.candidates = np.empty(0, dtype=np.uint64)
+        self.labels = np.empty(0, dtype=object)
+
+    def _prune(self, hashes: np.ndarray, labels: np.ndarray):
+        hashes, first = np.unique(hashes, return_index=True)
+        labels = labels[first]
+        if len(hashes) > self.capacity:
+            keep = np.argpartition(-self.sketch.estimate_hashes(hashes), self.capacity - 1)[:self.capacity]
+            hashes, labels = hashes[keep], labels[keep]
+        self.candidates, self.labels = hashes, labels
+
+    def add(self, keys, weights=None):
+        """Suma pesos por clave y actualiza los candidatos"""
+        keys = pd.Series(keys)
+        valid = keys.notna().to_numpy()
+        keys = keys[valid]
+        weights = None if weights is None else np.asarray(weights, dtype=np.float64)[valid]
+        hashes = hash_keys(keys)
+        self.sketch.add_hashes(hashes, weights)
+        self._prune(np.concatenate([self.candidates, hashes]),
+                    np.concatenate([self.labels, keys.astype(str).to_numpy(dtype=object)]))
+        return self
+
+    def merge(self, other: 'HeavyHitters'):
+        self.sketch.merge(other.sketch)
+        self._prune(np.concatenate([self.candidates, other.candidates]),
+                    np.concatenate([self.labels, other.labels]))
+        return self
+
+    def top(self, n: int = 10) -> pd.Series:
+        """Top n claves con su peso estimado, de mayor a menor"""
+        estimates = self.sketch.estimate_hashes(self.candidates)
+        order = np.argsort(-estimates, kind='stable')[:n]
+        return pd.Series(estimates[order], index=pd.Index(self.labels[order].astype(str)))
+
+    def state(self) -> dict:
+        return {**self.sketch.state(), 'capacity': np.int64(self.capacity),
+                'candidates': self.candidates, 'labels': self.labels.astype(str)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> 'HeavyHitters':
+        hitters = cls(int(state['capacity']))
+        hitters.sketch = CountMinSketch.from_state(state)
+        hitters.candidates = np.array(state['candidates'], dtype=np.uint64)
+        hitters.labels = np.array(state['labels']).astype(object)
+        return hitters
@@ -1,16 +1,486 @@
 """
-Módulo para ejecutar queries SQL sobre datos de Retail (SQL Server)
+Módulo para ejecutar queries SQL sobre datos de Retail (SQL Server o SQLite embebido)
 """
 
+import itertools
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
 import pandas as pd
-import pyodbc
 from pathlib import Path
 
+try:
+    from .query_registry import (QueryRegistry, QueryResultCache, parse_queries,
+                                 referenced_tables)
+    from .instrumentation import stage
+except ImportError:
+    from query_registry import (QueryRegistry, QueryResultCache, parse_queries,
+                                referenced_tables)
+    from instrumentation import stage
+
+DEFAULT_INDEX_COLUMNS = ['Invoice', 'CustomerID', 'Description', 'InvoiceDate']
+BULK_CHUNKSIZE = 10_000
+STAGING_SUFFIX = '_staging'
+DEFAULT_POOL_SIZE = 4
+# Versión durable de cada tabla cargada (compartida por todos los procesos)
+TABLE_VERSIONS = 'retail_table_versions'
+
+# Formatos .NET usados en FORMAT(...) → equivalentes de strftime en SQLite
+_DOTNET_TO_STRFTIME = [('yyyy', '%Y'), ('MM', '%m'), ('dd', '%d'),
+                       ('HH', '%H'), ('mm', '%M'), ('ss', '%S')]
+
+
+def _replace_function(sql: str, name: str, build) -> str:
+    """
+    Reemplaza llamadas NAME(arg1, arg2, ...) respetando paréntesis anidados
+    y literales entre comillas. `build` recibe la lista de argumentos.
+    """
+    pattern = re.compile(rf'\b{name}\s*\(', re.IGNORECASE)
+    output = []
+    pos = 0
+
+    while True:
+        match = pattern.search(sql, pos)
+        if match is None:
+            break
+
+        depth, i, in_string = 1, match.end(), False
+        args, arg_start = [], match.end()
+        while depth:
+            if i >= len(sql):
+                raise ValueError(f"Paréntesis sin cerrar en {name}(...)")
+            ch = sql[i]
+            if ch == "'":
+                in_string = not in_string
+            elif not in_string:
+                if ch == '(':
+                    depth += 1
+                elif ch == ')':
+                    depth -= 1
+                elif ch == ',' and depth == 1:
+                    args.append(sql[arg_start:i])
+                    arg_start = i + 1
+            i += 1
+        args.append(sql[arg_start:i - 1])
+
+        output.append(sql[pos:match.start()])
+        output.append(build([_replace_function(a.strip(), name, build) for a in args]))
+        pos = i
+
+    output.append(sql[pos:])
+    return ''.join(output)
+
+
+def _format_to_strftime(args):
+    value, fmt = args
+    fmt = fmt.strip("'")
+    for dotnet, strftime in _DOTNET_TO_STRFTIME:
+        fmt = fmt.replace(dotnet, strftime)
+    return f"strftime('{fmt}', {value})"
+
+
+def _datediff_to_julianday(args):
+    part, start, end = args
+    part = part.upper()
+    if part in ('DAY', 'DD', 'D'):
+        return f"CAST(julianday(date({end})) - julianday(date({start})) AS INTEGER)"
+    if part in ('MONTH', 'MM', 'M'):
+        return (f"((CAST(strftime('%Y', {end}) AS INTEGER) - CAST(strftime('%Y', {start}) AS INTEGER)) * 12"
+                f" + CAST(strftime('%m', {end}) AS INTEGER) - CAST(strftime('%m', {start}) AS INTEGER))")
+    raise ValueError(f"DATEDIFF con parte '{part}' no soportado en SQLite")
+
+
+def translate_tsql(query: str) -> str:
+    """
+    Traduce las construcciones T-SQL usadas en sql/queries.sql a SQLite
+
+    Soporta `SELECT TOP n` (→ LIMIT n), `FORMAT(fecha, 'yyyy-MM')`
+    (→ strftime) y `DATEDIFF(DAY|MONTH, inicio, fin)` (→ julianday/strftime).
+    """
+    query = query.strip()
+    has_semicolon = query.endswith(';')
+    query = query.rstrip(';').rstrip()
+
+    limit = None
+    match = re.match(r'(\s*SELECT\s+)TOP\s+(\d+)\s+', query, re.IGNORECASE)
+    if match:
+        limit = int(match.group(2))
+        query = match.group(1) + query[match.end():]
+
+    query = _replace_function(query, 'FORMAT', _format_to_strftime)
+    query = _replace_function(query, 'DATEDIFF', _datediff_to_julianday)
+
+    if limit is not None:
+        query = f"{query}\nLIMIT {limit}"
+    return query + (';' if has_semicolon else '')
+
+
+def sql_column_types(df: pd.DataFrame, dialect: str = 'mssql') -> dict:
+    """
+    Tipos SQLAlchemy explícitos por columna para la carga masiva
+
+    Evita que to_sql infiera tipos genéricos (ej. NVARCHAR(max) para todo el texto).
+
+    Args:
+        df: DataFrame a cargar
+        dialect: Nombre del dialecto destino ('mssql', 'sqlite', ...)
+
+    Returns:
+        Dict columna -> tipo SQLAlchemy
+    """
+    from sqlalchemy import types
+
+    column_types = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            column_types[col] = types.Boolean()
+        elif pd.api.types.is_integer_dtype(dtype):
+            column_types[col] = types.BigInteger() if dtype.itemsize > 4 else types.Integer()
+        elif pd.api.types.is_float_dtype(dtype):
+            column_types[col] = types.Float(precision=24 if dtype.itemsize <= 4 else 53)
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            column_types[col] = types.DateTime()
+        else:
+            lengths = df[col].dropna().astype(str).str.len()
+            max_len = int(lengths.max()) if len(lengths) else 1
+            # En SQL Server NVARCHAR admite hasta 4000; por encima se usa NVARCHAR(max)
+            length = max_len if (dialect != 'mssql' or max_len <= 4000) else None
+            column_types[col] = types.Unicode(length=max(length, 1) if length else None)
+    return column_types
+
+
+def new_table_version() -> str:
+    """Identificador único de una carga de tabla"""
+    return uuid.uuid4().hex
+
+
+def _write_table_version(conn, table_name: str, version: str):
+    """Registra la versión de table_name en TABLE_VERSIONS (conexión SQLAlchemy)"""
+    from sqlalchemy import text
+
+    if conn.dialect.name == 'mssql':
+        conn.execute(text(f"IF OBJECT_ID(N'{TABLE_VERSIONS}', N'U') IS NULL "
+                          f"CREATE TABLE {TABLE_VERSIONS} (table_name NVARCHAR(128) PRIMARY KEY, "
+                          f"version CHAR(32) NOT NULL, loaded_at DATETIME2 NOT NULL)"))
+    else:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {TABLE_VERSIONS} (table_name VARCHAR(128) PRIMARY KEY, "
+                          f"version CHAR(32) NOT NULL, loaded_at TIMESTAMP NOT NULL)"))
+    conn.execute(text(f"DELETE FROM {TABLE_VERSIONS} WHERE table_name = :table"), {'table': table_name})
+    conn.execute(text(f"INSERT INTO {TABLE_VERSIONS} (table_name, version, loaded_at) "
+                      f"VALUES (:table, :version, :loaded_at)"),
+                 {'table': table_name, 'version': version, 'loaded_at': datetime.now()})
+
+
+def _swap_tables(engine, staging_table: str, table_name: str, version: str):
+    """Reemplaza table_name por staging_table (y registra su versión) en una sola transacción"""
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        if engine.dialect.name == 'mssql':
+            conn.execute(text(f"IF OBJECT_ID(N'{table_name}', N'U') IS NOT NULL DROP TABLE [{table_name}]"))
+            conn.execute(text(f"EXEC sp_rename '{staging_table}', '{table_name}'"))
+        else:
+            conn.execute(text(f'DROP TABLE IF EXISTS "{table_name}"'))
+            conn.execute(text(f'ALTER TABLE "{staging_table}" RENAME TO "{table_name}"'))
+        _write_table_version(conn, table_name, version)
+
+
+class ConnectionPool:
+    """Pool acotado de conexiones DB-API, creadas bajo demanda"""
+
+    def __init__(self, factory, size: int = DEFAULT_POOL_SIZE):
+        """
+        Inicializa el pool
+
+        Args:
+            factory: Función sin argumentos que abre una conexión nueva
+            size: Número máximo de conexiones abiertas
+        """
+        self.factory = factory
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._all = []
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        """Presta una conexión del pool y la devuelve al terminar"""
+        conn = self._acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def _acquire(self, timeout: float = None):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
 
-class SQLServerExecutor:
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                conn = self.factory()
+                self._all.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No hay conexiones libres en el pool") from None
+
+    def close_all(self):
+        """Cierra todas las conexiones creadas por el pool"""
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all = []
+            self._created = 0
+            self._idle = queue.LifoQueue()
+
+
+class BaseSQLExecutor(ABC):
+    """Funcionalidad común de los ejecutores: queries, archivos .sql y contexto"""
+
+    conn = None
+    pool_size = DEFAULT_POOL_SIZE
+    result_cache = None
+    _pool = None
+    _registries = None
+
+    @abstractmethod
+    def connect(self):
+        """Abre la conexión principal (self.conn)"""
+
+    @abstractmethod
+    def _new_connection(self):
+        """Abre una conexión adicional para el pool"""
+
+    def _cancel(self, conn, cursor):
+        """Cancela la query en curso en `cursor` (usado al vencer el timeout)"""
+        cursor.cancel()
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """Pool de conexiones para la ejecución concurrente"""
+        if self._pool is None:
+            if self.conn is None:
+                self.connect()
+            self._pool = ConnectionPool(self._new_connection, self.pool_size)
+        return self._pool
+
+    def translate(self, query: str) -> str:
+        """Adapta la query al dialecto del backend (por defecto, sin cambios)"""
+        return query
+
+    def execute_query(self, query: str) -> pd.DataFrame:
+        """
+        Ejecuta una query SQL y devuelve un DataFrame con los resultados.
+        """
+        if self.conn is None:
+            self.connect()
+
+        return pd.read_sql(self.translate(query), self.conn)
+
+    def execute_query_file(self, query_file: str, query_number=1, use_cache: bool = True) -> pd.DataFrame:
+        """
+        Ejecuta una query específica dentro de un archivo .sql
+        Las queries se separan por comentarios de la forma '-- N.'
+
+        Args:
+            query_file: Ruta del archivo .sql
+            query_number: Número de la query o su título
+            use_cache: Usa la caché de resultados si está habilitada
+        """
+        sql = self.registry(query_file).get(query_number)['sql']
+        if use_cache and self.result_cache is not None:
+            return self.execute_cached(sql)
+        return self.execute_query(sql)
+
+    # ========== REGISTRO DE QUERIES Y CACHÉ DE RESULTADOS ==========
+
+    def registry(self, query_file) -> QueryRegistry:
+        """Registro parseado (una sola vez por archivo) de un archivo .sql"""
+        if self._registries is None:
+            self._registries = {}
+        path = str(Path(query_file).resolve())
+        if path not in self._registries:
+            self._registries[path] = QueryRegistry(path)
+        return self._registries[path]
+
+    def enable_result_cache(self, cache_dir=None, ttl: float = 300, maxsize: int = 64) -> QueryResultCache:
+        """
+        Habilita la caché de resultados de queries
+
+        Args:
+            cache_dir: Directorio para persistir resultados en Parquet (opcional)
+            ttl: Segundos de validez de cada resultado
+            maxsize: Número máximo de resultados guardados
+        """
+        self.result_cache = QueryResultCache(cache_dir, ttl=ttl, maxsize=maxsize)
+        return self.result_cache
+
+    def table_watermark(self, table_name: str):
+        """
+        Versión durable de una tabla
+
+        create_table_from_df la escribe en TABLE_VERSIONS en cada carga, así que
+        es la misma para todos los procesos y cambia con cada recarga, aunque
+        el número de filas sea igual.
+
+        Returns:
+            Versión registrada, o None si la tabla no se cargó con este ejecutor
+        """
+        name = table_name.replace("'", "''")
+        try:
+            rows = self._run_pooled(f"SELECT version FROM {TABLE_VERSIONS} WHERE table_name = '{name}'")
+        except Exception:
+            # TABLE_VERSIONS aún no existe en esta base
+            return None
+        return str(rows.iloc[0, 0]) if len(rows) else None
+
+    def _mark_table_loaded(self, table_name: str):
+        """Invalida en este proceso los resultados que dependen de la tabla recargada"""
+        if self.result_cache is not None:
+            self.result_cache.invalidate_table(table_name)
+
+    def execute_cached(self, sql: str) -> pd.DataFrame:
+        """
+        Ejecuta una query reutilizando el resultado si la tabla no cambió
+
+        Las queries sobre tablas sin versión registrada no se cachean.
+        """
+        if self.result_cache is None:
+            return self.execute_query(sql)
+
+        tables = referenced_tables(sql)
+        versions = [self.table_watermark(t) for t in tables]
+        if any(version is None for version in versions):
+            return self.execute_query(sql)
+
+        watermark = '|'.join(f"{t}={v}" for t, v in zip(tables, versions))
+        cached = self.result_cache.get(sql, watermark)
+        if cached is not None:
+            return cached
+
+        result = self.execute_query(sql)
+        self.result_cache.put(sql, watermark, result, tables)
+        return result
+
+    # ========== EJECUCIÓN CONCURRENTE ==========
+
+    def _run_pooled(self, sql: str, timeout: float = None) -> pd.DataFrame:
+        """Ejecuta una query con una conexión del pool, cancelándola si excede el timeout"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            timed_out = threading.Event()
+            timer = None
+            if timeout is not None:
+                def cancel():
+                    timed_out.set()
+                    self._cancel(conn, cursor)
+                timer = threading.Timer(timeout, cancel)
+                timer.start()
+            try:
+                cursor.execute(self.translate(sql))
+                columns = [d[0] for d in cursor.description] if cursor.description else []
+                rows = [tuple(row) for row in cursor.fetchall()]
+            except Exception as exc:
+                if timed_out.is_set():
+                    raise TimeoutError(f"Query cancelada tras {timeout} s") from exc
+                raise
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                cursor.close()
+
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    def execute_many(self, queries, max_workers: int = None, timeout: float = None) -> dict:
+        """
+        Ejecuta queries independientes en paralelo sobre el pool de conexiones
+
+        Args:
+            queries: Dict clave -> SQL (o lista de tuplas (clave, SQL))
+            max_workers: Hilos concurrentes (por defecto, el tamaño del pool)
+            timeout: Segundos máximos por query; al vencer se cancela
+
+        Returns:
+            Dict clave -> {'data', 'seconds', 'error'} en el orden recibido
+        """
+        items = list(queries.items() if isinstance(queries, dict) else queries)
+
+        def run(sql):
+            start = time.perf_counter()
+            try:
+                data, error = self._run_pooled(sql, timeout), None
+            except Exception as exc:
+                data, error = None, exc
+            return {'data': data, 'seconds': time.perf_counter() - start, 'error': error}
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool.size) as executor:
+            futures = [(key, executor.submit(run, sql)) for key, sql in items]
+            return {key: future.result() for key, future in futures}
+
+    def execute_all_in_file(self, query_file: str, key: str = 'number',
+                            max_workers: int = None, timeout: float = None) -> dict:
+        """
+        Ejecuta en paralelo todas las queries de un archivo .sql
+
+        Args:
+            query_file: Ruta del archivo .sql
+            key: 'number' o 'title' para indexar los resultados
+            max_workers: Hilos concurrentes
+            timeout: Segundos máximos por query
+
+        Returns:
+            Dict número/título -> {'number', 'title', 'data', 'seconds', 'error'}
+        """
+        if key not in ('number', 'title'):
+            raise ValueError("key debe ser 'number' o 'title'")
+
+        queries = self.registry(query_file).queries
+        results = self.execute_many([(q[key], q['sql']) for q in queries], max_workers, timeout)
+        for q in queries:
+            results[q[key]].update(number=q['number'], title=q['title'])
+
+        failed = sum(r['error'] is not None for r in results.values())
+        print(f"⚡ {len(results)} queries ejecutadas en paralelo ({failed} con error)")
+        return results
+
+    def close(self):
+        """Cierra la conexión y el pool"""
+        if self._pool is not None:
+            self._pool.close_all()
+            self._pool = None
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+            print("🔒 Conexión cerrada")
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SQLServerExecutor(BaseSQLExecutor):
     """Ejecutor de queries SQL sobre base de datos SQL Server"""
 
-    def __init__(self, server: str, database: str, username: str = None, password: str = None, trusted_connection: bool = True):
+    def __init__(self, server: str, database: str, username: str = None, password: str = None, trusted_connection: bool = True,
+                 engine=None, pool_size: int = DEFAULT_POOL_SIZE):
         """
         Inicializa la conexión con SQL Server.
 
@@ -20,6 +490,8 @@ class SQLServerExecutor:
             username (str): Usuario SQL (si no se usa autenticación de Windows)
             password (str): Contraseña (si aplica)
             trusted_connection (bool): Usa autenticación de Windows si es True
+            engine: Engine de SQLAlchemy ya creado (opcional, ej. una base local de prueba)
+            pool_size (int): Conexiones máximas para la ejecución concurrente
         """
         self.server = server
         self.database = database
@@ -27,79 +499,176 @@ class SQLServerExecutor:
         self.password = password
         self.trusted_connection = trusted_connection
         self.conn = None
+        self._engine = engine
+        self.pool_size = pool_size
+
+    def _connection_string(self) -> str:
+        if self.trusted_connection:
+            return f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server};DATABASE={self.database};Trusted_Connection=yes;"
+        return f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server};DATABASE={self.database};UID={self.username};PWD={self.password};"
 
     def connect(self):
         """Establece conexión con SQL Server"""
-        if self.trusted_connection:
-            conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server};DATABASE={self.database};Trusted_Connection=yes;"
-        else:
-            conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.server};DATABASE={self.database};UID={self.username};PWD={self.password};"
+        import pyodbc
 
-        self.conn = pyodbc.connect(conn_str)
+        with stage('sql.connect', backend='sqlserver', server=self.server):
+            self.conn = pyodbc.connect(self._connection_string())
         print(f"✅ Conectado a SQL Server: {self.server} / BD: {self.database}")
 
-    def create_table_from_df(self, df: pd.DataFrame, table_name: str = 'retail_transactions'):
-        """
-        Crea o reemplaza una tabla en SQL Server a partir de un DataFrame.
-        (Usa SQLAlchemy para cargar los datos fácilmente)
+    def _new_connection(self):
+        import pyodbc
+
+        return pyodbc.connect(self._connection_string())
+
+    def get_engine(self):
         """
-        from sqlalchemy import create_engine
+        Retorna el engine de SQLAlchemy (con pool de conexiones), creándolo una sola vez
 
-        # Cadena de conexión compatible con SQLAlchemy
-        engine_url = f"mssql+pyodbc://{self.server}/{self.database}?driver=ODBC+Driver+17+for+SQL+Server&trusted_connection=yes"
-        engine = create_engine(engine_url)
+        Usa las credenciales del ejecutor y fast_executemany de pyodbc.
+        """
+        if self._engine is None:
+            from sqlalchemy import create_engine
+            from sqlalchemy.engine import URL
 
-        df.to_sql(table_name, con=engine, if_exists='replace', index=False)
-        print(f"📦 Tabla '{table_name}' creada con {len(df)} registros")
+            query = {'driver': 'ODBC Driver 17 for SQL Server'}
+            if self.trusted_connection:
+                query['trusted_connection'] = 'yes'
+            url = URL.create(
+                'mssql+pyodbc',
+                username=None if self.trusted_connection else self.username,
+                password=None if self.trusted_connection else self.password,
+                host=self.server,
+                database=self.database,
+                query=query
+            )
+            self._engine = create_engine(url, fast_executemany=True, pool_pre_ping=True)
+        return self._engine
 
-    def execute_query(self, query: str) -> pd.DataFrame:
+    def create_table_from_df(self, df: pd.DataFrame, table_name: str = 'retail_transactions',
+                             chunksize: int = BULK_CHUNKSIZE, staging: bool = False) -> dict:
         """
-        Ejecuta una query SQL y devuelve un DataFrame con los resultados.
+        Crea o reemplaza una tabla en SQL Server a partir de un DataFrame.
+
+        Carga por lotes con fast_executemany y tipos de columna explícitos. Con
+        `staging=True` los datos se cargan en una tabla auxiliar que luego
+        reemplaza a la definitiva en una sola transacción, de modo que los
+        lectores nunca ven una tabla a medio cargar.
+
+        Args:
+            df: DataFrame a cargar
+            table_name: Nombre de la tabla destino
+            chunksize: Filas por lote de INSERT
+            staging: Si es True usa tabla auxiliar + intercambio
+
+        Returns:
+            Dict con filas cargadas, segundos y filas por segundo
         """
-        if self.conn is None:
-            self.connect()
+        engine = self.get_engine()
+        target = f"{table_name}{STAGING_SUFFIX}" if staging else table_name
+        version = new_table_version()
+
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            df.to_sql(target, con=conn, if_exists='replace', index=False,
+                      chunksize=chunksize, dtype=sql_column_types(df, engine.dialect.name))
+            if not staging:
+                _write_table_version(conn, table_name, version)
+        if staging:
+            _swap_tables(engine, target, table_name, version)
+        elapsed = time.perf_counter() - start
+        self._mark_table_loaded(table_name)
+
+        stats = {
+            'table': table_name,
+            'rows': len(df),
+            'seconds': elapsed,
+            'rows_per_sec': len(df) / elapsed if elapsed > 0 else float('inf')
+        }
+        print(f"📦 Tabla '{table_name}' creada con {len(df)} registros "
+              f"({stats['rows_per_sec']:,.0f} filas/s)")
+        return stats
+
+    def close(self):
+        """Cierra la conexión y libera el pool del engine"""
+        super().close()
+        if self._engine is not None:
+            self._engine.dispose()
+
 
-        return pd.read_sql(query, self.conn)
+class SQLiteExecutor(BaseSQLExecutor):
+    """Ejecutor embebido (SQLite) que corre las mismas queries T-SQL en proceso"""
 
-    def execute_query_file(self, query_file: str, query_number: int = 1) -> pd.DataFrame:
+    _memory_ids = itertools.count()
+
+    def __init__(self, database: str = ':memory:', pool_size: int = DEFAULT_POOL_SIZE):
         """
-        Ejecuta una query específica dentro de un archivo .sql
-        Las queries se separan por comentarios de la forma '-- N.'
+        Inicializa el ejecutor local.
+
+        Args:
+            database (str): Ruta del archivo SQLite o ':memory:' para una base en memoria
+            pool_size (int): Conexiones máximas para la ejecución concurrente
         """
-        with open(query_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        self.database = database
+        self.pool_size = pool_size
+        self.conn = None
 
-        queries = []
-        current_query = []
+        # Una base en memoria compartida permite que el pool vea las mismas tablas
+        if database == ':memory:':
+            self._uri = f"file:retail-{next(self._memory_ids)}?mode=memory&cache=shared"
+        else:
+            self._uri = Path(database).resolve().as_uri()
 
-        for line in content.split('\n'):
-            if line.strip().startswith('-- ') and '. ' in line and not line.startswith('-- ='):
-                if current_query:
-                    queries.append('\n'.join(current_query))
-                current_query = []
-            elif line.strip() and not line.strip().startswith('--'):
-                current_query.append(line)
+    def connect(self):
+        """Abre (o crea) la base de datos SQLite"""
+        with stage('sql.connect', backend='sqlite'):
+            self.conn = self._new_connection()
+        print(f"✅ Conectado a SQLite: {self.database}")
 
-        if current_query:
-            queries.append('\n'.join(current_query))
+    def _new_connection(self):
+        return sqlite3.connect(self._uri, uri=True, check_same_thread=False)
 
-        if query_number < 1 or query_number > len(queries):
-            raise ValueError(f"Query {query_number} no existe. Hay {len(queries)} queries disponibles.")
+    def _cancel(self, conn, cursor):
+        conn.interrupt()
 
-        return self.execute_query(queries[query_number - 1])
+    def translate(self, query: str) -> str:
+        return translate_tsql(query)
 
-    def close(self):
-        """Cierra la conexión"""
-        if self.conn:
-            self.conn.close()
-            print("🔒 Conexión cerrada")
+    def create_table_from_df(self, df: pd.DataFrame, table_name: str = 'retail_transactions',
+                             index_columns: list = None):
+        """
+        Carga un DataFrame en una tabla SQLite y crea índices.
 
-    def __enter__(self):
-        self.connect()
-        return self
+        Args:
+            df: DataFrame limpio de retail
+            table_name: Nombre de la tabla a crear o reemplazar
+            index_columns: Columnas a indexar (por defecto Invoice, CustomerID,
+                Description e InvoiceDate)
+        """
+        if self.conn is None:
+            self.connect()
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
+        table = df.copy()
+        for col in table.columns:
+            if pd.api.types.is_datetime64_any_dtype(table[col]):
+                # Texto ISO: compatible con strftime/julianday de SQLite
+                table[col] = table[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+            elif isinstance(table[col].dtype, pd.CategoricalDtype):
+                table[col] = table[col].astype(object)
+
+        table.to_sql(table_name, con=self.conn, if_exists='replace', index=False)
+
+        columns = DEFAULT_INDEX_COLUMNS if index_columns is None else index_columns
+        for col in columns:
+            if col in table.columns:
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_{col}" ON "{table_name}" ("{col}")')
+        self.conn.execute('ANALYZE')
+        self.conn.execute(f'CREATE TABLE IF NOT EXISTS {TABLE_VERSIONS} '
+                          f'(table_name TEXT PRIMARY KEY, version TEXT NOT NULL, loaded_at TEXT NOT NULL)')
+        self.conn.execute(f'INSERT OR REPLACE INTO {TABLE_VERSIONS} VALUES (?, ?, ?)',
+                          (table_name, new_table_version(), datetime.now().isoformat(timespec='seconds')))
+        self.conn.commit()
+        self._mark_table_loaded(table_name)
+        print(f"📦 Tabla '{table_name}' creada con {len(df)} registros")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+"""
+Índice temporal precalculado para el análisis de ventas.
+
+Deriva una sola vez, a partir de InvoiceDate, columnas enteras compactas
+(año-mes, día de la semana 0-6 y hora) y un orden de filas por fecha, de modo
+que los métodos temporales agregan con núcleos tipo np.bincount sin volver a
+usar el accesor .dt.
+"""
+
+import numpy as np
+import pandas as pd
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday',
+             'Friday', 'Saturday', 'Sunday']
+
+NS_PER_HOUR = 3_600 * 10**9
+
+
+class TemporalIndex:
+    """Claves temporales enteras y orden por fecha de un conjunto de filas"""
+
+    def __init__(self, dates: pd.Series):
+        """
+        Construye el índice a partir de una columna de fechas
+
+        Args:
+            dates: Series datetime64 (ej. InvoiceDate)
+        """
+        values = dates.to_numpy(dtype='datetime64[ns]')
+        self.dates_ns = values.view(np.int64)
+
+        # Meses desde 1970-01 (mismo ordinal que Period 'M') y días desde 1970-01-01
+        months = values.astype('datetime64[M]').astype(np.int64)
+        days = values.astype('datetime64[D]').astype(np.int64)
+
+        self.month_base = int(months.min()) if len(months) else 0
+        self.month_code = (months - self.month_base).astype(np.int32)
+        self.n_months = int(self.month_code.max()) + 1 if len(months) else 0
+
+        # 1970-01-01 fue jueves: desplazar para que lunes = 0
+        self.weekday = ((days + 3) % 7).astype(np.int8)
+        self.hour = ((self.dates_ns // NS_PER_HOUR) % 24).astype(np.int8)
+
+        self.order = np.argsort(self.dates_ns, kind='stable')
+        self.sorted_dates_ns = self.dates_ns[self.order]
+
+    def __len__(self):
+        return len(self.dates_ns)
+
+    def month_periods(self, codes: np.ndarray) -> pd.PeriodIndex:
+        """Convierte códigos de mes a PeriodIndex mensual"""
+        return pd.PeriodIndex.from_ordinals(self.month_base + np.asarray(codes, dtype=np.int64), freq='M')
+
+    def rows_between(self, start=None, end=None) -> np.ndarray:
+        """
+        Posiciones de las filas con fecha en [start, end)
+
+        Args:
+            start: Fecha inicial incluida (None = sin límite)
+            end: Fecha final excluida (None = sin límite)
+
+        Returns:
+            Arreglo de posiciones en orden cronológico
+        """
+        lo = 0 if start is None else np.searchsorted(self.sorted_dates_ns, pd.Timestamp(start).value, 'left')
+        hi = len(self) if end is None else np.searchsorted(self.sorted_dates_ns, pd.Timestamp(end).value, 'left')
+        return self.order[lo:hi]
+
+
+def sum_count_by_key(keys: np.ndarray, weights: np.ndarray, size: int):
+    """
+    Suma y conteo por clave entera en una pasada de bincount
+
+    Returns:
+        Tupla (sumas float64, conteos int64) de longitud `size`
+    """
+    sums = np.bincount(keys, weights=weights, minlength=size)
+    counts = np.bincount(keys, minlength=size)
+    return sums, counts
@@ -1,16 +1,104 @@
 """
 Módulo para visualización de datos de retail.
+
+Cada gráfico se separa en una agregación (aggregate_*), que produce datos
+pequeños listos para graficar, y un dibujo (draw_*), que pinta esos datos
+sobre una figura dada. Los métodos plot_* combinan ambos pasos para uso
+interactivo; report_renderer reutiliza las mismas piezas en modo batch.
+
+Las agregaciones se memoizan (se invalidan si cambia el DataFrame) y pueden
+exportarse a un JSON pequeño y recargarse, de modo que volver a dibujar o
+cambiar el estilo de un gráfico no vuelve a leer las transacciones.
 """
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+import json
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 from typing import Optional, List
 
-# Configuración de estilo
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
+try:
+    from .result_cache import FrameWatcher
+except ImportError:
+    from result_cache import FrameWatcher
+
+# matplotlib y seaborn se importan al dibujar: importar el módulo (o solo
+# agregar) no paga su costo de arranque ni modifica rcParams globales
+_style_applied = False
+
+
+def setup_plot_style(force: bool = False):
+    """
+    Aplica el estilo de gráficos del proyecto (seaborn whitegrid y rcParams)
+
+    Se llama automáticamente antes del primer dibujo; es idempotente.
+
+    Args:
+        force: Si es True vuelve a aplicarlo aunque ya se haya aplicado
+    """
+    global _style_applied
+    if _style_applied and not force:
+        return
+    import matplotlib
+    import seaborn as sns
+
+    sns.set_style("whitegrid")
+    matplotlib.rcParams['figure.figsize'] = (12, 6)
+    matplotlib.rcParams['font.size'] = 10
+    _style_applied = True
+
+
+def _palette(name: str, n: int):
+    import seaborn as sns
+    return sns.color_palette(name, n)
+
+# Tamaño de figura de cada tipo de gráfico
+FIGSIZES = {
+    'sales_over_time': (14, 6),
+    'top_countries': (12, 8),
+    'top_products': (12, 8),
+    'sales_distribution': (16, 6),
+}
+
+HISTOGRAM_BINS = 50
+
+# Máximo de valores atípicos guardados para el boxplot (los visibles bajo el p95)
+MAX_FLIERS = 1_000
+
+
+def _encode(data):
+    """Convierte un resultado agregado a una estructura serializable en JSON"""
+    if isinstance(data, pd.Series):
+        index = data.index
+        datetime_index = isinstance(index, pd.DatetimeIndex)
+        return {
+            'kind': 'series',
+            'name': data.name,
+            'index_name': index.name,
+            'index_kind': 'datetime' if datetime_index else 'label',
+            'index': [ts.isoformat() for ts in index] if datetime_index else [str(x) for x in index],
+            'values': data.tolist()
+        }
+    if isinstance(data, np.ndarray):
+        return {'kind': 'array', 'values': data.tolist()}
+    if isinstance(data, dict):
+        return {'kind': 'dict', 'items': {k: _encode(v) for k, v in data.items()}}
+    return data.item() if isinstance(data, np.generic) else data
+
+
+def _decode(payload):
+    """Inverso de _encode"""
+    if not isinstance(payload, dict):
+        return payload
+    if payload['kind'] == 'series':
+        index = payload['index']
+        index = pd.DatetimeIndex(index) if payload['index_kind'] == 'datetime' else pd.Index(index)
+        return pd.Series(payload['values'], index=index.rename(payload['index_name']),
+                         name=payload['name'], dtype=np.float64)
+    if payload['kind'] == 'array':
+        return np.asarray(payload['values'])
+    return {k: _decode(v) for k, v in payload['items'].items()}
 
 
 class RetailVisualizer:
@@ -24,6 +112,8 @@ class RetailVisualizer:
             df: DataFrame con datos de retail.
         """
         self.df = df
+        self._aggregates = {}
+        self._watcher = FrameWatcher()
 
     def _validate_columns(self, required_cols: List[str]):
         """Valida que existan las columnas necesarias en el DataFrame."""
@@ -31,103 +121,218 @@ class RetailVisualizer:
         if missing:
             raise KeyError(f"Faltan columnas requeridas en el DataFrame: {missing}")
 
-    def plot_sales_over_time(self, freq: str = 'M', save_path: Optional[str] = None):
-        """Gráfico de ventas a lo largo del tiempo."""
-        self._validate_columns(['InvoiceDate', 'TotalAmount'])
+    # ========== AGREGACIONES (MEMOIZADAS) ==========
 
-        sales_time = self.df.groupby(
-            pd.Grouper(key='InvoiceDate', freq=freq)
-        )['TotalAmount'].sum()
+    def _cached(self, key, compute):
+        """Memoiza una agregación; se invalida si se reemplaza self.df"""
+        if self.df is not None and self._watcher.changed(self.df):
+            self._aggregates = {}
+        if key not in self._aggregates:
+            if self.df is None:
+                raise ValueError(f"La agregación {key} no está en las agregaciones cargadas "
+                                 "y no hay datos crudos para calcularla")
+            self._aggregates[key] = compute()
+        return self._aggregates[key]
 
-        plt.figure(figsize=(14, 6))
-        plt.plot(sales_time.index, sales_time.values, linewidth=2, marker='o')
-        plt.title('Evolución de Ventas en el Tiempo', fontsize=16, fontweight='bold')
-        plt.xlabel('Fecha', fontsize=12)
-        plt.ylabel('Ventas Totales (£)', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+    def invalidate(self):
+        """Avisa que self.df se modificó en el lugar (la caché no lo detecta sola)"""
+        if self.df is not None:
+            self._aggregates = {}
+            self._watcher.invalidate()
 
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
-        plt.close()
+    def aggregate(self, plot: str, **options):
+        """Calcula los datos de un tipo de gráfico ('sales_over_time', 'top_countries', ...)"""
+        return getattr(self, f'aggregate_{plot}')(**options)
 
-    def plot_top_countries(self, top_n: int = 10, save_path: Optional[str] = None):
-        """Gráfico de top países por ventas."""
-        self._validate_columns(['Country', 'TotalAmount'])
+    def aggregate_sales_over_time(self, freq: str = 'M') -> pd.Series:
+        """Ventas totales por periodo."""
+        def compute():
+            self._validate_columns(['InvoiceDate', 'TotalAmount'])
+            return self.df.groupby(pd.Grouper(key='InvoiceDate', freq=freq))['TotalAmount'].sum()
 
-        country_sales = self.df.groupby('Country')['TotalAmount'].sum().sort_values(ascending=False)
-        top_countries = country_sales.head(top_n)
+        return self._cached(('sales_over_time', freq), compute)
 
-        plt.figure(figsize=(12, 8))
-        colors = sns.color_palette("viridis", len(top_countries))
-        bars = plt.barh(range(len(top_countries)), top_countries.values, color=colors)
-        plt.yticks(range(len(top_countries)), top_countries.index)
-        plt.xlabel('Ventas Totales (£)', fontsize=12)
-        plt.title(f'Top {top_n} Países por Ventas', fontsize=16, fontweight='bold')
-        plt.gca().invert_yaxis()
+    def _totals_by(self, column: str, measure: str) -> pd.Series:
+        """Totales por categoría, compartidos entre distintos top_n"""
+        def compute():
+            self._validate_columns([column, measure])
+            return self.df.groupby(column, observed=True)[measure].sum()
 
-        # Agregar valores
-        for bar in bars:
-            width = bar.get_width()
-            plt.text(width + top_countries.max() * 0.01,
-                     bar.get_y() + bar.get_height() / 2,
-                     f'£{width:,.0f}', ha='left', va='center', fontsize=9)
+        return self._cached(('totals', column, measure), compute)
 
-        plt.tight_layout()
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
-        plt.close()
+    def aggregate_top_countries(self, top_n: int = 10) -> pd.Series:
+        """Top países por ventas."""
+        return self._cached(('top_countries', top_n),
+                            lambda: self._totals_by('Country', 'TotalAmount').nlargest(top_n))
 
-    def plot_top_products(self, top_n: int = 15, save_path: Optional[str] = None):
-        """Gráfico de productos más vendidos."""
-        self._validate_columns(['Description', 'Quantity'])
-
-        product_sales = self.df.groupby('Description')['Quantity'].sum().sort_values(ascending=False)
-        top_products = product_sales.head(top_n)
-
-        plt.figure(figsize=(12, 8))
-        colors = sns.color_palette("rocket", len(top_products))
-        plt.barh(range(len(top_products)), top_products.values, color=colors)
-        plt.yticks(range(len(top_products)),
-                   [desc[:40] + '...' if len(desc) > 40 else desc
-                    for desc in top_products.index])
-        plt.xlabel('Cantidad Vendida', fontsize=12)
-        plt.title(f'Top {top_n} Productos Más Vendidos', fontsize=16, fontweight='bold')
-        plt.gca().invert_yaxis()
-        plt.tight_layout()
+    def aggregate_top_products(self, top_n: int = 15) -> pd.Series:
+        """Top productos por cantidad vendida."""
+        return self._cached(('top_products', top_n),
+                            lambda: self._totals_by('Description', 'Quantity').nlargest(top_n))
 
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
-        plt.close()
+    def aggregate_sales_distribution(self) -> dict:
+        """
+        Histograma y estadísticas de boxplot de los montos de venta
 
-    def plot_sales_distribution(self, save_path: Optional[str] = None):
-        """Distribución de montos de venta."""
-        self._validate_columns(['TotalAmount'])
+        Los cuantiles (cuartiles y p95) se calculan en una sola llamada y el
+        histograma con np.histogram, de modo que el dibujo no usa filas crudas.
+        """
+        def compute():
+            self._validate_columns(['TotalAmount'])
+            values = self.df['TotalAmount'].to_numpy(dtype=np.float64)
+            if not len(values):
+                values = np.zeros(1)
+
+            counts, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+            q1, median, q3, p95 = np.quantile(values, [0.25, 0.5, 0.75, 0.95])
+            iqr = q3 - q1
+            inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+            whislo, whishi = inside.min(), inside.max()
+
+            # Atípicos únicos dentro del rango visible del eje
+            fliers = np.unique(values[((values < whislo) | (values > whishi)) & (values <= p95)])
+            if len(fliers) > MAX_FLIERS:
+                fliers = fliers[np.linspace(0, len(fliers) - 1, MAX_FLIERS).astype(np.int64)]
 
-        fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+            return {
+                'hist_counts': counts,
+                'bin_edges': edges,
+                'p95': float(p95),
+                'box': {
+                    'med': float(median), 'q1': float(q1), 'q3': float(q3),
+                    'whislo': float(whislo), 'whishi': float(whishi),
+                    'mean': float(values.mean()), 'fliers': fliers
+                }
+            }
 
-        # Histograma
-        axes[0].hist(self.df['TotalAmount'], bins=50, color='steelblue', edgecolor='black')
+        return self._cached(('sales_distribution',), compute)
+
+    # ========== EXPORTACIÓN DE AGREGACIONES ==========
+
+    def export_aggregates(self, path) -> Path:
+        """
+        Guarda las agregaciones calculadas en un archivo JSON
+
+        Returns:
+            Ruta del archivo escrito
+        """
+        path = Path(path)
+        entries = [{'key': list(key), 'data': _encode(data)} for key, data in self._aggregates.items()]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(entries), encoding='utf-8')
+        return path
+
+    @classmethod
+    def from_aggregates(cls, path) -> 'RetailVisualizer':
+        """
+        Crea un visualizador sin datos crudos a partir de agregaciones exportadas
+
+        Solo puede dibujar los gráficos (y opciones) que estaban exportados.
+        """
+        visualizer = cls(None)
+        for entry in json.loads(Path(path).read_text(encoding='utf-8')):
+            visualizer._aggregates[tuple(entry['key'])] = _decode(entry['data'])
+        return visualizer
+
+    # ========== DIBUJO ==========
+
+    @staticmethod
+    def draw(plot: str, fig, data):
+        """Dibuja un tipo de gráfico sobre `fig` a partir de sus datos agregados"""
+        getattr(RetailVisualizer, f'draw_{plot}')(fig, data)
+
+    @staticmethod
+    def draw_sales_over_time(fig, sales_time: pd.Series):
+        ax = fig.add_subplot(1, 1, 1)
+        ax.plot(sales_time.index, sales_time.values, linewidth=2, marker='o')
+        ax.set_title('Evolución de Ventas en el Tiempo', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Fecha', fontsize=12)
+        ax.set_ylabel('Ventas Totales (£)', fontsize=12)
+        ax.grid(True, alpha=0.3)
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
+
+    @staticmethod
+    def draw_top_countries(fig, top_countries: pd.Series):
+        ax = fig.add_subplot(1, 1, 1)
+        colors = _palette("viridis", len(top_countries))
+        bars = ax.barh(range(len(top_countries)), top_countries.values, color=colors)
+        ax.set_yticks(range(len(top_countries)), top_countries.index)
+        ax.set_xlabel('Ventas Totales (£)', fontsize=12)
+        ax.set_title(f'Top {len(top_countries)} Países por Ventas', fontsize=16, fontweight='bold')
+        ax.invert_yaxis()
+
+        # Agregar valores
+        for bar in bars:
+            width = bar.get_width()
+            ax.text(width + top_countries.max() * 0.01,
+                    bar.get_y() + bar.get_height() / 2,
+                    f'£{width:,.0f}', ha='left', va='center', fontsize=9)
+        fig.tight_layout()
+
+    @staticmethod
+    def draw_top_products(fig, top_products: pd.Series):
+        ax = fig.add_subplot(1, 1, 1)
+        colors = _palette("rocket", len(top_products))
+        ax.barh(range(len(top_products)), top_products.values, color=colors)
+        ax.set_yticks(range(len(top_products)),
+                      [desc[:40] + '...' if len(desc) > 40 else desc
+                       for desc in top_products.index.astype(str)])
+        ax.set_xlabel('Cantidad Vendida', fontsize=12)
+        ax.set_title(f'Top {len(top_products)} Productos Más Vendidos', fontsize=16, fontweight='bold')
+        ax.invert_yaxis()
+        fig.tight_layout()
+
+    @staticmethod
+    def draw_sales_distribution(fig, distribution: dict):
+        axes = fig.subplots(1, 2)
+
+        # Histograma (a partir de los conteos precalculados)
+        edges = distribution['bin_edges']
+        axes[0].hist(edges[:-1], bins=edges, weights=distribution['hist_counts'],
+                     color='steelblue', edgecolor='black')
         axes[0].set_xlabel('Monto de Venta (£)', fontsize=12)
         axes[0].set_ylabel('Frecuencia', fontsize=12)
         axes[0].set_title('Distribución de Montos de Venta', fontsize=14, fontweight='bold')
-        axes[0].set_xlim(0, self.df['TotalAmount'].quantile(0.95))
+        axes[0].set_xlim(0, distribution['p95'])
 
-        # Boxplot
-        axes[1].boxplot(self.df['TotalAmount'], vert=True)
+        # Boxplot (a partir de las estadísticas precalculadas)
+        axes[1].bxp([distribution['box']], showmeans=False)
         axes[1].set_ylabel('Monto de Venta (£)', fontsize=12)
         axes[1].set_title('Boxplot de Montos de Venta', fontsize=14, fontweight='bold')
-        axes[1].set_ylim(0, self.df['TotalAmount'].quantile(0.95))
+        axes[1].set_ylim(0, distribution['p95'])
+        fig.tight_layout()
+
+    # ========== GRÁFICOS INTERACTIVOS ==========
+
+    def _plot(self, plot: str, save_path: Optional[str], show: bool, **options):
+        import matplotlib.pyplot as plt
+
+        setup_plot_style()
+        fig = plt.figure(figsize=FIGSIZES[plot])
+        self.draw(plot, fig, self.aggregate(plot, **options))
 
-        plt.tight_layout()
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
-        plt.close()
+            fig.savefig(save_path, dpi=300, bbox_inches='tight')
+        if show:
+            plt.show()
+        plt.close(fig)
+
+    def plot_sales_over_time(self, freq: str = 'M', save_path: Optional[str] = None, show: bool = True):
+        """Gráfico de ventas a lo largo del tiempo."""
+        self._plot('sales_over_time', save_path, show, freq=freq)
+
+    def plot_top_countries(self, top_n: int = 10, save_path: Optional[str] = None, show: bool = True):
+        """Gráfico de top países por ventas."""
+        self._plot('top_countries', save_path, show, top_n=top_n)
+
+    def plot_top_products(self, top_n: int = 15, save_path: Optional[str] = None, show: bool = True):
+        """Gráfico de productos más vendidos."""
+        self._plot('top_products', save_path, show, top_n=top_n)
+
+    def plot_sales_distribution(self, save_path: Optional[str] = None, show: bool = True):
+        """Distribución de montos de venta."""
+        self._plot('sales_distribution', save_path, show)
 
 
 def main():
@@ -62,6 +62,30 @@ class TestRetailAnalyzer(unittest.TestCase):
         # Verificar que Frequency es correcto para cliente 100
         self.assertEqual(rfm.loc[100, 'Frequency'], 3)  # 3 compras
 
+    def test_rfm_frequency_counts_distinct_invoices(self):
+        """Test: Frequency cuenta facturas distintas, no líneas"""
+
+        data = self.test_data.copy()
+        data.loc[1, 'Invoice'] = data.loc[0, 'Invoice']  # dos líneas en la misma factura
+
+        rfm = RetailAnalyzer(data).customer_rfm_segmentation()
+
+        self.assertEqual(rfm.loc[100, 'Frequency'], 2)
+        self.assertEqual(rfm.loc[100, 'Recency'], 5)  # última compra 2024-01-06
+        self.assertAlmostEqual(rfm.loc[100, 'Monetary'], 135)
+
+    def test_customer_rfm_segmentation_advanced(self):
+        """Test: modo avanzado agrega puntuaciones y segmentos"""
+
+        analyzer = RetailAnalyzer(self.test_data)
+        rfm = analyzer.customer_rfm_segmentation(advanced=True)
+
+        for col in ['R_Score', 'F_Score', 'M_Score', 'RFM_Score', 'Segment']:
+            self.assertIn(col, rfm.columns)
+
+        self.assertTrue(rfm[['R_Score', 'F_Score', 'M_Score']].isin(range(1, 6)).all().all())
+        self.assertFalse(rfm['Segment'].isna().any())
+
     def test_get_top_customers(self):
         """Test: top customers retorna número correcto"""
 
@@ -75,5 +99,83 @@ class TestRetailAnalyzer(unittest.TestCase):
         monetary_values = top_3['Monetary'].tolist()
         self.assertEqual(monetary_values, sorted(monetary_values, reverse=True))
 
+    def test_results_are_memoized(self):
+        """Test: llamadas repetidas usan la caché de resultados"""
+
+        analyzer = RetailAnalyzer(self.test_data.copy())
+        analyzer.get_top_customers(n=2)
+        analyzer.get_top_customers(n=3)
+        analyzer.customer_rfm_segmentation()
+
+        info = analyzer.cache_info()
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hits'], 2)
+
+    def test_cache_invalidated_when_frame_changes(self):
+        """Test: la caché se invalida si se reemplazan los datos"""
+
+        analyzer = RetailAnalyzer(self.test_data.copy())
+        before = analyzer.get_top_customers(n=1)
+
+        changed = self.test_data.copy()
+        changed.loc[changed['CustomerID'] == 300, 'TotalAmount'] = 10_000
+        analyzer.df = changed
+        after = analyzer.get_top_customers(n=1)
+
+        self.assertEqual(before.index[0], 200)
+        self.assertEqual(after.index[0], 300)
+
+    def test_invalidate_after_swapping_values(self):
+        """Test: un intercambio en el lugar (mismas sumas) se refleja tras invalidate()"""
+
+        analyzer = RetailAnalyzer(self.test_data.copy())
+        before = analyzer.get_top_customers(n=4)
+
+        # Intercambiar CustomerID entre dos filas conserva forma, tipos y sumas
+        analyzer.df.loc[[2, 4], 'CustomerID'] = analyzer.df.loc[[4, 2], 'CustomerID'].to_numpy()
+        analyzer.invalidate()
+
+        expected = RetailAnalyzer(analyzer.df.copy()).get_top_customers(n=4)
+        pd.testing.assert_frame_equal(analyzer.get_top_customers(n=4), expected)
+        self.assertEqual(before.index[0], 200)
+        self.assertEqual(expected.index[0], 400)
+
+    def test_cache_is_size_bounded(self):
+        """Test: la caché respeta su tamaño máximo (LRU)"""
+
+        analyzer = RetailAnalyzer(self.test_data.copy(), cache_size=1)
+        analyzer.sales_by_month()
+        analyzer.sales_by_hour()
+        analyzer.sales_by_month()
+
+        info = analyzer.cache_info()
+        self.assertEqual(info['currsize'], 1)
+        self.assertEqual(info['misses'], 3)
+
+    def test_temporal_methods_match_groupby(self):
+        """Test: los métodos temporales coinciden con groupby y no modifican df"""
+
+        data = self.test_data.copy()
+        data['InvoiceDate'] = data['InvoiceDate'] + pd.to_timedelta(
+            [7, 9, 9, 13, 15, 10, 11, 12, 14, 16], unit='h'
+        )
+        columns = list(data.columns)
+        analyzer = RetailAnalyzer(data)
+
+        expected_month = data.groupby(data['InvoiceDate'].dt.to_period('M'))['TotalAmount'].sum()
+        expected_hour = data.groupby(data['InvoiceDate'].dt.hour)['TotalAmount'].sum()
+        expected_day = data.groupby(data['InvoiceDate'].dt.day_name())['TotalAmount'].agg(['sum', 'count'])
+
+        pd.testing.assert_series_equal(analyzer.sales_by_month(), expected_month, check_dtype=False)
+        pd.testing.assert_series_equal(analyzer.sales_by_hour(), expected_hour, check_dtype=False)
+
+        daily = analyzer.sales_by_day_of_week()
+        self.assertEqual(daily.loc['Monday', ('TotalAmount', 'sum')], expected_day.loc['Monday', 'sum'])
+        self.assertEqual(daily.loc['Sunday', ('TotalAmount', 'count')], expected_day.loc['Sunday', 'count'])
+        self.assertEqual(list(daily.index)[0], 'Monday')
+
+        self.assertEqual(list(data.columns), columns)
+        self.assertEqual(analyzer.get_peak_sales_time()['peak_hour'], expected_hour.idxmax())
+
 if __name__ == '__main__':
     unittest.main()
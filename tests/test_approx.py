@@ -0,0 +1,164 @@
+"""
+Tests unitarios para los sketches de cuantiles/heavy hitters y el modo aproximado
+"""
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from approx import ApproxAnalyzer
+from data_loader import RetailDataLoader
+from sketches import TDigest, CountMinSketch, HeavyHitters, hash_keys
+
+
+class TestSketches(unittest.TestCase):
+    """Tests para TDigest, CountMinSketch y HeavyHitters"""
+
+    def test_tdigest_quantiles_and_merge(self):
+        """Test: cuantiles cercanos a los exactos, también tras combinar"""
+        values = np.random.default_rng(0).lognormal(2, 1, 200_000)
+        digest = TDigest().add(values[:100_000]).merge(TDigest().add(values[100_000:]))
+
+        qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+        np.testing.assert_allclose(digest.quantile(qs), np.quantile(values, qs), rtol=0.02)
+        self.assertEqual(digest.quantile(0), values.min())
+        self.assertEqual(digest.quantile(1), values.max())
+        self.assertLess(len(digest.means), 500)
+
+        restored = TDigest.from_state(digest.state())
+        self.assertEqual(restored.quantile(0.5), digest.quantile(0.5))
+
+    def test_count_min_never_underestimates(self):
+        """Test: Count-Min sobreestima acotadamente y no rechaza combinar iguales"""
+        keys = pd.Series(np.random.default_rng(1).integers(0, 5000, 50_000)).astype(str)
+        sketch = CountMinSketch(width=1024).add(keys)
+        exact = keys.value_counts()
+
+        estimates = sketch.estimate(exact.index)
+        self.assertTrue((estimates >= exact.to_numpy()).all())
+        self.assertLess((estimates - exact.to_numpy()).mean(), np.e / 1024 * len(keys))
+
+        with self.assertRaises(ValueError):
+            sketch.merge(CountMinSketch(width=2048))
+
+    def test_heavy_hitters_top(self):
+        """Test: los heavy hitters recuperan el top exacto en datos sesgados"""
+        rng = np.random.default_rng(2)
+        keys = pd.Series(rng.zipf(1.5, 100_000) % 3000).map(lambda k: f'item-{k}')
+        weights = rng.integers(1, 5, len(keys))
+
+        hitters = HeavyHitters(capacity=64).add(keys[:50_000], weights[:50_000])
+        hitters.merge(HeavyHitters(capacity=64).add(keys[50_000:], weights[50_000:]))
+
+        expected = pd.Series(weights, index=keys).groupby(level=0).sum().nlargest(5)
+        self.assertEqual(hitters.top(5).index.tolist(), expected.index.tolist())
+
+    def test_hash_keys_consistent_across_batches(self):
+        """Test: una clave hashea igual en un lote numérico y en uno mezclado con texto"""
+        numeric_batch = hash_keys(pd.Series([85123, 13085.0]))
+        mixed_batch = hash_keys(pd.Series(['85123', 13085, '85123A', None], dtype=object))
+
+        self.assertEqual(len(mixed_batch), 3)
+        self.assertEqual(mixed_batch[0], numeric_batch[0])
+        self.assertEqual(mixed_batch[1], numeric_batch[1])
+        self.assertEqual(hash_keys(pd.Series(['85123A']))[0], mixed_batch[2])
+
+
+class TestApproxAnalyzer(unittest.TestCase):
+    """Tests para ApproxAnalyzer y StratifiedSample"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        rng = np.random.default_rng(7)
+        n = 40_000
+        self.test_data = pd.DataFrame({
+            'Invoice': rng.integers(1, 4000, n).astype(str),
+            'Description': pd.Series(rng.zipf(1.6, n) % 500).map(lambda k: f'Product {k}'),
+            'CustomerID': rng.integers(1000, 3000, n).astype(float),
+            'InvoiceDate': pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24, n), unit='h'),
+            'Country': rng.choice(['United Kingdom', 'France', 'Germany', 'Iceland'], n, p=[0.8, 0.1, 0.0995, 0.0005]),
+            'Quantity': rng.integers(1, 20, n),
+            'Price': rng.lognormal(1, 0.8, n).round(2) + 0.01
+        })
+        self.test_data['TotalAmount'] = self.test_data['Quantity'] * self.test_data['Price']
+        self.analyzer = ApproxAnalyzer.from_frame(self.test_data, batch_size=7_000, sample_rate=0.05)
+
+    def test_basic_stats_within_error(self):
+        """Test: sumas exactas y conteos distintos dentro del error de HLL"""
+        stats = self.analyzer.get_basic_stats()
+        self.assertAlmostEqual(stats['total_sales'], self.test_data['TotalAmount'].sum(), places=4)
+        self.assertEqual(stats['total_transactions'], len(self.test_data))
+        self.assertLess(abs(stats['total_customers'] / self.test_data['CustomerID'].nunique() - 1), 0.05)
+        self.assertLess(abs(stats['total_invoices'] / self.test_data['Invoice'].nunique() - 1), 0.05)
+
+    def test_top_products_and_countries(self):
+        """Test: el top coincide con el groupby exacto"""
+        expected = self.test_data.groupby('Description')['Quantity'].sum().nlargest(5)
+        self.assertEqual(self.analyzer.top_products(5).index.tolist(), expected.index.tolist())
+        self.assertEqual(self.analyzer.top_countries(2).index.tolist(), ['United Kingdom', 'France'])
+
+    def test_stratified_estimate_covers_truth(self):
+        """Test: el intervalo de confianza cubre el total real y todos los estratos están en la muestra"""
+        sample = self.analyzer.sample
+        self.assertEqual(set(sample.rows['Country']), set(self.test_data['Country']))
+        self.assertEqual(sample.population.sum(), len(self.test_data))
+
+        march = lambda df: df['InvoiceDate'].dt.month == 3
+        result = self.analyzer.estimate_total('TotalAmount', where=march)
+        truth = self.test_data.loc[march(self.test_data), 'TotalAmount'].sum()
+        self.assertLessEqual(result['ci_low'], truth)
+        self.assertGreaterEqual(result['ci_high'], truth)
+
+        # Sin filtro, el conteo de filas es exacto por construcción
+        count = sample.estimate_total()
+        self.assertAlmostEqual(count['estimate'], len(self.test_data))
+
+    def test_sales_distribution_shape(self):
+        """Test: la distribución aproximada tiene la forma de RetailVisualizer"""
+        result = self.analyzer.sales_distribution()
+        self.assertEqual(result['hist_counts'].sum(), len(self.test_data))
+        self.assertEqual(len(result['bin_edges']), len(result['hist_counts']) + 1)
+        self.assertEqual(set(result['box']), {'med', 'q1', 'q3', 'whislo', 'whishi', 'mean', 'fliers'})
+        self.assertAlmostEqual(result['box']['med'], self.test_data['TotalAmount'].median(),
+                               delta=0.03 * self.test_data['TotalAmount'].median())
+
+    def test_save_load_roundtrip(self):
+        """Test: los sketches guardados responden igual al recargarlos"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.analyzer.save(Path(tmp) / 'sketches.npz')
+            restored = ApproxAnalyzer.load(path)
+
+        self.assertEqual(restored.get_basic_stats(), self.analyzer.get_basic_stats())
+        self.assertEqual(restored.quantile(0.9), self.analyzer.quantile(0.9))
+        pd.testing.assert_series_equal(restored.top_products(10), self.analyzer.top_products(10))
+        self.assertEqual(restored.estimate_total(), self.analyzer.estimate_total())
+
+    def test_merge_matches_single_pass(self):
+        """Test: combinar dos mitades da las mismas sumas y top"""
+        half = len(self.test_data) // 2
+        merged = ApproxAnalyzer.from_frame(self.test_data.iloc[:half], sample_rate=0.05)
+        merged.merge(ApproxAnalyzer.from_frame(self.test_data.iloc[half:], sample_rate=0.05))
+
+        self.assertEqual(merged.rows, len(self.test_data))
+        self.assertEqual(merged.top_countries(3).index.tolist(), self.analyzer.top_countries(3).index.tolist())
+        with self.assertRaises(ValueError):
+            merged.merge(ApproxAnalyzer(precision=10))
+
+    def test_loader_builds_sketches_when_streaming(self):
+        """Test: load_clean_streaming(sketches=True) construye los sketches lote a lote"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'retail.parquet'
+            self.test_data.drop(columns='TotalAmount').to_parquet(path, index=False)
+            loader = RetailDataLoader(path)
+            df = loader.load_clean_streaming(batch_size=10_000, sketches=True)
+
+        self.assertEqual(loader.sketches.rows, len(df))
+        self.assertAlmostEqual(loader.sketches.total_sales, df['TotalAmount'].sum(), places=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
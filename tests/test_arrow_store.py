@@ -0,0 +1,107 @@
+"""
+Tests unitarios para el dataset compartido en Arrow IPC
+"""
+import subprocess
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / 'src'
+sys.path.append(str(SRC))
+
+from analysis import RetailAnalyzer
+from arrow_store import publish, attach
+from data_loader import RetailDataLoader
+
+
+class TestArrowStore(unittest.TestCase):
+    """Tests para publish/attach y los métodos del loader"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'retail.arrow'
+        # Invoice mezcla enteros y texto, como al leer el Excel original
+        self.test_data = pd.DataFrame({
+            'Invoice': [489434, 489434, '489435A', 489436, 489437],
+            'StockCode': ['85123A', 71053, '84406B', '84029G', '84029E'],
+            'Description': ['WHITE HEART', 'WHITE LANTERN', None, 'UNION JACK', 'RED WOOLLY'],
+            'Quantity': [6, 6, 8, 6, 6],
+            'InvoiceDate': pd.to_datetime(['2010-12-01 08:26', '2010-12-01 08:26', '2010-12-01 08:28',
+                                           '2010-12-01 08:34', '2010-12-01 08:34']),
+            'Price': [2.55, 3.39, 2.75, 3.39, 3.39],
+            'CustomerID': [17850.0, 17850.0, np.nan, 13047.0, 13047.0],
+            'Country': pd.Categorical(['United Kingdom'] * 4 + ['France'])
+        })
+        self.test_data['TotalAmount'] = self.test_data['Quantity'] * self.test_data['Price']
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_values_and_types(self):
+        """Test: los valores se conservan y el texto queda como categoría"""
+        attached = attach(publish(self.test_data, self.path))
+
+        self.assertEqual(attached['Invoice'].tolist(), ['489434', '489434', '489435A', '489436', '489437'])
+        self.assertEqual(attached['StockCode'].tolist()[1], '71053')
+        self.assertTrue(pd.isna(attached['Description'][2]))
+        for col in ('Invoice', 'StockCode', 'Description', 'Country'):
+            self.assertIsInstance(attached[col].dtype, pd.CategoricalDtype, col)
+
+        pd.testing.assert_series_equal(attached['CustomerID'], self.test_data['CustomerID'])
+        pd.testing.assert_series_equal(attached['InvoiceDate'], self.test_data['InvoiceDate'])
+        pd.testing.assert_series_equal(attached['TotalAmount'], self.test_data['TotalAmount'])
+
+    def test_attached_arrays_are_memory_mapped(self):
+        """Test: los buffers numéricos y los códigos apuntan al archivo (solo lectura)"""
+        attached = attach(publish(self.test_data, self.path))
+        for col in ('Quantity', 'Price', 'CustomerID', 'InvoiceDate', 'TotalAmount'):
+            self.assertFalse(attached[col].to_numpy().flags.writeable, col)
+        self.assertFalse(attached['Country'].cat.codes.to_numpy().flags.writeable)
+
+        # Las columnas derivadas se crean normalmente
+        attached = attached.assign(Double=attached['TotalAmount'] * 2)
+        self.assertTrue(attached['Double'].to_numpy().flags.writeable)
+
+    def test_republish_keeps_attached_readers(self):
+        """Test: republicar no invalida a quienes ya adjuntaron la versión anterior"""
+        publish(self.test_data, self.path)
+        old = attach(self.path)
+        publish(self.test_data.head(2), self.path)
+
+        self.assertEqual(len(old), 5)
+        self.assertAlmostEqual(old['TotalAmount'].sum(), self.test_data['TotalAmount'].sum())
+        self.assertEqual(len(attach(self.path)), 2)
+
+    def test_other_process_attaches(self):
+        """Test: otro proceso adjunta el mismo archivo y obtiene los mismos resultados"""
+        publish(self.test_data, self.path)
+        result = subprocess.run(
+            [sys.executable, '-c',
+             f"from arrow_store import attach; print(attach({str(self.path)!r})['TotalAmount'].sum())"],
+            capture_output=True, text=True, cwd=SRC, check=True
+        )
+        self.assertAlmostEqual(float(result.stdout), self.test_data['TotalAmount'].sum())
+
+    def test_loader_publish_and_attach(self):
+        """Test: el analizador da los mismos resultados sobre el dataset adjuntado"""
+        loader = RetailDataLoader('dummy_path.xlsx')
+        with self.assertRaises(ValueError):
+            loader.publish_arrow(self.path)
+
+        loader.df = self.test_data.dropna(subset=['CustomerID'])
+        loader.publish_arrow(self.path)
+        attached = RetailDataLoader(self.path).attach_arrow(self.path)
+
+        expected = RetailAnalyzer(loader.df)
+        analyzer = RetailAnalyzer(attached)
+        self.assertEqual(analyzer.get_basic_stats(), expected.get_basic_stats())
+        pd.testing.assert_frame_equal(analyzer.customer_rfm_segmentation(),
+                                      expected.customer_rfm_segmentation(), check_index_type=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests unitarios para el generador sintético y la comparación de benchmarks
+"""
+import unittest
+import tempfile
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+sys.path.append(str(Path(__file__).parent.parent / 'benchmarks'))
+
+from synthetic import generate, generate_clean, write, COLUMNS
+from run_benchmarks import compare
+from data_loader import RetailDataLoader
+
+
+class TestSynthetic(unittest.TestCase):
+    """Tests para el generador sintético y el reporte de regresiones"""
+
+    def test_generate_is_seeded_and_realistic(self):
+        """Test: el generador es reproducible y tiene la forma de Online Retail II"""
+        df = generate(5_000, seed=1)
+        pd.testing.assert_frame_equal(df, generate(5_000, seed=1))
+        self.assertEqual(list(df.columns), COLUMNS)
+        self.assertEqual(len(df), 5_000)
+
+        cancelled = df['Invoice'].str.startswith('C')
+        self.assertTrue(cancelled.any())
+        self.assertTrue((df.loc[cancelled, 'Quantity'] < 0).all())
+        self.assertTrue(df['CustomerID'].isna().any())
+
+        # Popularidad sesgada: el producto más vendido supera ampliamente la media
+        counts = df['Description'].value_counts()
+        self.assertGreater(counts.iloc[0], 5 * counts.mean())
+
+        clean = generate_clean(5_000, seed=1)
+        self.assertFalse(clean['Invoice'].str.startswith('C').any())
+        self.assertFalse(clean['CustomerID'].isna().any())
+
+    def test_multi_sheet_excel_loads(self):
+        """Test: el Excel generado tiene una hoja por periodo y load_data las une"""
+        df = generate(2_000, seed=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write(df, Path(tmp) / 'retail.xlsx')
+            self.assertEqual(pd.ExcelFile(path).sheet_names, ['Year 2009-2010', 'Year 2010-2011'])
+            loaded = RetailDataLoader(path).load_data()
+        self.assertEqual(len(loaded), len(df))
+
+    def test_compare_flags_regressions(self):
+        """Test: solo se marcan regresiones por encima del umbral y del mínimo absoluto"""
+        baseline = {'results': {'1000': {
+            'clean_data': {'seconds': 1.0, 'peak_mb': 10.0},
+            'sales_by_hour': {'seconds': 0.001, 'peak_mb': 0.1}
+        }}}
+        report = {'results': {'1000': {
+            'clean_data': {'seconds': 1.5, 'peak_mb': 10.5},
+            'sales_by_hour': {'seconds': 0.003, 'peak_mb': 0.1},
+            'load_data': {'seconds': 9.0, 'peak_mb': 9.0}
+        }}}
+        regressions = compare(report, baseline, threshold=0.2)
+        self.assertEqual([(r['stage'], r['metric']) for r in regressions], [('clean_data', 'seconds')])
+        self.assertEqual(regressions[0]['ratio'], 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
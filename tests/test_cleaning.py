@@ -0,0 +1,117 @@
+"""
+Tests unitarios para el motor de limpieza por máscaras
+"""
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from cleaning import clean_frame, rejection_counts, cancellations_by_month, is_cancelled
+from data_loader import RetailDataLoader
+from schema import optimize_dtypes
+
+
+class TestCleaning(unittest.TestCase):
+    """Tests para clean_frame y el registro de rechazos"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        # Invoice mezcla enteros y texto, como al leer el Excel original
+        self.raw = pd.DataFrame({
+            'Invoice': [489434, 489435, 'C489436', 'C489437', 489438, 489439, 489440],
+            'StockCode': ['A1', 'A2', 'A1', 'A3', 'A4', 'A5', 'A6'],
+            'Description': ['P1', 'P2', 'P1', 'P3', None, 'P5', 'P6'],
+            'Quantity': [10, 5, -10, -2, 3, 0, 4],
+            'InvoiceDate': pd.to_datetime(['2010-01-05', '2010-01-06', '2010-01-07', '2010-02-01',
+                                           '2010-02-02', '2010-02-03', '2010-02-04']),
+            'Price': [2.5, 1.0, 2.5, 4.0, 1.0, 1.0, -1.0],
+            'CustomerID': [100, 200, 100, None, 300, 300, 400],
+            'Country': ['UK', 'UK', 'UK', 'France', 'UK', 'UK', 'Spain']
+        })
+
+    def test_matches_chained_filters(self):
+        """Test: el resultado coincide con los filtros encadenados originales"""
+        df = self.raw.dropna(subset=['CustomerID', 'Description'])
+        df = df[~df['Invoice'].astype(str).str.startswith('C')]
+        df = df[(df['Quantity'] > 0) & (df['Price'] > 0)]
+        expected = df.assign(TotalAmount=df['Quantity'] * df['Price'])
+
+        clean, rejected = clean_frame(self.raw)
+        pd.testing.assert_frame_equal(clean, expected)
+        self.assertEqual(len(clean) + len(rejected), len(self.raw))
+        self.assertNotIn('Description', rejected.columns)
+
+    def test_reason_is_first_failed_rule(self):
+        """Test: Reason guarda la primera regla incumplida y Failed todas"""
+        _, rejected = clean_frame(self.raw)
+        self.assertEqual(rejected['Reason'].astype(str).to_dict(),
+                         {2: 'cancelled', 3: 'dropna', 4: 'dropna', 5: 'quantity', 6: 'price'})
+
+        self.assertEqual(rejection_counts(rejected).to_dict(),
+                         {'dropna': 2, 'cancelled': 1, 'quantity': 1, 'price': 1})
+        self.assertEqual(rejection_counts(rejected, first_only=False).to_dict(),
+                         {'dropna': 2, 'cancelled': 2, 'quantity': 3, 'price': 1})
+
+    def test_cancellations_by_month(self):
+        """Test: las cancelaciones incluyen las que además incumplen otra regla (query 8)"""
+        _, rejected = clean_frame(self.raw)
+        result = cancellations_by_month(rejected)
+
+        self.assertEqual(result['YearMonth'].tolist(), ['2010-01', '2010-02'])
+        self.assertEqual(result['TotalCancellations'].tolist(), [1, 1])
+        self.assertEqual(result['CancelledValue'].tolist(), [25.0, 8.0])
+
+    def test_is_cancelled_dtypes(self):
+        """Test: detección de cancelaciones en texto, categorías, números y esquema compacto"""
+        expected = [False, False, True, True, False, False, False]
+        for invoice in (self.raw['Invoice'], self.raw['Invoice'].astype(str),
+                        self.raw['Invoice'].astype(str).astype('category')):
+            self.assertEqual(is_cancelled(pd.DataFrame({'Invoice': invoice})).tolist(), expected)
+
+        self.assertFalse(is_cancelled(pd.DataFrame({'Invoice': np.arange(3)})).any())
+        # Hoja sin facturas 'C': columna object con solo enteros
+        for invoice in (pd.Series([489434, 489435, None], dtype=object),
+                        pd.Series([489434, 489435]).astype('category')):
+            self.assertFalse(is_cancelled(pd.DataFrame({'Invoice': invoice})).any())
+        self.assertEqual(is_cancelled(optimize_dtypes(self.raw)).tolist(), expected)
+
+    def test_optimize_keeps_invoice_identity(self):
+        """Test: solo se quita la 'C'; las facturas 'A…' no chocan con la del mismo número"""
+        raw = self.raw.copy()
+        raw['Invoice'] = [489434, 'C489434', 'A489434', 'INV001', 'INV002', 489439, 489440]
+        compact = optimize_dtypes(raw)
+
+        self.assertEqual(compact['Invoice'].dtype, 'category')
+        self.assertEqual(compact['Invoice'].nunique(), raw['Invoice'].astype(str).nunique())
+        self.assertEqual(compact['IsCancelled'].tolist(), [False, True] + [False] * 5)
+
+        numeric = optimize_dtypes(self.raw)
+        self.assertEqual(str(numeric['Invoice'].dtype), 'int32')
+        self.assertEqual(numeric['Invoice'].tolist()[:4], [489434, 489435, 489436, 489437])
+
+    def test_loader_keeps_ledger(self):
+        """Test: clean_data y el modo streaming guardan el mismo registro de rechazos"""
+        loader = RetailDataLoader('dummy_path.xlsx')
+        loader.df = self.raw.copy()
+        loader.clean_data()
+        self.assertEqual(loader.rejection_counts().sum(), 5)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'retail.csv'
+            self.raw.to_csv(path, index=False)
+            stream_loader = RetailDataLoader(path)
+            stream_loader.load_clean_streaming(batch_size=3)
+
+        pd.testing.assert_series_equal(stream_loader.rejection_counts(), loader.rejection_counts())
+        pd.testing.assert_frame_equal(stream_loader.cancellations_by_month(), loader.cancellations_by_month())
+
+        with self.assertRaises(ValueError):
+            RetailDataLoader('dummy_path.xlsx').rejection_counts()
+
+
+if __name__ == '__main__':
+    unittest.main()
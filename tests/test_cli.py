@@ -0,0 +1,134 @@
+"""
+Tests de arranque en frío (presupuesto de importación) y de la línea de comandos
+"""
+import json
+import subprocess
+import unittest
+import tempfile
+import pandas as pd
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / 'src'
+sys.path.append(str(SRC))
+
+from cli import main, build_parser, ANALYSES, PLOT_TYPES
+from report_renderer import PLOT_TYPES as RENDERER_PLOT_TYPES
+
+# Segundos máximos para importar los módulos del pipeline en un intérprete nuevo
+IMPORT_BUDGET_SECONDS = 2.0
+
+PIPELINE_MODULES = ['cli', 'data_loader', 'analysis', 'visualizations', 'report_renderer',
+                    'sql_executor', 'parquet_analyzer', 'approx', 'cohorts']
+LAZY_DEPENDENCIES = ['matplotlib', 'seaborn', 'pyodbc', 'sqlalchemy', 'openpyxl']
+
+
+class TestStartup(unittest.TestCase):
+    """Tests de tiempo de importación e imports diferidos"""
+
+    def _run_python(self, code: str, cwd: Path = SRC) -> dict:
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                cwd=cwd, check=True)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_cold_import_within_budget(self):
+        """Test: importar el pipeline no carga dependencias pesadas y cabe en el presupuesto"""
+        report = self._run_python(
+            "import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            f"for name in {PIPELINE_MODULES!r}: __import__(name)\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"loaded = [m for m in {LAZY_DEPENDENCIES!r} if m in sys.modules]\n"
+            "print(json.dumps({'seconds': elapsed, 'loaded': loaded}))"
+        )
+        self.assertEqual(report['loaded'], [])
+        self.assertLess(report['seconds'], IMPORT_BUDGET_SECONDS)
+
+    def test_package_import_within_budget(self):
+        """Test: los módulos también se importan como paquete (import src.x)"""
+        report = self._run_python(
+            "import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            f"for name in {PIPELINE_MODULES!r}: __import__('src.' + name)\n"
+            "elapsed = time.perf_counter() - start\n"
+            f"loaded = [m for m in {LAZY_DEPENDENCIES!r} if m in sys.modules]\n"
+            f"flat = [m for m in sys.modules if m in {PIPELINE_MODULES!r}]\n"
+            "print(json.dumps({'seconds': elapsed, 'loaded': loaded, 'flat': flat}))",
+            cwd=SRC.parent
+        )
+        self.assertEqual(report['loaded'], [])
+        self.assertEqual(report['flat'], [])
+        self.assertLess(report['seconds'], IMPORT_BUDGET_SECONDS)
+
+    def test_import_does_not_change_rcparams(self):
+        """Test: el estilo se aplica explícitamente, no al importar visualizations"""
+        report = self._run_python(
+            "import json, matplotlib, visualizations\n"
+            "before = list(matplotlib.rcParams['figure.figsize'])\n"
+            "visualizations.setup_plot_style()\n"
+            "print(json.dumps({'before': before, 'after': list(matplotlib.rcParams['figure.figsize'])}))"
+        )
+        self.assertNotEqual(report['before'], [12, 6])
+        self.assertEqual(report['after'], [12, 6])
+
+
+class TestCli(unittest.TestCase):
+    """Tests del pipeline de línea de comandos"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.test_data = pd.DataFrame({
+            'Invoice': ['1', '1', '2', 'C3', '4', '5'],
+            'StockCode': ['A', 'B', 'A', 'A', 'C', 'B'],
+            'Description': ['Product A', 'Product B', 'Product A', 'Product A', 'Product C', 'Product B'],
+            'Quantity': [2, 1, 5, -2, 3, 4],
+            'InvoiceDate': pd.to_datetime(['2010-01-04 10:00', '2010-01-04 10:00', '2010-02-01 12:00',
+                                           '2010-02-02 12:00', '2010-03-01 15:00', '2010-03-05 09:00']),
+            'Price': [1.5, 3.0, 1.5, 1.5, 2.0, 3.0],
+            'CustomerID': [100, 100, 200, 200, None, 100],
+            'Country': ['UK', 'UK', 'France', 'France', 'UK', 'UK']
+        })
+
+    def test_plot_types_match_renderer(self):
+        """Test: la lista de gráficos del parser coincide con la del renderizador"""
+        self.assertEqual(PLOT_TYPES, RENDERER_PLOT_TYPES)
+
+    def test_runs_requested_stages(self):
+        """Test: analyze + export escribe datos limpios, tablas y resumen JSON"""
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / 'retail.csv'
+            self.test_data.to_csv(data_path, index=False)
+            output_dir = Path(tmp) / 'out'
+
+            code = main([str(data_path), '--stages', 'analyze', 'export', '--analyses', 'basic', 'rfm',
+                         '--export-format', 'csv', '--output-dir', str(output_dir)])
+
+            self.assertEqual(code, 0)
+            self.assertEqual(sorted(p.name for p in output_dir.iterdir()),
+                             ['clean.csv', 'rfm.csv', 'summary.json'])
+            self.assertEqual(len(pd.read_csv(output_dir / 'clean.csv')), 4)
+            summary = json.loads((output_dir / 'summary.json').read_text(encoding='utf-8'))
+            self.assertEqual(summary['basic']['total_customers'], 2)
+            self.assertFalse((output_dir / 'plots').exists())
+
+    def test_module_entry_point(self):
+        """Test: python -m src ejecuta el pipeline"""
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / 'retail.parquet'
+            self.test_data.to_parquet(data_path, index=False)
+            result = subprocess.run(
+                [sys.executable, '-m', 'src', str(data_path), '--streaming', '--analyses', 'cohorts'],
+                capture_output=True, text=True, cwd=SRC.parent
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Análisis 'cohorts' completado", result.stdout)
+
+    def test_missing_file(self):
+        """Test: un archivo inexistente termina con código 2"""
+        self.assertEqual(main(['no_existe.csv']), 2)
+        self.assertEqual(set(build_parser().parse_args(['x.csv', '--analyses', *ANALYSES]).analyses),
+                         set(ANALYSES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests unitarios para el análisis de cohortes y recompra
+"""
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from analysis import RetailAnalyzer
+from cohorts import (compute_purchases, cohort_matrices, purchase_intervals,
+                     interval_distribution, repeat_customers)
+
+
+class TestCohorts(unittest.TestCase):
+    """Tests para el módulo cohorts y los métodos de RetailAnalyzer"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        # Cliente 1: tres compras (enero, enero, marzo); 2: dos en febrero; 3: una en marzo
+        self.test_data = pd.DataFrame({
+            'Invoice': ['I1', 'I1', 'I2', 'I3', 'I4', 'I5', 'I6', 'I7'],
+            'CustomerID': [1, 1, 1, 1, 2, 2, 3, None],
+            'InvoiceDate': pd.to_datetime(['2010-01-05 00:00', '2010-01-05 00:00', '2010-01-20 00:00',
+                                           '2010-03-02 09:00', '2010-02-10 00:00', '2010-02-11 00:00',
+                                           '2010-03-15 00:00', '2010-03-16 00:00']),
+            'TotalAmount': [10.0, 5.0, 20.0, 30.0, 40.0, 10.0, 7.0, 99.0]
+        })
+
+    def test_purchases_one_row_per_invoice(self):
+        """Test: una compra por cliente x factura, ordenada por cliente y fecha"""
+        purchases = compute_purchases(self.test_data)
+        self.assertEqual(purchases['Invoice'].tolist(), ['I1', 'I2', 'I3', 'I4', 'I5', 'I6'])
+        self.assertEqual(purchases['TotalAmount'].tolist(), [15.0, 20.0, 30.0, 40.0, 10.0, 7.0])
+
+    def test_cohort_matrices(self):
+        """Test: tamaños, clientes activos, retención y ventas por cohorte"""
+        cohorts = cohort_matrices(compute_purchases(self.test_data))
+
+        self.assertEqual([str(p) for p in cohorts['sizes'].index], ['2010-01', '2010-02', '2010-03'])
+        self.assertEqual(cohorts['sizes'].tolist(), [1, 1, 1])
+        np.testing.assert_array_equal(cohorts['active'].to_numpy(), [[1, 0, 1], [1, 0, 0], [1, 0, 0]])
+        np.testing.assert_array_equal(cohorts['revenue'].to_numpy(), [[35, 0, 30], [50, 0, 0], [7, 0, 0]])
+        self.assertEqual(cohorts['retention'].iloc[0, 2], 1.0)
+
+    def test_purchase_intervals(self):
+        """Test: días entre compras por cliente y su distribución"""
+        purchases = compute_purchases(self.test_data)
+        intervals = purchase_intervals(purchases)
+
+        self.assertEqual(intervals['NumPurchases'].tolist(), [3, 2, 1])
+        self.assertEqual(intervals.loc[1, 'MeanDaysBetween'], (15 + 41.375) / 2)
+        self.assertEqual(intervals.loc[1, 'MaxDaysBetween'], 41.375)
+        self.assertEqual(intervals.loc[2, 'MedianDaysBetween'], 1.0)
+        self.assertTrue(np.isnan(intervals.loc[3, 'MedianDaysBetween']))
+
+        distribution = interval_distribution(purchases)
+        self.assertEqual(distribution[distribution > 0].to_dict(), {1: 1, 15: 1, 41: 1})
+
+    def test_repeat_customers_matches_query_6(self):
+        """Test: clientes recurrentes con días de calendario entre primera y última compra"""
+        result = repeat_customers(purchase_intervals(compute_purchases(self.test_data)))
+
+        self.assertEqual(result['CustomerID'].tolist(), [1, 2])
+        self.assertEqual(result['NumPurchases'].tolist(), [3, 2])
+        self.assertEqual(result['DaysBetween'].tolist(), [56, 1])
+
+    def test_analyzer_methods_are_cached(self):
+        """Test: los métodos del analizador comparten la tabla de compras memoizada"""
+        analyzer = RetailAnalyzer(self.test_data)
+        retention = analyzer.cohort_retention()
+        analyzer.cohort_revenue()
+        analyzer.get_repeat_customers()
+        misses = analyzer.cache_info()['misses']
+
+        pd.testing.assert_frame_equal(analyzer.cohort_retention(), retention)
+        analyzer.purchase_intervals()
+        self.assertEqual(analyzer.cache_info()['misses'], misses)
+        self.assertEqual(analyzer.cohort_retention(rate=False).iloc[0].tolist(), [1, 0, 1])
+
+        # Las copias retornadas no alteran la caché
+        retention.iloc[0, 0] = 0
+        self.assertEqual(analyzer.cohort_retention().iloc[0, 0], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests unitarios para el cubo de ventas
+"""
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from cube import SalesCube
+
+
+class TestSalesCube(unittest.TestCase):
+    """Tests para la clase SalesCube"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        rng = np.random.default_rng(7)
+        n = 500
+        self.test_data = pd.DataFrame({
+            'Invoice': rng.integers(1, 120, n).astype(str),
+            'CustomerID': rng.integers(100, 160, n).astype(float),
+            'InvoiceDate': pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit='h'),
+            'Country': rng.choice(['United Kingdom', 'France', 'Germany'], n),
+            'Quantity': rng.integers(1, 10, n),
+            'Price': rng.random(n).round(2) + 0.5
+        })
+        self.test_data['TotalAmount'] = self.test_data['Quantity'] * self.test_data['Price']
+
+    def test_rollup_matches_groupby(self):
+        """Test: el roll-up por país coincide con un groupby directo"""
+        cube = SalesCube.from_frame(self.test_data)
+        result = cube.query(by='Country')
+        expected = self.test_data.groupby('Country')['TotalAmount'].sum()
+
+        np.testing.assert_allclose(result['Revenue'].to_numpy(), expected.to_numpy())
+        self.assertEqual(result['Lines'].sum(), len(self.test_data))
+
+    def test_filters_and_distinct_counts(self):
+        """Test: filtros por mes y conteos distintos aproximados"""
+        cube = SalesCube.from_frame(self.test_data, precision=10)
+        result = cube.query(by='YearMonth', filters={'Country': 'France', 'YearMonth': ('2010-02', '2010-03')})
+
+        subset = self.test_data[
+            (self.test_data['Country'] == 'France')
+            & (self.test_data['InvoiceDate'] >= '2010-02-01')
+            & (self.test_data['InvoiceDate'] < '2010-04-01')
+        ]
+        expected = subset.groupby(subset['InvoiceDate'].dt.to_period('M'))
+        np.testing.assert_allclose(result['Revenue'].to_numpy(), expected['TotalAmount'].sum().to_numpy())
+
+        exact_customers = expected['CustomerID'].nunique().to_numpy()
+        self.assertTrue(np.all(np.abs(result['Customers'].to_numpy() - exact_customers) <= 0.1 * exact_customers))
+
+    def test_extend_equals_full_build(self):
+        """Test: extender por meses equivale a construir con todos los datos"""
+        data = self.test_data.sort_values('InvoiceDate')
+        first = data[data['InvoiceDate'] < '2010-03-01']
+        second = data[data['InvoiceDate'] >= '2010-03-01']
+
+        incremental = SalesCube.from_frame(first).extend(second)
+        full = SalesCube.from_frame(data)
+
+        pd.testing.assert_frame_equal(incremental.query(by=['YearMonth', 'Country']),
+                                      full.query(by=['YearMonth', 'Country']))
+
+    def test_save_and_load(self):
+        """Test: el cubo se persiste y se recarga sin cambios"""
+        cube = SalesCube.from_frame(self.test_data)
+        with tempfile.TemporaryDirectory() as tmp:
+            cube.save(tmp)
+            loaded = SalesCube.load(tmp)
+
+        pd.testing.assert_frame_equal(cube.query(by='Hour'), loaded.query(by='Hour'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,8 @@ Test unitarios para el módulo data_loader
 """
 
 import unittest
+import tempfile
+import numpy as np
 import pandas as pd
 import sys
 from pathlib import Path
@@ -102,5 +104,124 @@ class TestRetailDataLoader(unittest.TestCase):
         for key in expected_keys:
             self.assertIn(key, summary)
 
+    def test_clean_data_optimize_compacts_schema(self):
+        """Test: el esquema compacto usa categorías y tipos de 32 bits"""
+
+        loader = RetailDataLoader('dummy_path.xlsx')
+        loader.df = self.test_data.copy()
+        loader.df['Invoice'] = ['489434', '489435', 'C489449', '489436']
+
+        cleaned = loader.clean_data(optimize=True)
+
+        self.assertEqual(cleaned['Country'].dtype, 'category')
+        self.assertEqual(cleaned['Description'].dtype, 'category')
+        self.assertEqual(str(cleaned['CustomerID'].dtype), 'Int32')
+        self.assertEqual(cleaned['Quantity'].dtype, 'int32')
+        self.assertEqual(cleaned['TotalAmount'].dtype, 'float64')
+        self.assertEqual(str(cleaned['Invoice'].dtype), 'int32')
+        self.assertEqual(cleaned['Invoice'].tolist(), [489434, 489435])
+        self.assertNotIn('IsCancelled', cleaned.columns)
+
+        # El reporte de memoria incluye cada columna y el total
+        self.assertIn('Total', loader.memory_report.index)
+        self.assertIn('reduction_pct', loader.memory_report.columns)
+
+    def test_clean_data_optimize_keeps_money_exact(self):
+        """Test: el esquema compacto no cambia las sumas de ingresos"""
+
+        n = 200_000
+        rng = np.random.default_rng(3)
+        raw = pd.DataFrame({
+            'Invoice': np.arange(n).astype(str),
+            'StockCode': 'A',
+            'Description': 'Product',
+            'Quantity': rng.integers(1, 50, n),
+            'InvoiceDate': pd.Timestamp('2010-01-01'),
+            'Price': rng.integers(1, 100_000, n) / 100,
+            'CustomerID': rng.integers(12_000, 13_000, n).astype(float),
+            'Country': 'United Kingdom'
+        })
+        plain, compact = RetailDataLoader('dummy_path.xlsx'), RetailDataLoader('dummy_path.xlsx')
+        plain.df, compact.df = raw.copy(), raw.copy()
+
+        self.assertEqual(compact.clean_data(optimize=True)['TotalAmount'].sum(),
+                         plain.clean_data()['TotalAmount'].sum())
+
+    def test_streaming_matches_clean_data(self):
+        """Test: la limpieza por lotes produce el mismo resultado que clean_data"""
+
+        loader = RetailDataLoader('dummy_path.xlsx')
+        loader.df = self.test_data.copy()
+        expected = loader.clean_data().reset_index(drop=True)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ('retail.csv', 'retail.parquet', 'retail.xlsx'):
+                path = Path(tmp) / name
+                if name.endswith('.csv'):
+                    self.test_data.to_csv(path, index=False)
+                elif name.endswith('.parquet'):
+                    self.test_data.to_parquet(path, index=False)
+                else:
+                    self.test_data.to_excel(path, index=False)
+
+                stream_loader = RetailDataLoader(path)
+                batches = list(stream_loader.iter_clean_batches(batch_size=2))
+                self.assertTrue(all(len(b) <= 2 for b in batches))
+
+                streamed = stream_loader.collect(batches)
+                self.assertEqual(streamed['Invoice'].tolist(), expected['Invoice'].tolist())
+                self.assertEqual(streamed['TotalAmount'].tolist(), expected['TotalAmount'].tolist())
+
+    def test_streaming_without_rejected_ledger(self):
+        """Test: keep_rejected=False limpia igual pero no acumula los rechazos"""
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'retail.parquet'
+            self.test_data.to_parquet(path, index=False)
+
+            kept = RetailDataLoader(path)
+            expected = kept.load_clean_streaming(batch_size=2)
+            dropped = RetailDataLoader(path)
+            streamed = dropped.load_clean_streaming(batch_size=2, keep_rejected=False)
+
+        pd.testing.assert_frame_equal(streamed, expected)
+        self.assertEqual(kept.rejection_counts().sum(), 2)
+        self.assertIsNone(dropped.rejected)
+        with self.assertRaises(ValueError):
+            dropped.rejection_counts()
+
+    def test_streaming_csv_invoice_across_chunks(self):
+        """Test: una factura partida entre dos chunks del CSV sigue siendo una sola"""
+
+        raw = pd.DataFrame({
+            'Invoice': [100, 100, 101, 101, 102, 102, 102, 'C103', 104, 104],
+            'StockCode': ['A', 'B', 'A', 'C', 'A', 'B', 'C', 'A', 'B', 'A'],
+            'Description': 'Product',
+            'Quantity': [1, 2, 1, 1, 3, 1, 2, -1, 1, 1],
+            'InvoiceDate': pd.date_range('2024-01-01', periods=10, freq='D'),
+            'Price': 2.5,
+            'CustomerID': [1, 1, 2, 2, 3, 3, 3, 3, 1, 1],
+            'Country': 'UK'
+        })
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'retail.csv'
+            raw.to_csv(path, index=False)
+
+            loader = RetailDataLoader(path)
+            loader.df = pd.read_csv(path)
+            loader.df['InvoiceDate'] = pd.to_datetime(loader.df['InvoiceDate'])
+            expected = loader.clean_data()
+
+            streamed = RetailDataLoader(path).load_clean_streaming(batch_size=5)
+
+        self.assertEqual(streamed['Invoice'].nunique(), expected['Invoice'].nunique())
+        self.assertEqual(streamed['Invoice'].tolist(), expected['Invoice'].tolist())
+        pd.testing.assert_series_equal(
+            streamed.groupby('CustomerID')['Invoice'].nunique(),
+            expected.groupby('CustomerID')['Invoice'].nunique()
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
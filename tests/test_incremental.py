@@ -0,0 +1,114 @@
+"""
+Tests unitarios para el pipeline incremental
+"""
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from analysis import RetailAnalyzer
+from data_loader import RetailDataLoader
+from incremental import IncrementalPipeline
+
+
+class TestIncrementalPipeline(unittest.TestCase):
+    """Tests para la clase IncrementalPipeline"""
+
+    def setUp(self):
+        """Configuración inicial: tres meses de transacciones crudas"""
+        rng = np.random.default_rng(11)
+        n = 600
+        invoices = rng.integers(1, 200, n)
+        self.raw = pd.DataFrame({
+            'Invoice': np.where(rng.random(n) < 0.05, 'C' + invoices.astype(str), invoices.astype(str)),
+            'StockCode': rng.integers(1, 40, n).astype(str),
+            'Description': np.where(rng.random(n) < 0.03, None, 'Product'),
+            'Quantity': rng.integers(-2, 12, n),
+            'InvoiceDate': pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 90 * 24 * 60, n), unit='min'),
+            'Price': rng.random(n).round(2),
+            'CustomerID': np.where(rng.random(n) < 0.1, np.nan, rng.integers(100, 140, n)),
+            'Country': 'United Kingdom'
+        }).sort_values('InvoiceDate', ignore_index=True)
+
+    def _full_recompute(self):
+        loader = RetailDataLoader('dummy_path.xlsx')
+        loader.df = self.raw.copy()
+        return RetailAnalyzer(loader.clean_data())
+
+    def _apply_monthly_batches(self, pipeline):
+        for _, batch in self.raw.groupby(self.raw['InvoiceDate'].dt.to_period('M')):
+            pipeline.apply_batch(batch)
+
+    def test_incremental_equals_full_recompute(self):
+        """Test: aplicar lotes mensuales equivale a recalcular todo"""
+        pipeline = IncrementalPipeline()
+        self._apply_monthly_batches(pipeline)
+        full = self._full_recompute()
+
+        pd.testing.assert_frame_equal(pipeline.customer_rfm_segmentation(),
+                                      full.customer_rfm_segmentation())
+        pd.testing.assert_series_equal(pipeline.sales_by_month(), full.sales_by_month())
+        pd.testing.assert_series_equal(pipeline.sales_by_hour(), full.sales_by_hour())
+
+    def test_state_is_persisted(self):
+        """Test: el estado persistido permite continuar en otro proceso"""
+        batches = [b for _, b in self.raw.groupby(self.raw['InvoiceDate'].dt.to_period('M'))]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            first = IncrementalPipeline(tmp)
+            first.apply_batch(batches[0])
+            first.apply_batch(batches[1])
+
+            resumed = IncrementalPipeline(tmp)
+            resumed.apply_batch(batches[2])
+            self.assertEqual(resumed.batches_applied, 3)
+
+        full = self._full_recompute()
+        pd.testing.assert_frame_equal(resumed.customer_rfm_segmentation(),
+                                      full.customer_rfm_segmentation())
+        pd.testing.assert_series_equal(resumed.sales_by_month(), full.sales_by_month())
+
+    def test_batches_append_only_new_state(self):
+        """Test: cada lote anexa solo sus pares nuevos y save() compacta sin cambiar resultados"""
+        batches = [b for _, b in self.raw.groupby(self.raw['InvoiceDate'].dt.to_period('M'))]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline = IncrementalPipeline(tmp)
+            pipeline.apply_batch(batches[0])
+            # Repetir un lote se omite: no suma montos ni anexa pares
+            self.assertEqual(len(pipeline.apply_batch(batches[0])), 0)
+            pipeline.apply_batch(batches[1])
+            pipeline.apply_batch(batches[2])
+            parts = sorted(p.name for p in (Path(tmp) / 'invoices').glob('part-*.parquet'))
+            self.assertEqual(parts, ['part-00001.parquet', 'part-00002.parquet', 'part-00003.parquet'])
+
+            first = pd.read_parquet(Path(tmp) / 'invoices' / 'part-00001.parquet')
+            second = pd.read_parquet(Path(tmp) / 'invoices' / 'part-00002.parquet')
+            self.assertEqual(len(first.merge(second)), 0)
+
+            full = self._full_recompute()
+            expected = pipeline.customer_rfm_segmentation()
+            pd.testing.assert_frame_equal(expected, full.customer_rfm_segmentation())
+            pd.testing.assert_series_equal(pipeline.sales_by_month(), full.sales_by_month())
+            pd.testing.assert_series_equal(pipeline.sales_by_hour(), full.sales_by_hour())
+
+            pipeline.save()
+            self.assertEqual(len(list((Path(tmp) / 'invoices').glob('part-*.parquet'))), 1)
+            resumed = IncrementalPipeline(tmp)
+            # Las huellas persisten: el reintento tras reanudar también se omite
+            resumed.apply_batch(batches[1])
+            self.assertEqual(resumed.batches_applied, 3)
+            pd.testing.assert_frame_equal(resumed.customer_rfm_segmentation(), expected)
+
+    def test_rfm_requires_a_batch(self):
+        """Test: pedir RFM sin lotes aplicados da un error claro"""
+        with self.assertRaises(ValueError):
+            IncrementalPipeline().customer_rfm_segmentation()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests unitarios para la instrumentación por etapas
+"""
+import unittest
+import json
+import tempfile
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+import instrumentation
+from instrumentation import (MemorySink, LoggingSink, NullSink, PrometheusTextfileSink,
+                             add_sink, clear_sinks, stage)
+from data_loader import RetailDataLoader
+from analysis import RetailAnalyzer
+from sql_executor import SQLiteExecutor
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Tests para stage, instrumented y los sinks"""
+
+    def setUp(self):
+        """Configuración inicial: datos crudos con filas inválidas"""
+        self.raw = pd.DataFrame({
+            'Invoice': ['1', '1', 'C2', '3', '4', '5'],
+            'StockCode': ['A', 'B', 'A', 'C', 'D', 'E'],
+            'Description': ['A', 'B', 'A', None, 'D', 'E'],
+            'Quantity': [1, 2, -1, 4, 0, 3],
+            'InvoiceDate': pd.to_datetime(['2010-01-01 10:00'] * 6),
+            'Price': [1.0, 2.0, 1.0, 4.0, 5.0, 0.0],
+            'CustomerID': [1.0, 1.0, 2.0, 3.0, 4.0, 5.0],
+            'Country': ['UK'] * 6
+        })
+
+    def tearDown(self):
+        clear_sinks()
+
+    def test_clean_filters_report_rows(self):
+        """Test: cada filtro de limpieza reporta filas de entrada y salida"""
+        sink = add_sink(MemorySink())
+        loader = RetailDataLoader('unused.xlsx')
+        loader.df = self.raw
+        loader.clean_data()
+
+        expected = {'clean.dropna': (6, 5), 'clean.cancelled': (5, 4),
+                    'clean.quantity': (4, 3), 'clean.price': (3, 2)}
+        for name, (rows_in, rows_out) in expected.items():
+            event = sink.by_stage(name)[0]
+            self.assertEqual((event['rows_in'], event['rows_out']), (rows_in, rows_out))
+            self.assertEqual(event['parent'], 'loader.clean_data')
+            self.assertGreaterEqual(event['wall_seconds'], 0)
+
+        outer = sink.by_stage('loader.clean_data')[0]
+        self.assertEqual((outer['rows_in'], outer['rows_out']), (6, 2))
+        self.assertIsNotNone(outer['peak_rss_delta_bytes'])
+
+    def test_analyzer_and_connect_stages(self):
+        """Test: los métodos del analizador y la conexión SQL emiten eventos"""
+        sink = add_sink(MemorySink())
+        df = RetailDataLoader._clean_frame(self.raw)
+        analyzer = RetailAnalyzer(df)
+        analyzer.sales_by_hour()
+        analyzer.get_basic_stats()
+        SQLiteExecutor().connect()
+
+        self.assertEqual(sink.by_stage('analysis.sales_by_hour')[0]['rows_out'], 1)
+        self.assertIsNone(sink.by_stage('analysis.get_basic_stats')[0]['rows_out'])
+        self.assertEqual(sink.by_stage('sql.connect')[0]['labels'], {'backend': 'sqlite'})
+
+    def test_logging_and_prometheus_sinks(self):
+        """Test: los eventos se escriben como JSON y como métricas Prometheus"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'retail.prom'
+            add_sink(PrometheusTextfileSink(path))
+            add_sink(LoggingSink())
+
+            with self.assertLogs('retail.instrumentation', level='INFO') as logs:
+                with stage('demo', rows_in=10) as s:
+                    s.rows_out = 4
+                with stage('demo', rows_in=5) as s:
+                    s.rows_out = 5
+
+            event = json.loads(logs.records[0].getMessage())
+            self.assertEqual(event['stage'], 'demo')
+            text = path.read_text(encoding='utf-8')
+            self.assertIn('retail_stage_calls_total{stage="demo"} 2', text)
+            self.assertIn('retail_stage_rows_out_total{stage="demo"} 9', text)
+
+    def test_null_sink_disables_instrumentation(self):
+        """Test: el sink nulo no activa la medición (objeto compartido sin efecto)"""
+        add_sink(NullSink())
+        self.assertIs(stage('a'), stage('b'))
+        self.assertFalse(instrumentation._enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
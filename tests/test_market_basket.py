@@ -0,0 +1,94 @@
+"""
+Tests unitarios para el motor de análisis de canasta
+"""
+import unittest
+from itertools import combinations
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+import market_basket
+from market_basket import MarketBasket
+
+
+class TestMarketBasket(unittest.TestCase):
+    """Tests para la clase MarketBasket"""
+
+    def setUp(self):
+        """Configuración inicial: facturas aleatorias con líneas repetidas"""
+        rng = np.random.default_rng(11)
+        n = 600
+        self.test_data = pd.DataFrame({
+            'Invoice': rng.integers(1, 80, n).astype(str),
+            'Description': [f'Product {i:02d}' for i in rng.integers(1, 15, n)]
+        })
+        self.basket = MarketBasket(self.test_data)
+
+    def _self_join_pairs(self):
+        """Pares por factura calculados con un self-join de pandas"""
+        lines = self.test_data.drop_duplicates()
+        joined = lines.merge(lines, on='Invoice')
+        joined = joined[joined['Description_x'] < joined['Description_y']]
+        return joined.groupby(['Description_x', 'Description_y']).size()
+
+    def test_pair_counts_match_self_join(self):
+        """Test: los conteos de pares coinciden con el self-join"""
+        pairs = self.basket.pair_counts()
+        expected = self._self_join_pairs()
+
+        result = pairs.set_index(['Product1', 'Product2'])['TimesBoughtTogether']
+        self.assertEqual(len(result), len(expected))
+        self.assertTrue((result.loc[expected.index].to_numpy() == expected.to_numpy()).all())
+        self.assertTrue(pairs['TimesBoughtTogether'].is_monotonic_decreasing)
+
+        top = self.basket.pair_counts(top=5, min_count=2)
+        self.assertEqual(len(top), 5)
+
+    def test_parallel_shards_match_serial(self):
+        """Test: el modo por fragmentos en varios procesos da el mismo resultado"""
+        original = market_basket.MAX_PAIRS_PER_SHARD
+        market_basket.MAX_PAIRS_PER_SHARD = 200
+        try:
+            self.assertGreater(len(self.basket._shards()), 1)
+            parallel = self.basket.pair_counts(workers=2)
+        finally:
+            market_basket.MAX_PAIRS_PER_SHARD = original
+        pd.testing.assert_frame_equal(parallel, self.basket.pair_counts())
+
+    def test_frequent_itemsets_match_brute_force(self):
+        """Test: los itemsets frecuentes coinciden con una enumeración exhaustiva"""
+        itemsets = self.basket.frequent_itemsets(min_support=0.05, max_len=3)
+        found = dict(zip(itemsets['itemsets'], itemsets['count']))
+
+        baskets = [set(g) for _, g in self.test_data.groupby('Invoice')['Description']]
+        min_count = int(np.ceil(0.05 * len(baskets)))
+        products = sorted(self.test_data['Description'].unique())
+        expected = {}
+        for size in (1, 2, 3):
+            for itemset in combinations(products, size):
+                count = sum(set(itemset) <= b for b in baskets)
+                if count >= min_count:
+                    expected[itemset] = count
+        self.assertEqual(found, expected)
+
+    def test_association_rules_metrics(self):
+        """Test: confianza y lift se calculan a partir de los soportes"""
+        rules = self.basket.association_rules(min_support=0.05, min_confidence=0.2, max_len=2)
+        self.assertGreater(len(rules), 0)
+        self.assertTrue((rules['confidence'] >= 0.2).all())
+
+        baskets = [set(g) for _, g in self.test_data.groupby('Invoice')['Description']]
+        rule = rules.iloc[0]
+        (a,), (c,) = rule['antecedents'], rule['consequents']
+        n_a = sum(a in b for b in baskets)
+        n_c = sum(c in b for b in baskets)
+        n_ac = sum({a, c} <= b for b in baskets)
+        self.assertAlmostEqual(rule['confidence'], n_ac / n_a)
+        self.assertAlmostEqual(rule['lift'], (n_ac / n_a) / (n_c / len(baskets)))
+
+
+if __name__ == '__main__':
+    unittest.main()
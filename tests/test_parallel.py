@@ -0,0 +1,80 @@
+"""
+Tests unitarios para la ejecución paralela de agregaciones
+"""
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from analysis import RetailAnalyzer
+from parallel import parallel_rfm, parallel_temporal, month_ranges
+from rfm import compute_rfm
+from temporal_index import TemporalIndex, sum_count_by_key
+
+
+class TestParallel(unittest.TestCase):
+    """Tests para parallel_rfm, parallel_temporal y el modo paralelo del analizador"""
+
+    def setUp(self):
+        """Configuración inicial: DataFrame limpio con clientes nulos"""
+        rng = np.random.default_rng(5)
+        n = 5_000
+        invoices = rng.integers(1, 900, n)
+        customers = (invoices % 137 + 12_000).astype(float)
+        customers[rng.random(n) < 0.05] = np.nan
+        self.test_data = pd.DataFrame({
+            'Invoice': invoices.astype(str),
+            'CustomerID': customers,
+            'InvoiceDate': pd.Timestamp('2009-12-01') + pd.to_timedelta(rng.integers(0, 400 * 24, n), unit='h'),
+            'TotalAmount': rng.gamma(2.0, 10.0, n).round(2)
+        })
+
+    def test_parallel_rfm_matches_serial(self):
+        """Test: la partición por cliente reproduce exactamente compute_rfm"""
+        expected = compute_rfm(self.test_data)
+        for workers in (1, 3):
+            pd.testing.assert_frame_equal(parallel_rfm(self.test_data, workers), expected)
+
+    def test_parallel_temporal_matches_serial(self):
+        """Test: la partición por meses reproduce sumas y conteos"""
+        index = TemporalIndex(self.test_data['InvoiceDate'])
+        amounts = self.test_data['TotalAmount'].to_numpy()
+        totals = parallel_temporal(index, amounts, workers=4)
+
+        sums, counts = sum_count_by_key(index.month_code, amounts, index.n_months)
+        np.testing.assert_array_equal(totals['month'][0], sums)
+        np.testing.assert_array_equal(totals['month'][1], counts)
+
+        sums, counts = sum_count_by_key(index.hour, amounts, 24)
+        np.testing.assert_allclose(totals['hour'][0], sums)
+        np.testing.assert_array_equal(totals['hour'][1], counts)
+
+        parts = month_ranges(index.month_code, index.n_months, 4)
+        self.assertTrue((np.diff(parts) >= 0).all())
+        self.assertEqual(parts[-1], 3)
+
+    def test_analyzer_parallel_mode(self):
+        """Test: RetailAnalyzer con workers > 1 devuelve las mismas salidas"""
+        serial = RetailAnalyzer(self.test_data)
+        parallel = RetailAnalyzer(self.test_data, workers=2)
+        pd.testing.assert_frame_equal(parallel.customer_rfm_segmentation(advanced=True),
+                                      serial.customer_rfm_segmentation(advanced=True))
+        pd.testing.assert_series_equal(parallel.sales_by_month(), serial.sales_by_month())
+        pd.testing.assert_series_equal(parallel.sales_by_hour(), serial.sales_by_hour())
+        pd.testing.assert_frame_equal(parallel.sales_by_day_of_week(), serial.sales_by_day_of_week())
+
+    def test_parallel_rfm_compact_dtypes(self):
+        """Test: CustomerID Int32 e Invoice numérica (esquema compacto) dan el mismo resultado"""
+        compact = self.test_data.assign(CustomerID=self.test_data['CustomerID'].astype('Int32'),
+                                        Invoice=self.test_data['Invoice'].astype('int32'))
+        pd.testing.assert_frame_equal(parallel_rfm(compact, 3), compute_rfm(compact))
+
+        categorical = self.test_data.assign(Invoice=self.test_data['Invoice'].astype('category'))
+        pd.testing.assert_frame_equal(parallel_rfm(categorical, 2), compute_rfm(categorical))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Tests unitarios para el analizador out-of-core sobre Parquet
+"""
+import unittest
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+import parquet_analyzer
+from analysis import RetailAnalyzer
+from parquet_analyzer import ParquetAnalyzer
+
+
+class TestParquetAnalyzer(unittest.TestCase):
+    """Tests para la clase ParquetAnalyzer"""
+
+    def setUp(self):
+        """Configuración inicial: dataset particionado por año escrito en dos tandas"""
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(8)
+        n = 3_000
+        invoices = rng.integers(1, 700, n)
+        self.test_data = pd.DataFrame({
+            'Invoice': invoices.astype(str),
+            'CustomerID': (invoices % 90 + 12_000).astype(float),
+            'InvoiceDate': pd.Timestamp('2009-06-01') + pd.to_timedelta(rng.integers(0, 700 * 24, n), unit='h'),
+            'TotalAmount': rng.gamma(2.0, 10.0, n).round(2),
+            'Country': rng.choice(['United Kingdom', 'France'], n)
+        })
+        self.test_data.loc[rng.random(n) < 0.05, 'CustomerID'] = np.nan
+
+        # Las mismas facturas quedan repartidas entre archivos y lotes
+        self.path = Path(self.tmp.name) / 'retail'
+        half = n // 2
+        ParquetAnalyzer.write_dataset(self.test_data.iloc[:half], self.path, max_rows_per_group=200)
+        ParquetAnalyzer.write_dataset(self.test_data.iloc[half:], self.path, max_rows_per_group=200)
+
+        self.analyzer = ParquetAnalyzer(self.path, batch_size=200)
+        self.expected = RetailAnalyzer(self.test_data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_basic_stats_match(self):
+        """Test: las estadísticas básicas coinciden con RetailAnalyzer"""
+        stats = self.analyzer.get_basic_stats()
+        expected = self.expected.get_basic_stats()
+        self.assertEqual(stats['total_transactions'], expected['total_transactions'])
+        self.assertEqual(stats['total_customers'], expected['total_customers'])
+        self.assertAlmostEqual(stats['avg_sale'], expected['avg_sale'])
+
+    def test_rfm_matches_in_memory(self):
+        """Test: la RFM combinada por lotes coincide con la calculada en memoria"""
+        with mock.patch.object(parquet_analyzer, 'MERGE_EVERY', 3):
+            rfm = self.analyzer.customer_rfm_segmentation()
+        expected = self.expected.customer_rfm_segmentation()
+
+        rfm, expected = rfm.sort_index(), expected.sort_index()
+        np.testing.assert_array_equal(rfm['Recency'], expected['Recency'])
+        np.testing.assert_array_equal(rfm['Frequency'], expected['Frequency'])
+        np.testing.assert_allclose(rfm['Monetary'], expected['Monetary'])
+
+        advanced = self.analyzer.customer_rfm_segmentation(advanced=True)
+        self.assertIn('Segment', advanced.columns)
+
+    def test_temporal_methods_match(self):
+        """Test: los métodos temporales coinciden con RetailAnalyzer"""
+        pd.testing.assert_series_equal(self.analyzer.sales_by_month(), self.expected.sales_by_month(),
+                                       check_dtype=False)
+        pd.testing.assert_series_equal(self.analyzer.sales_by_hour(), self.expected.sales_by_hour(),
+                                       check_dtype=False)
+        pd.testing.assert_frame_equal(self.analyzer.sales_by_day_of_week(),
+                                      self.expected.sales_by_day_of_week(), check_dtype=False)
+        self.assertEqual(self.analyzer.get_peak_sales_time()['peak_hour'],
+                         self.expected.get_peak_sales_time()['peak_hour'])
+
+    def test_filters_pushed_down(self):
+        """Test: los filtros por partición y columna restringen el análisis"""
+        france = self.analyzer.where(ds.field('Country') == 'France')
+        year = self.analyzer.where(ds.field('Year') == 2010)
+
+        expected_france = self.test_data[self.test_data['Country'] == 'France']
+        expected_year = self.test_data[self.test_data['InvoiceDate'].dt.year == 2010]
+        self.assertEqual(france.get_basic_stats()['total_transactions'], len(expected_france))
+        self.assertEqual(year.get_basic_stats()['total_transactions'], len(expected_year))
+
+        scanned = sum(len(batch) for batch in year._scan(['InvoiceDate']))
+        self.assertEqual(scanned, len(expected_year))
+
+
+if __name__ == '__main__':
+    unittest.main()
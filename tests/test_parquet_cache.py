@@ -0,0 +1,99 @@
+"""
+Tests unitarios para la caché Parquet de hojas Excel
+"""
+import unittest
+import tempfile
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from data_loader import RetailDataLoader
+from parquet_cache import ParquetSheetCache
+
+
+class TestParquetSheetCache(unittest.TestCase):
+    """Tests para la clase ParquetSheetCache"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.workbook = Path(self.tmp.name) / 'retail.xlsx'
+        self.cache_dir = Path(self.tmp.name) / 'cache'
+
+        self.sheet_a = pd.DataFrame({
+            'Invoice': [489434, 489435, 'C489449'],
+            'StockCode': ['85048', '79323P', 22087],
+            'Description': ['Product 1', 'Product 2', None],
+            'Quantity': [12, 6, -1],
+            'InvoiceDate': pd.to_datetime(['2009-12-01 07:45', '2009-12-01 07:46', '2009-12-01 10:33']),
+            'Price': [6.95, 6.75, 2.55],
+            'CustomerID': [13085.0, 13085.0, None],
+            'Country': ['United Kingdom', 'United Kingdom', 'France']
+        })
+        self.sheet_b = self.sheet_a.copy()
+        self.sheet_b['Quantity'] = [1, 2, -3]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write_workbook(self, sheet_b):
+        with pd.ExcelWriter(self.workbook, engine='openpyxl') as writer:
+            self.sheet_a.to_excel(writer, sheet_name='Year 2009-2010', index=False)
+            sheet_b.to_excel(writer, sheet_name='Year 2010-2011', index=False)
+
+    def test_second_load_reads_from_cache(self):
+        """Test: la segunda carga no reconstruye ninguna hoja"""
+        self._write_workbook(self.sheet_b)
+
+        cache = ParquetSheetCache(self.workbook, self.cache_dir)
+        first = cache.load_sheets()
+        self.assertEqual(cache.last_rebuilt, ['Year 2009-2010', 'Year 2010-2011'])
+
+        second = cache.load_sheets()
+        self.assertEqual(cache.last_rebuilt, [])
+        for (name_1, df_1), (name_2, df_2) in zip(first, second):
+            self.assertEqual(name_1, name_2)
+            pd.testing.assert_frame_equal(df_1, df_2)
+
+    def test_only_changed_sheet_is_rebuilt(self):
+        """Test: solo se reconstruye la hoja modificada"""
+        self._write_workbook(self.sheet_b)
+        cache = ParquetSheetCache(self.workbook, self.cache_dir)
+        cache.load_sheets()
+
+        changed = self.sheet_b.copy()
+        changed['Quantity'] = [7, 8, 9]
+        self._write_workbook(changed)
+
+        sheets = dict(cache.load_sheets())
+        self.assertEqual(cache.last_rebuilt, ['Year 2010-2011'])
+        self.assertEqual(sheets['Year 2010-2011']['Quantity'].tolist(), [7, 8, 9])
+
+    def test_loader_uses_cache(self):
+        """Test: load_data con caché devuelve los mismos datos combinados"""
+        self._write_workbook(self.sheet_b)
+
+        loader = RetailDataLoader(self.workbook, cache_dir=self.cache_dir)
+        df = loader.load_data()
+
+        self.assertEqual(len(df), 6)
+        self.assertEqual(df['Invoice'].tolist()[:3], ['489434', '489435', 'C489449'])
+        self.assertTrue(any(self.cache_dir.rglob('manifest.json')))
+
+    def test_cached_and_uncached_loads_match(self):
+        """Test: con y sin caché (fría o caliente) load_data devuelve los mismos valores y tipos"""
+        self._write_workbook(self.sheet_b)
+
+        uncached = RetailDataLoader(self.workbook).load_data()
+        cold = RetailDataLoader(self.workbook, cache_dir=self.cache_dir).load_data()
+        warm = RetailDataLoader(self.workbook, cache_dir=self.cache_dir).load_data()
+
+        pd.testing.assert_frame_equal(cold, uncached)
+        pd.testing.assert_frame_equal(warm, uncached)
+        self.assertEqual(uncached['StockCode'].tolist()[:3], ['85048', '79323P', '22087'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests unitarios para el registro de queries y la caché de resultados
+"""
+import unittest
+import os
+import tempfile
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from query_registry import QueryRegistry, QueryResultCache, referenced_tables
+from sql_executor import SQLiteExecutor
+
+QUERY_FILE = Path(__file__).parent.parent / 'sql' / 'queries.sql'
+
+
+class TestQueryRegistry(unittest.TestCase):
+    """Tests para QueryRegistry y QueryResultCache"""
+
+    def setUp(self):
+        """Configuración inicial para cada test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.test_data = pd.DataFrame({
+            'Invoice': ['1', '1', '2', '3'],
+            'Description': ['A', 'B', 'A', 'C'],
+            'Quantity': [1, 2, 3, 4],
+            'Price': [1.0, 2.0, 3.0, 4.0],
+            'InvoiceDate': pd.to_datetime(['2010-01-01', '2010-01-01', '2010-02-01', '2010-03-01']),
+            'CustomerID': [1.0, 1.0, 2.0, 3.0],
+            'Country': ['UK', 'UK', 'France', 'UK']
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_registry_lookup_and_reload(self):
+        """Test: el registro busca por número/título y se recarga si cambia el archivo"""
+        path = Path(self.tmp.name) / 'queries.sql'
+        path.write_text(QUERY_FILE.read_text(encoding='utf-8'), encoding='utf-8')
+
+        registry = QueryRegistry(path)
+        self.assertEqual(len(registry), 8)
+        self.assertEqual(registry.get('ventas por país')['number'], 2)
+        self.assertIn('retail_transactions', referenced_tables(registry.get(7)['sql']))
+
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("\n\n-- 9. Conteo total\nSELECT COUNT(*) AS n FROM retail_transactions;\n")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(registry.get(9)['title'], 'Conteo total')
+
+    def test_cached_results_reused_and_invalidated(self):
+        """Test: los resultados se reutilizan y se invalidan al recargar la tabla"""
+        executor = SQLiteExecutor()
+        cache = executor.enable_result_cache(cache_dir=Path(self.tmp.name) / 'results')
+        executor.create_table_from_df(self.test_data)
+
+        first = executor.execute_query_file(QUERY_FILE, 1)
+        second = executor.execute_query_file(QUERY_FILE, 1)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual(cache.info()['hits'], 1)
+
+        executor.create_table_from_df(self.test_data.head(2))
+        self.assertEqual(cache.info()['currsize'], 0)
+        reloaded = executor.execute_query_file(QUERY_FILE, 1)
+        self.assertEqual(len(reloaded), 2)
+        executor.close()
+
+    def test_watermark_shared_across_processes(self):
+        """Test: la versión de la tabla es durable y cambia al recargar aunque no cambien las filas"""
+        database = Path(self.tmp.name) / 'retail.db'
+        cache_dir = Path(self.tmp.name) / 'results'
+        writer = SQLiteExecutor(str(database))
+        writer.create_table_from_df(self.test_data)
+        writer.enable_result_cache(cache_dir=cache_dir)
+        expected = writer.execute_query_file(QUERY_FILE, 1)
+
+        # Otro ejecutor (como otro proceso) ve la misma versión y acierta en la caché en disco
+        reader = SQLiteExecutor(str(database))
+        cache = reader.enable_result_cache(cache_dir=cache_dir)
+        self.assertEqual(reader.table_watermark('retail_transactions'),
+                         writer.table_watermark('retail_transactions'))
+        pd.testing.assert_frame_equal(reader.execute_query_file(QUERY_FILE, 1), expected)
+        self.assertEqual(cache.info()['hits'], 1)
+
+        # Recarga con el mismo número de filas desde el otro ejecutor: no se sirve el resultado viejo
+        before = reader.table_watermark('retail_transactions')
+        changed = self.test_data.assign(Quantity=self.test_data['Quantity'] * 10)
+        writer.create_table_from_df(changed)
+        self.assertNotEqual(reader.table_watermark('retail_transactions'), before)
+        reloaded = reader.execute_query_file(QUERY_FILE, 1)
+        self.assertFalse(reloaded.equals(expected))
+        self.assertIsNone(reader.table_watermark('otra_tabla'))
+        writer.close()
+        reader.close()
+
+    def test_cache_persisted_with_ttl_and_bound(self):
+        """Test: la caché persiste en disco, respeta el TTL y su tamaño máximo"""
+        cache_dir = Path(self.tmp.name) / 'results'
+        cache = QueryResultCache(cache_dir, ttl=60, maxsize=2)
+        for i in range(3):
+            cache.put(f'SELECT {i}', 'wm', pd.DataFrame({'x': [i]}), ['t'])
+
+        reopened = QueryResultCache(cache_dir, ttl=60, maxsize=2)
+        self.assertIsNone(reopened.get('SELECT 0', 'wm'))
+        self.assertEqual(reopened.get('SELECT 2', 'wm')['x'][0], 2)
+
+        expired = QueryResultCache(cache_dir, ttl=0, maxsize=2)
+        self.assertIsNone(expired.get('SELECT 2', 'wm'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests unitarios para el renderizado batch de reportes
+"""
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from report_renderer import BatchRenderer, apply_filters, country_report_specs, normalize_spec
+from visualizations import RetailVisualizer
+
+
+class TestBatchRenderer(unittest.TestCase):
+    """Tests para BatchRenderer y la separación agregación/dibujo"""
+
+    def setUp(self):
+        """Configuración inicial: DataFrame limpio con dos países"""
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(4)
+        n = 400
+        self.test_data = pd.DataFrame({
+            'Description': [f'Product {i}' for i in rng.integers(1, 30, n)],
+            'Quantity': rng.integers(1, 20, n),
+            'InvoiceDate': pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 300, n), unit='D'),
+            'TotalAmount': rng.gamma(2.0, 10.0, n),
+            'Country': rng.choice(['United Kingdom', 'France'], n)
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_render_shares_aggregates(self):
+        """Test: se generan los archivos y las agregaciones repetidas se reutilizan"""
+        specs = country_report_specs(['France', 'United Kingdom']) + [
+            {'plot': 'top_countries', 'format': 'png'},
+            {'plot': 'top_countries', 'format': 'svg'},
+        ]
+        report = BatchRenderer(self.test_data, self.tmp.name).render(specs)
+
+        self.assertEqual(len(report), 8)
+        self.assertTrue(report['error'].isna().all())
+        self.assertTrue((report['render_seconds'] > 0).all())
+        for path in report['path']:
+            self.assertGreater(Path(path).stat().st_size, 0)
+        self.assertEqual(report['aggregate_reused'].tolist(), [False] * 7 + [True])
+
+    def test_parallel_render_matches_serial(self):
+        """Test: el pool de procesos produce los mismos archivos"""
+        specs = [{'plot': 'top_products', 'filters': {'Country': 'France'}, 'name': f'p{i}'}
+                 for i in range(3)]
+        report = BatchRenderer(self.test_data, self.tmp.name, workers=2).render(specs)
+        self.assertTrue(report['error'].isna().all())
+        self.assertEqual(sorted(p.name for p in Path(self.tmp.name).iterdir()),
+                         ['p0.png', 'p1.png', 'p2.png'])
+
+    def test_options_give_distinct_files(self):
+        """Test: especificaciones que solo difieren en opciones no se pisan"""
+        specs = [{'plot': 'top_products', 'options': {'top_n': 5}},
+                 {'plot': 'top_products', 'options': {'top_n': 20}}]
+        report = BatchRenderer(self.test_data, self.tmp.name).render(specs)
+        self.assertEqual(report['path'].nunique(), 2)
+        self.assertEqual(len(list(Path(self.tmp.name).iterdir())), 2)
+
+        with self.assertRaises(ValueError):
+            BatchRenderer(self.test_data, self.tmp.name).render(
+                [{'plot': 'top_products', 'name': 'dup'}, {'plot': 'top_countries', 'name': 'dup'}])
+
+    def test_filters_and_spec_validation(self):
+        """Test: filtros por país y fecha; especificaciones inválidas fallan"""
+        subset = apply_filters(self.test_data, {'Country': 'France', 'start': '2010-03-01', 'end': '2010-04-01'})
+        self.assertTrue((subset['Country'] == 'France').all())
+        self.assertTrue(subset['InvoiceDate'].between('2010-03-01', '2010-03-31 23:59').all())
+
+        with self.assertRaises(ValueError):
+            normalize_spec({'plot': 'pie_chart'})
+        with self.assertRaises(ValueError):
+            normalize_spec({'plot': 'top_products', 'format': 'bmp'})
+
+    def test_plot_without_show_saves_file(self):
+        """Test: plot_* con show=False guarda el archivo sin bloquear"""
+        path = Path(self.tmp.name) / 'countries.png'
+        RetailVisualizer(self.test_data).plot_top_countries(save_path=path, show=False)
+        self.assertTrue(path.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Tests del servicio de análisis sobre asyncio (solo localhost)
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from analysis import RetailAnalyzer
+from service import AnalyticsService, ENDPOINTS, serialize
+
+
+def make_frame(scale: float = 1.0) -> pd.DataFrame:
+    dates = pd.date_range('2024-01-01 09:00', periods=10, freq='37h')
+    return pd.DataFrame({
+        'Invoice': [f'INV{i:03d}' for i in range(10)],
+        'CustomerID': [100, 100, 200, 200, 300, 100, 200, 400, 300, 400],
+        'InvoiceDate': dates,
+        'TotalAmount': [x * scale for x in [50, 45, 200, 50, 84, 40, 108, 176, 45, 100]]
+    })
+
+
+class TestAnalyticsService(unittest.IsolatedAsyncioTestCase):
+    """Tests para AnalyticsService"""
+
+    async def asyncSetUp(self):
+        self.loads = 0
+        self.scale = 1.0
+        self.gate = threading.Event()
+        self.gate.set()
+
+        def load():
+            self.loads += 1
+            return make_frame(self.scale)
+
+        self.service = AnalyticsService(load, port=0, warm=False)
+        self.calls = 0
+        await self.service.start()
+
+    async def asyncTearDown(self):
+        await self.service.stop()
+
+    async def request(self, target: str, verb: str = 'GET'):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.service.port)
+        writer.write(f'{verb} {target} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode('latin-1'))
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+        head, body = response.split(b'\r\n\r\n', 1)
+        return int(head.split()[1]), json.loads(body)
+
+    async def test_endpoints_match_analyzer(self):
+        """Test: cada endpoint responde lo mismo que RetailAnalyzer"""
+        analyzer = RetailAnalyzer(make_frame())
+        status, body = await self.request('/stats')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['result']['total_customers'], 4)
+        self.assertEqual(body['result']['total_sales'], analyzer.get_basic_stats()['total_sales'])
+
+        status, body = await self.request('/top-customers?n=2')
+        expected = analyzer.get_top_customers(2)
+        self.assertEqual(body['result']['index'], expected.index.tolist())
+        self.assertEqual(body['result']['columns'], expected.columns.tolist())
+
+        status, body = await self.request('/sales/month')
+        self.assertEqual(body['result']['index'], ['2024-01'])
+
+        status, body = await self.request('/rfm?advanced=true&limit=3')
+        self.assertEqual(len(body['result']['data']), 3)
+        self.assertIn('Segment', body['result']['columns'])
+
+        for path in ENDPOINTS:
+            status, _ = await self.request(path)
+            self.assertEqual(status, 200, path)
+
+    async def test_errors(self):
+        """Test: rutas, métodos y parámetros inválidos"""
+        self.assertEqual((await self.request('/nope'))[0], 404)
+        self.assertEqual((await self.request('/stats', 'POST'))[0], 405)
+        self.assertEqual((await self.request('/reload'))[0], 405)
+        self.assertEqual((await self.request('/top-customers?n=abc'))[0], 400)
+        self.assertEqual((await self.request('/stats?bogus=1'))[0], 400)
+
+    async def test_identical_requests_are_coalesced(self):
+        """Test: peticiones idénticas concurrentes comparten un cálculo y luego se sirven en caliente"""
+        analyzer = self.service.analyzer
+        original = analyzer.customer_rfm_segmentation
+        started = threading.Event()
+
+        def slow(*args, **kwargs):
+            self.calls += 1
+            started.set()
+            self.gate.wait(5)
+            return original(*args, **kwargs)
+
+        analyzer.customer_rfm_segmentation = slow
+        self.gate.clear()
+        tasks = [asyncio.create_task(self.request('/rfm')) for _ in range(5)]
+        # El event loop sigue atendiendo mientras el cálculo corre en el pool
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        self.assertEqual((await self.request('/health'))[0], 200)
+        self.gate.set()
+
+        responses = await asyncio.gather(*tasks)
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(r == responses[0] for r in responses))
+        self.assertEqual(self.service.stats['coalesced'], 4)
+
+        await self.request('/rfm')
+        self.assertEqual(self.calls, 1)
+
+    async def test_response_cache_is_bounded(self):
+        """Test: las respuestas guardadas no crecen sin límite con parámetros distintos"""
+        self.service.max_responses = 3
+        for n in range(1, 8):
+            status, body = await self.request(f'/top-customers?n={n}')
+            self.assertEqual(status, 200)
+            self.assertEqual(len(body['result']['index']), min(n, 4))
+        self.assertEqual(len(self.service._responses), 3)
+
+        # La más reciente sigue en caliente
+        computed = self.service.stats['computed']
+        await self.request('/top-customers?n=7')
+        self.assertEqual(self.service.stats['computed'], computed)
+
+    async def test_hot_reload(self):
+        """Test: POST /reload cambia a los datos nuevos y descarta respuestas viejas"""
+        _, before = await self.request('/stats')
+        self.scale = 2.0
+
+        status, body = await self.request('/reload', 'POST')
+        self.assertEqual(status, 200)
+        self.assertEqual(body['generation'], 2)
+
+        _, after = await self.request('/stats')
+        self.assertEqual(after['result']['total_sales'], 2 * before['result']['total_sales'])
+
+        # Recargas concurrentes comparten una sola carga
+        loads = self.loads
+        generations = await asyncio.gather(self.service.reload(), self.service.reload())
+        self.assertEqual(generations, [3, 3])
+        self.assertEqual(self.loads, loads + 1)
+
+    async def test_serialize_handles_scalars_and_periods(self):
+        """Test: la serialización acepta dicts con fechas/NumPy y Series por periodo"""
+        peak = json.loads(serialize(self.service.analyzer.get_peak_sales_time()))
+        self.assertIn('peak_hour', peak['result'])
+        monthly = json.loads(serialize(self.service.analyzer.sales_by_month()))
+        self.assertEqual(monthly['result']['index'], ['2024-01'])
+
+
+class TestServiceFromPath(unittest.IsolatedAsyncioTestCase):
+    """Tests de carga desde archivo y recarga al cambiar el archivo"""
+
+    async def test_reloads_when_file_changes(self):
+        """Test: un cambio en el archivo vigilado dispara la recarga"""
+        raw = make_frame().drop(columns='TotalAmount').assign(
+            Description='Product', Quantity=1, Price=make_frame()['TotalAmount'], Country='UK')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'retail.csv'
+            raw.to_csv(path, index=False)
+            service = AnalyticsService.from_path(path, watch_interval=0.05)
+            async with service:
+                self.assertEqual(len(service.analyzer.df), 10)
+                pd.concat([raw, raw.head(2)]).to_csv(path, index=False)
+                os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+
+                for _ in range(100):
+                    if service.generation == 2:
+                        break
+                    await asyncio.sleep(0.05)
+                self.assertEqual(service.generation, 2)
+                self.assertEqual(len(service.analyzer.df), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Tests unitarios para el módulo sql_executor (backend SQLite embebido)
+"""
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from sql_executor import (BaseSQLExecutor, SQLiteExecutor, SQLServerExecutor, parse_queries,
+                          translate_tsql)
+
+QUERY_FILE = Path(__file__).parent.parent / 'sql' / 'queries.sql'
+
+
+class TestSQLiteExecutor(unittest.TestCase):
+    """Tests para la clase SQLiteExecutor"""
+
+    def setUp(self):
+        """Configuración inicial: DataFrame limpio cargado en SQLite"""
+        rng = np.random.default_rng(3)
+        n = 300
+        self.test_data = pd.DataFrame({
+            'Invoice': rng.integers(1, 40, n).astype(str),
+            'StockCode': rng.integers(1, 10, n).astype(str),
+            'Description': [f'Product {i}' for i in rng.integers(1, 25, n)],
+            'Quantity': rng.integers(1, 50, n),
+            'InvoiceDate': pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 120 * 24, n), unit='h'),
+            'Price': rng.random(n).round(2) + 1,
+            'CustomerID': rng.integers(100, 120, n).astype(float),
+            'Country': rng.choice(['United Kingdom', 'France'], n)
+        })
+        self.test_data['TotalAmount'] = self.test_data['Quantity'] * self.test_data['Price']
+
+        self.executor = SQLiteExecutor()
+        self.executor.create_table_from_df(self.test_data)
+
+    def tearDown(self):
+        self.executor.close()
+
+    def test_translate_tsql(self):
+        """Test: TOP, FORMAT y DATEDIFF se traducen a SQLite"""
+        sql = translate_tsql(
+            "SELECT TOP 5 FORMAT(InvoiceDate, 'yyyy-MM') AS ym, "
+            "DATEDIFF(DAY, MIN(InvoiceDate), MAX(InvoiceDate)) AS d FROM t;"
+        )
+        self.assertNotIn('TOP', sql)
+        self.assertIn("strftime('%Y-%m', InvoiceDate)", sql)
+        self.assertIn('julianday(date(MAX(InvoiceDate)))', sql)
+        self.assertTrue(sql.endswith('LIMIT 5;'))
+
+    def test_incomplete_backend_fails_on_instantiation(self):
+        """Test: un backend sin connect/_new_connection no se puede instanciar"""
+        class Incomplete(BaseSQLExecutor):
+            def connect(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            BaseSQLExecutor()
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_all_queries_in_file_run(self):
+        """Test: las 8 queries de queries.sql se ejecutan localmente"""
+        queries = parse_queries(QUERY_FILE.read_text(encoding='utf-8'))
+        self.assertEqual(len(queries), 8)
+        self.assertEqual(queries[0]['title'], 'Top 10 productos más vendidos')
+
+        for number in range(1, len(queries) + 1):
+            result = self.executor.execute_query_file(QUERY_FILE, number)
+            self.assertIsInstance(result, pd.DataFrame)
+
+    def test_query_results_match_pandas(self):
+        """Test: los resultados coinciden con el cálculo en pandas"""
+        top = self.executor.execute_query_file(QUERY_FILE, 1)
+        expected = (self.test_data.groupby('Description')['TotalAmount'].sum()
+                    .sort_values(ascending=False).head(10))
+        self.assertEqual(len(top), 10)
+        np.testing.assert_allclose(top['TotalRevenue'].to_numpy(), expected.to_numpy())
+
+        monthly = self.executor.execute_query_file(QUERY_FILE, 3)
+        expected_months = self.test_data['InvoiceDate'].dt.strftime('%Y-%m').drop_duplicates().sort_values()
+        self.assertEqual(monthly['YearMonth'].tolist(), expected_months.tolist())
+
+        repeat = self.executor.execute_query_file(QUERY_FILE, 6)
+        first = repeat.iloc[0]
+        customer = self.test_data[self.test_data['CustomerID'] == first['CustomerID']]
+        days = (customer['InvoiceDate'].max().normalize() - customer['InvoiceDate'].min().normalize()).days
+        self.assertEqual(first['DaysBetween'], days)
+
+    def test_execute_all_in_file_concurrently(self):
+        """Test: todas las queries corren en paralelo, indexadas por número o título"""
+        by_number = self.executor.execute_all_in_file(QUERY_FILE, max_workers=4)
+        self.assertEqual(list(by_number), list(range(1, 9)))
+        for result in by_number.values():
+            self.assertIsNone(result['error'])
+            self.assertGreaterEqual(result['seconds'], 0)
+
+        expected = self.executor.execute_query_file(QUERY_FILE, 2)
+        pd.testing.assert_frame_equal(by_number[2]['data'], expected)
+
+        by_title = self.executor.execute_all_in_file(QUERY_FILE, key='title')
+        self.assertIn('Ventas por país', by_title)
+        self.assertEqual(by_title['Ventas por país']['number'], 2)
+
+    def test_query_cancelled_on_timeout(self):
+        """Test: una query que excede el timeout se cancela"""
+        slow = ("WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) "
+                "SELECT COUNT(*) FROM n")
+        results = self.executor.execute_many({'slow': slow, 'fast': 'SELECT 1 AS one'}, timeout=0.2)
+
+        self.assertIsInstance(results['slow']['error'], TimeoutError)
+        self.assertLess(results['slow']['seconds'], 5)
+        self.assertEqual(results['fast']['data']['one'][0], 1)
+
+    def test_indexes_created(self):
+        """Test: se crean índices sobre las columnas de búsqueda"""
+        indexes = self.executor.execute_query(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )['name'].tolist()
+        for col in ['Invoice', 'CustomerID', 'Description', 'InvoiceDate']:
+            self.assertIn(f'ix_retail_transactions_{col}', indexes)
+
+
+class TestSQLServerBulkLoad(unittest.TestCase):
+    """Tests de la carga masiva de SQLServerExecutor contra una base local"""
+
+    def setUp(self):
+        """Configuración inicial: engine SQLite en memoria como sustituto"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import StaticPool
+
+        self.engine = create_engine('sqlite://', poolclass=StaticPool)
+        self.executor = SQLServerExecutor('localhost', 'retail', engine=self.engine)
+        self.test_data = pd.DataFrame({
+            'Invoice': ['489434', '489434', '489435'],
+            'Description': ['Product 1', 'Product 2', 'Product 1'],
+            'Quantity': pd.Series([12, 6, 3], dtype='int32'),
+            'InvoiceDate': pd.to_datetime(['2009-12-01 07:45', '2009-12-01 07:45', '2009-12-01 07:46']),
+            'Price': [6.95, 6.75, 2.1],
+            'CustomerID': [13085.0, 13085.0, 13086.0]
+        })
+
+    def tearDown(self):
+        self.executor.close()
+
+    def test_bulk_load_reports_throughput(self):
+        """Test: la carga por lotes reporta filas por segundo y reutiliza el engine"""
+        stats = self.executor.create_table_from_df(self.test_data, chunksize=2)
+
+        self.assertEqual(stats['rows'], 3)
+        self.assertGreater(stats['rows_per_sec'], 0)
+        self.assertIs(self.executor.get_engine(), self.engine)
+
+        loaded = pd.read_sql('SELECT * FROM retail_transactions', self.engine)
+        self.assertEqual(loaded['Quantity'].tolist(), [12, 6, 3])
+
+    def test_staging_swap_replaces_table(self):
+        """Test: la carga con staging reemplaza la tabla sin dejar la auxiliar"""
+        from sqlalchemy import inspect
+
+        self.executor.create_table_from_df(self.test_data.head(1))
+        self.executor.create_table_from_df(self.test_data, staging=True)
+
+        tables = inspect(self.engine).get_table_names()
+        self.assertEqual(tables, ['retail_table_versions', 'retail_transactions'])
+        count = pd.read_sql('SELECT COUNT(*) AS n FROM retail_transactions', self.engine)['n'][0]
+        self.assertEqual(count, 3)
+
+        columns = {c['name']: c['type'] for c in inspect(self.engine).get_columns('retail_transactions')}
+        self.assertEqual(columns['Description'].length, 9)
+
+        versions = pd.read_sql('SELECT * FROM retail_table_versions', self.engine)
+        self.assertEqual(versions['table_name'].tolist(), ['retail_transactions'])
+
+
+if __name__ == '__main__':
+    unittest.main()
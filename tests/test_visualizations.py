@@ -0,0 +1,96 @@
+"""
+Tests unitarios para las agregaciones memoizadas de RetailVisualizer
+"""
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from matplotlib import cbook
+from visualizations import RetailVisualizer
+
+
+class TestRetailVisualizer(unittest.TestCase):
+    """Tests para la capa de agregación de RetailVisualizer"""
+
+    def setUp(self):
+        """Configuración inicial: DataFrame limpio sintético"""
+        rng = np.random.default_rng(6)
+        n = 2_000
+        self.test_data = pd.DataFrame({
+            'Description': [f'Product {i}' for i in rng.integers(1, 60, n)],
+            'Quantity': rng.integers(1, 20, n),
+            'InvoiceDate': pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 300, n), unit='D'),
+            'TotalAmount': rng.lognormal(2.5, 1.0, n),
+            'Country': rng.choice(['United Kingdom', 'France', 'Germany', 'Spain'], n)
+        })
+        self.visualizer = RetailVisualizer(self.test_data)
+
+    def test_top_n_matches_full_sort(self):
+        """Test: top-N con nlargest coincide con ordenar y tomar la cabeza"""
+        expected = self.test_data.groupby('Description')['Quantity'].sum().sort_values(ascending=False).head(15)
+        top = self.visualizer.aggregate_top_products(15)
+        self.assertEqual(top.tolist(), expected.tolist())
+
+        # Totales compartidos: otro top_n no vuelve a agrupar
+        self.assertIs(self.visualizer.aggregate_top_products(15), top)
+        self.assertEqual(len(self.visualizer.aggregate_top_products(5)), 5)
+        self.assertEqual(sum(k[0] == 'totals' for k in self.visualizer._aggregates), 1)
+
+    def test_distribution_stats_match_matplotlib(self):
+        """Test: histograma y estadísticas de boxplot coinciden con NumPy/matplotlib"""
+        values = self.test_data['TotalAmount'].to_numpy()
+        distribution = self.visualizer.aggregate_sales_distribution()
+
+        counts, _ = np.histogram(values, bins=50)
+        np.testing.assert_array_equal(distribution['hist_counts'], counts)
+        self.assertAlmostEqual(distribution['p95'], np.quantile(values, 0.95))
+
+        expected = cbook.boxplot_stats(values)[0]
+        for key in ('med', 'q1', 'q3', 'whislo', 'whishi'):
+            self.assertAlmostEqual(distribution['box'][key], expected[key])
+
+    def test_cache_invalidated_when_frame_changes(self):
+        """Test: las agregaciones se recalculan si se reemplazan o se invalidan los datos"""
+        before = self.visualizer.aggregate_top_countries(1)
+        changed = self.test_data.copy()
+        changed.loc[changed['Country'] == 'Spain', 'TotalAmount'] = 1e9
+        self.visualizer.df = changed
+        after = self.visualizer.aggregate_top_countries(1)
+        self.assertNotEqual(before.index[0], 'Spain')
+        self.assertEqual(after.index[0], 'Spain')
+
+        self.visualizer.df.loc[self.visualizer.df['Country'] == 'Spain', 'TotalAmount'] = 0.0
+        self.visualizer.invalidate()
+        self.assertNotEqual(self.visualizer.aggregate_top_countries(1).index[0], 'Spain')
+
+    def test_export_and_reload_without_raw_data(self):
+        """Test: las agregaciones exportadas permiten dibujar sin transacciones"""
+        self.visualizer.aggregate_sales_over_time()
+        self.visualizer.aggregate_top_countries()
+        self.visualizer.aggregate_sales_distribution()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.visualizer.export_aggregates(Path(tmp) / 'aggregates.json')
+            self.assertLess(path.stat().st_size, 50_000)
+
+            reloaded = RetailVisualizer.from_aggregates(path)
+            pd.testing.assert_series_equal(reloaded.aggregate_sales_over_time(),
+                                           self.visualizer.aggregate_sales_over_time(), check_freq=False)
+            pd.testing.assert_series_equal(reloaded.aggregate_top_countries(),
+                                           self.visualizer.aggregate_top_countries(), check_index_type=False)
+
+            output = Path(tmp) / 'distribution.png'
+            reloaded.plot_sales_distribution(save_path=output, show=False)
+            self.assertTrue(output.exists())
+
+            with self.assertRaises(ValueError):
+                reloaded.aggregate_top_products()
+
+
+if __name__ == '__main__':
+    unittest.main()